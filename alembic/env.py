@@ -13,6 +13,10 @@ from app.models.user import Base as UserBase
 from app.models.order import Base as OrderBase
 from app.models.client import Base as ClientBase
 from app.models.product import Base as ProductBase
+from app.models.scheduled_job import Base as ScheduledJobBase
+from app.models.stock_movement import Base as StockMovementBase
+from app.models.idempotency_key import Base as IdempotencyKeyBase
+from app.models.client_stats import Base as ClientStatsBase
 
 config = context.config
 fileConfig(config.config_file_name)
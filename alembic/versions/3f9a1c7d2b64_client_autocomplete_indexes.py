@@ -0,0 +1,41 @@
+"""Client autocomplete indexes
+
+Revision ID: 3f9a1c7d2b64
+Revises: 5c4e3191e6fb
+Create Date: 2025-06-02 10:12:41.381204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c7d2b64'
+down_revision = '5c4e3191e6fb'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_clients_name_lower_prefix',
+        'clients',
+        [sa.text('lower(name) text_pattern_ops')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_clients_email_lower_prefix',
+        'clients',
+        [sa.text('lower(email) text_pattern_ops')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_clients_cpf_prefix',
+        'clients',
+        [sa.text('cpf text_pattern_ops')],
+        unique=False,
+    )
+
+def downgrade():
+    op.drop_index('ix_clients_cpf_prefix', table_name='clients')
+    op.drop_index('ix_clients_email_lower_prefix', table_name='clients')
+    op.drop_index('ix_clients_name_lower_prefix', table_name='clients')
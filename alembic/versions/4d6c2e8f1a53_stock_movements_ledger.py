@@ -0,0 +1,45 @@
+"""Stock movements ledger
+
+Revision ID: 4d6c2e8f1a53
+Revises: e7a05b3c9d21
+Create Date: 2025-06-09 16:48:13.902174
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d6c2e8f1a53'
+down_revision = 'e7a05b3c9d21'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('stock_movements',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stock_movements_id'), 'stock_movements', ['id'], unique=False)
+    op.create_index('ix_stock_movements_product_id_created_at', 'stock_movements', ['product_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_stock_movements_created_at', 'stock_movements', ['created_at'], unique=False)
+
+    # Saldo de abertura: o estoque atual de cada produto vira a primeira movimentação do livro
+    op.execute(
+        "INSERT INTO stock_movements (product_id, quantity, reason, created_at) "
+        "SELECT id, stock, 'opening', now() FROM products WHERE stock <> 0"
+    )
+
+def downgrade():
+    op.drop_index('ix_stock_movements_created_at', table_name='stock_movements')
+    op.drop_index('ix_stock_movements_product_id_created_at', table_name='stock_movements')
+    op.drop_index(op.f('ix_stock_movements_id'), table_name='stock_movements')
+    op.drop_table('stock_movements')
@@ -0,0 +1,23 @@
+"""Unique product description
+
+Revision ID: 9b2e4d61c0a7
+Revises: 3f9a1c7d2b64
+Create Date: 2025-06-03 14:27:09.552318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e4d61c0a7'
+down_revision = '3f9a1c7d2b64'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Descrições duplicadas precisam ser corrigidas antes de aplicar esta migration.
+    op.create_index(op.f('ix_products_description'), 'products', ['description'], unique=True)
+
+def downgrade():
+    op.drop_index(op.f('ix_products_description'), table_name='products')
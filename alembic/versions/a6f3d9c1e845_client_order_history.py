@@ -0,0 +1,31 @@
+"""Client order history
+
+Revision ID: a6f3d9c1e845
+Revises: b58f0e3a6c12
+Create Date: 2025-06-12 09:42:18.905127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6f3d9c1e845'
+down_revision = 'b58f0e3a6c12'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('order_product', sa.Column('unit_price', sa.Float(), nullable=True))
+    op.create_index('ix_order_product_order_id', 'order_product', ['order_id'], unique=False)
+    op.create_index(
+        'ix_orders_client_id_created_at_id',
+        'orders',
+        ['client_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+def downgrade():
+    op.drop_index('ix_orders_client_id_created_at_id', table_name='orders')
+    op.drop_index('ix_order_product_order_id', table_name='order_product')
+    op.drop_column('order_product', 'unit_price')
@@ -0,0 +1,41 @@
+"""Order status history timestamps
+
+Revision ID: b58f0e3a6c12
+Revises: 4d6c2e8f1a53
+Create Date: 2025-06-11 11:20:36.448051
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b58f0e3a6c12'
+down_revision = '4d6c2e8f1a53'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        'order_status_history',
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.add_column(
+        'order_status_history',
+        sa.Column('changed_by', sa.Integer(), nullable=True),
+    )
+    op.create_foreign_key(
+        'order_status_history_changed_by_fkey', 'order_status_history', 'users', ['changed_by'], ['id']
+    )
+    op.create_index(
+        'ix_order_status_history_order_id_changed_at',
+        'order_status_history',
+        ['order_id', 'changed_at'],
+        unique=False,
+    )
+
+def downgrade():
+    op.drop_index('ix_order_status_history_order_id_changed_at', table_name='order_status_history')
+    op.drop_constraint('order_status_history_changed_by_fkey', 'order_status_history', type_='foreignkey')
+    op.drop_column('order_status_history', 'changed_by')
+    op.drop_column('order_status_history', 'changed_at')
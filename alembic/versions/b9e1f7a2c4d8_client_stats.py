@@ -0,0 +1,58 @@
+"""Client stats
+
+Revision ID: b9e1f7a2c4d8
+Revises: f3a8c6d2b517
+Create Date: 2025-06-18 14:02:51.217604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e1f7a2c4d8'
+down_revision = 'f3a8c6d2b517'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('client_stats',
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('total_spent', sa.Float(), nullable=False),
+        sa.Column('last_order_at', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('client_id')
+    )
+    # Backfill: totais dos pedidos não cancelados de cada cliente (zerados para quem não tem pedidos)
+    op.execute("""
+        INSERT INTO client_stats (client_id, order_count, total_spent, last_order_at)
+        SELECT c.id, COALESCE(s.order_count, 0), COALESCE(s.total_spent, 0), s.last_order_at
+        FROM clients c
+        LEFT JOIN (
+            SELECT o.client_id,
+                   COUNT(*) AS order_count,
+                   SUM(t.total) AS total_spent,
+                   MAX(o.created_at) AS last_order_at
+            FROM orders o
+            LEFT JOIN (
+                SELECT l.order_id, l.order_created_at,
+                       SUM(l.quantity * COALESCE(l.unit_price, p.price)) AS total
+                FROM order_product l
+                JOIN products p ON p.id = l.product_id
+                GROUP BY l.order_id, l.order_created_at
+            ) t ON t.order_id = o.id AND t.order_created_at = o.created_at
+            WHERE o.status <> 'canceled'
+            GROUP BY o.client_id
+        ) s ON s.client_id = c.id
+    """)
+    op.create_index('ix_client_stats_order_count', 'client_stats', ['order_count'], unique=False)
+    op.create_index('ix_client_stats_total_spent', 'client_stats', ['total_spent'], unique=False)
+    op.create_index('ix_client_stats_last_order_at', 'client_stats', ['last_order_at'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_client_stats_last_order_at', table_name='client_stats')
+    op.drop_index('ix_client_stats_total_spent', table_name='client_stats')
+    op.drop_index('ix_client_stats_order_count', table_name='client_stats')
+    op.drop_table('client_stats')
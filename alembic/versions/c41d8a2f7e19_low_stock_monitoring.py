@@ -0,0 +1,39 @@
+"""Low stock monitoring
+
+Revision ID: c41d8a2f7e19
+Revises: 9b2e4d61c0a7
+Create Date: 2025-06-05 09:41:52.117730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d8a2f7e19'
+down_revision = '9b2e4d61c0a7'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        'products',
+        sa.Column('reorder_threshold', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.create_index(
+        'ix_products_low_stock',
+        'products',
+        ['section', 'stock'],
+        unique=False,
+        postgresql_where=sa.text('stock <= reorder_threshold'),
+    )
+    op.create_table('scheduled_jobs',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+def downgrade():
+    op.drop_table('scheduled_jobs')
+    op.drop_index('ix_products_low_stock', table_name='products')
+    op.drop_column('products', 'reorder_threshold')
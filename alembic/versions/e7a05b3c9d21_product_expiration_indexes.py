@@ -0,0 +1,34 @@
+"""Product expiration indexes
+
+Revision ID: e7a05b3c9d21
+Revises: c41d8a2f7e19
+Create Date: 2025-06-06 08:03:27.604915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a05b3c9d21'
+down_revision = 'c41d8a2f7e19'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_products_section_expiration_date',
+        'products',
+        ['section', 'expiration_date', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_products_expiration_date',
+        'products',
+        ['expiration_date', 'id'],
+        unique=False,
+    )
+
+def downgrade():
+    op.drop_index('ix_products_expiration_date', table_name='products')
+    op.drop_index('ix_products_section_expiration_date', table_name='products')
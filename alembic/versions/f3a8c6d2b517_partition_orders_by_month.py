@@ -0,0 +1,204 @@
+"""Partition orders by month
+
+Revision ID: f3a8c6d2b517
+Revises: d2b7c4e91f30
+Create Date: 2025-06-16 08:55:12.640318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c6d2b517'
+down_revision = 'd2b7c4e91f30'
+branch_labels = None
+depends_on = None
+
+# Partições criadas além do mês corrente; as seguintes são criadas pelo job
+# de manutenção de partições (ORDER_PARTITION_MONTHS_AHEAD).
+MONTHS_AHEAD = 3
+PARTITIONED_TABLES = (
+    ('orders', 'created_at'),
+    ('order_product', 'order_created_at'),
+    ('order_status_history', 'order_created_at'),
+)
+
+
+def _create_partitions():
+    # Uma partição por mês, do pedido mais antigo até MONTHS_AHEAD meses à
+    # frente. O intervalo é calculado no próprio banco, para que a migração
+    # também funcione em modo offline (alembic upgrade --sql).
+    tables = ", ".join(f"'{table}'" for table, _ in PARTITIONED_TABLES)
+    op.execute(f"""
+        DO $$
+        DECLARE
+            first_month date := date_trunc(
+                'month', LEAST(COALESCE((SELECT MIN(created_at) FROM orders_old), CURRENT_DATE), CURRENT_DATE)
+            )::date;
+            last_month date := (date_trunc('month', CURRENT_DATE) + interval '{MONTHS_AHEAD} months')::date;
+            partition_month date;
+            partitioned text;
+        BEGIN
+            partition_month := first_month;
+            WHILE partition_month <= last_month LOOP
+                FOREACH partitioned IN ARRAY ARRAY[{tables}] LOOP
+                    EXECUTE 'CREATE TABLE '
+                        || quote_ident(partitioned || '_p' || to_char(partition_month, 'YYYY_MM'))
+                        || ' PARTITION OF ' || quote_ident(partitioned)
+                        || ' FOR VALUES FROM (' || quote_literal(partition_month)
+                        || ') TO (' || quote_literal((partition_month + interval '1 month')::date) || ')';
+                END LOOP;
+                partition_month := (partition_month + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+    for table, _ in PARTITIONED_TABLES:
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def upgrade():
+    # Tabelas atuais saem do caminho, preservando as sequências de id
+    for table in ('order_status_history', 'order_product', 'orders'):
+        op.rename_table(table, f'{table}_old')
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_old_pkey")
+    op.execute("ALTER INDEX order_status_history_pkey RENAME TO order_status_history_old_pkey")
+    op.drop_index('ix_orders_id', table_name='orders_old')
+    op.drop_index('ix_orders_client_id_created_at_id', table_name='orders_old')
+    op.drop_index('ix_order_product_order_id', table_name='order_product_old')
+    op.drop_index('ix_order_status_history_id', table_name='order_status_history_old')
+    op.drop_index('ix_order_status_history_order_id_changed_at', table_name='order_status_history_old')
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE order_status_history_id_seq OWNED BY NONE")
+
+    op.create_table('orders',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('orders_id_seq'::regclass)"), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_at', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_table('order_product',
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.Column('order_created_at', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['order_id', 'order_created_at'], ['orders.id', 'orders.created_at'], onupdate='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        postgresql_partition_by='RANGE (order_created_at)'
+    )
+    op.create_table('order_status_history',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('order_status_history_id_seq'::regclass)"), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('order_created_at', sa.Date(), nullable=False),
+        sa.Column('previous_status', sa.String(), nullable=False),
+        sa.Column('new_status', sa.String(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('changed_by', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['order_id', 'order_created_at'], ['orders.id', 'orders.created_at'], onupdate='CASCADE'),
+        sa.ForeignKeyConstraint(['changed_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id', 'order_created_at'),
+        postgresql_partition_by='RANGE (order_created_at)'
+    )
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_status_history_id_seq OWNED BY order_status_history.id")
+
+    _create_partitions()
+
+    op.execute(
+        "INSERT INTO orders (id, client_id, status, created_at) "
+        "SELECT id, client_id, status, created_at FROM orders_old"
+    )
+    op.execute(
+        "INSERT INTO order_product (order_id, order_created_at, product_id, quantity, unit_price) "
+        "SELECT l.order_id, o.created_at, l.product_id, l.quantity, l.unit_price "
+        "FROM order_product_old l JOIN orders_old o ON o.id = l.order_id"
+    )
+    op.execute(
+        "INSERT INTO order_status_history "
+        "(id, order_id, order_created_at, previous_status, new_status, changed_at, changed_by) "
+        "SELECT h.id, h.order_id, o.created_at, h.previous_status, h.new_status, h.changed_at, h.changed_by "
+        "FROM order_status_history_old h JOIN orders_old o ON o.id = h.order_id"
+    )
+    op.drop_table('order_status_history_old')
+    op.drop_table('order_product_old')
+    op.drop_table('orders_old')
+
+    # Índices particionados: criados em cada partição automaticamente
+    op.create_index('ix_orders_id', 'orders', ['id'], unique=False)
+    op.create_index('ix_orders_client_id_created_at_id', 'orders', ['client_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_order_product_order_id', 'order_product', ['order_id'], unique=False)
+    op.create_index('ix_order_status_history_id', 'order_status_history', ['id'], unique=False)
+    op.create_index('ix_order_status_history_order_id_changed_at', 'order_status_history', ['order_id', 'changed_at'], unique=False)
+
+def downgrade():
+    for table in ('order_status_history', 'order_product', 'orders'):
+        op.rename_table(table, f'{table}_partitioned')
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_partitioned_pkey")
+    op.execute("ALTER INDEX order_status_history_pkey RENAME TO order_status_history_partitioned_pkey")
+    for index, table in (
+        ('ix_orders_id', 'orders'),
+        ('ix_orders_client_id_created_at_id', 'orders'),
+        ('ix_order_product_order_id', 'order_product'),
+        ('ix_order_status_history_id', 'order_status_history'),
+        ('ix_order_status_history_order_id_changed_at', 'order_status_history'),
+    ):
+        op.drop_index(index, table_name=f'{table}_partitioned')
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE order_status_history_id_seq OWNED BY NONE")
+
+    op.create_table('orders',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('orders_id_seq'::regclass)"), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_at', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('order_product',
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], )
+    )
+    op.create_table('order_status_history',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('order_status_history_id_seq'::regclass)"), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('previous_status', sa.String(), nullable=False),
+        sa.Column('new_status', sa.String(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('changed_by', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['changed_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_status_history_id_seq OWNED BY order_status_history.id")
+
+    op.execute(
+        "INSERT INTO orders (id, client_id, status, created_at) "
+        "SELECT id, client_id, status, created_at FROM orders_partitioned"
+    )
+    op.execute(
+        "INSERT INTO order_product (order_id, product_id, quantity, unit_price) "
+        "SELECT order_id, product_id, quantity, unit_price FROM order_product_partitioned"
+    )
+    op.execute(
+        "INSERT INTO order_status_history (id, order_id, previous_status, new_status, changed_at, changed_by) "
+        "SELECT id, order_id, previous_status, new_status, changed_at, changed_by FROM order_status_history_partitioned"
+    )
+    # Remove as tabelas particionadas junto com todas as partições
+    op.drop_table('order_status_history_partitioned')
+    op.drop_table('order_product_partitioned')
+    op.drop_table('orders_partitioned')
+
+    op.create_index('ix_orders_id', 'orders', ['id'], unique=False)
+    op.create_index('ix_orders_client_id_created_at_id', 'orders', ['client_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_order_product_order_id', 'order_product', ['order_id'], unique=False)
+    op.create_index('ix_order_status_history_id', 'order_status_history', ['id'], unique=False)
+    op.create_index('ix_order_status_history_order_id_changed_at', 'order_status_history', ['order_id', 'changed_at'], unique=False)
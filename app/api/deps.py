@@ -1,10 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional, Tuple, Type
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.user import User, AccessLevel
 from app.schemas.token import TokenData
 
@@ -73,3 +76,34 @@ def get_current_seller(
         )
 
     return current_user
+
+
+def sparse_fields(schema: Type[BaseModel]):
+    """
+    Cria a dependency do parâmetro `fields` (campos da resposta separados por vírgula).
+
+    - Retorna os campos pedidos, na ordem do schema, ou todos os campos do
+      schema quando o parâmetro não é informado.
+    - Campos que não existem no schema geram erro 400.
+    """
+    allowed = tuple(schema.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Campos da resposta separados por vírgula: {', '.join(allowed)}"
+        ),
+    ) -> Tuple[str, ...]:
+        requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+        if not requested:
+            return allowed
+
+        unknown = requested.difference(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}.",
+            )
+
+        return tuple(name for name in allowed if name in requested)
+
+    return dependency
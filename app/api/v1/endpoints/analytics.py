@@ -0,0 +1,147 @@
+from datetime import date, timedelta
+from typing import Callable, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_seller, get_db, get_read_db
+from app.core.cache import cached, data_version
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+from app.repositories.analytics import daily_revenue, load_sales, top_products_by_section
+from app.schemas.analytics import DailyRevenue, SectionTopProducts
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Período máximo de uma consulta
+_MAX_DAYS = 3 * 366
+
+
+def _check_period(start: date, end: date):
+    if start > end or (end - start).days >= _MAX_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date range.")
+
+
+def _cached_result(
+    name: str, params: tuple, compute: Callable[[Session], list], primary: Session, read: Session
+) -> list:
+    # A versão dos pedidos muda a cada escrita confirmada (pedidos e produtos):
+    # resultados de uma versão anterior nunca são servidos. O valor guardado
+    # sob a versão é calculado no primário, pois a réplica pode ainda não ter
+    # a escrita que gerou a versão; sem cache, a sessão de leitura é usada.
+    version = data_version("orders")
+    if version is None or settings.ANALYTICS_CACHE_TTL_SECONDS <= 0:
+        return compute(read)
+    key = f"cache:analytics:{name}:{':'.join(map(str, params))}:{version}"
+    return cached(key, lambda: compute(primary), ttl=settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+
+@router.get(
+    "/top-products",
+    response_model=List[SectionTopProducts],
+    responses={
+        200: {
+            "description": "Produtos de maior receita por seção",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "section": "Roupas",
+                            "products": [
+                                {"product_id": 1, "description": "Camiseta Preta", "quantity": 120, "revenue": 5988.0}
+                            ]
+                        }
+                    ]
+                }
+            },
+        },
+        400: {"description": "Invalid date range."},
+    },
+)
+def get_top_products(
+    start: date,
+    end: date,
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_db),
+    _: str = Depends(get_current_seller),
+    section: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Ranking dos produtos de maior receita de cada seção no período (datas dos pedidos, inclusive).
+
+    - Pedidos cancelados não entram; a receita usa o preço de cada item no pedido.
+    - Os itens do período são lidos em uma única consulta para arrays NumPy, e
+      agrupamento e ranking são calculados de forma vetorizada.
+    - O resultado fica em cache até a próxima alteração de pedidos ou produtos
+      (ou ANALYTICS_CACHE_TTL_SECONDS segundos).
+    - Permite filtrar por seção.
+
+    **Casos de uso:**
+    - Dashboard de vendas: "20 produtos mais vendidos por seção neste trimestre".
+    - Planejamento de compras e de exposição dos produtos.
+    """
+    _check_period(start, end)
+    result = _cached_result(
+        "top_products",
+        (start, end, limit),
+        lambda session: top_products_by_section(session, load_sales(session, start, end), limit),
+        primary,
+        db,
+    )
+    if section is not None:
+        result = [group for group in result if group["section"] == section]
+    return ORJSONResponse(result)
+
+
+@router.get(
+    "/daily-revenue",
+    response_model=List[DailyRevenue],
+    responses={
+        200: {
+            "description": "Receita diária com média móvel",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {"date": "2025-05-25", "revenue": 1520.5, "quantity": 48, "moving_average": 1387.21}
+                    ]
+                }
+            },
+        },
+        400: {"description": "Invalid date range."},
+    },
+)
+def get_daily_revenue(
+    start: date,
+    end: date,
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_db),
+    _: str = Depends(get_current_seller),
+    window: int = Query(7, ge=1, le=90),
+):
+    """
+    Receita e itens vendidos por dia no período, com a média móvel da receita
+    dos últimos `window` dias (padrão 7).
+
+    - Dias sem vendas aparecem com zero; a média dos primeiros dias inclui os
+      dias anteriores ao período.
+    - Pedidos cancelados não entram na receita.
+    - O resultado fica em cache até a próxima alteração de pedidos ou produtos
+      (ou ANALYTICS_CACHE_TTL_SECONDS segundos).
+
+    **Casos de uso:**
+    - Gráfico de faturamento diário com tendência semanal.
+    - Acompanhamento de campanhas e sazonalidade.
+    """
+    _check_period(start, end)
+    return ORJSONResponse(
+        _cached_result(
+            "daily_revenue",
+            (start, end, window),
+            lambda session: daily_revenue(
+                load_sales(session, start - timedelta(days=window - 1), end), start, end, window
+            ),
+            primary,
+            db,
+        )
+    )
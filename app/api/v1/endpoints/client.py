@@ -1,13 +1,36 @@
 import logging
+import re
 import sentry_sdk
-from typing import List, Optional
+from datetime import date
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_seller, get_db
+from app.api.deps import get_current_seller, get_db, get_read_db, sparse_fields
+from app.core.cache import cached_entity, entity_key, invalidate_on_commit
+from app.core.database import unique_violation
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import ORJSONResponse, model_rows, row_dicts, select_schema
 from app.models.client import Client
-from app.schemas.client import ClientCreate, ClientOut, ClientUpdate
+from app.models.client_stats import ClientStats
+from app.models.order import Order, OrderProduct
+from app.models.product import Product
+from app.repositories.count import count_rows
+from app.schemas.client import (
+    ClientAutocompleteOut,
+    ClientBulkCreate,
+    ClientBulkResult,
+    ClientCreate,
+    ClientDetailOut,
+    ClientOut,
+    ClientSortField,
+    ClientUpdate,
+)
+from app.schemas.order import ClientOrderOut, OrderStatus
+from app.schemas.pagination import CountMode, CursorPage
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
@@ -41,23 +64,21 @@ def create_client(
 ):
     logger = logging.getLogger(__name__)
     try:
-        existing_email = db.query(Client).filter(Client.email == client_in.email).first()
-        existing_cpf = db.query(Client).filter(Client.cpf == client_in.cpf).first()
-
-        if existing_email or existing_cpf:
-            raise HTTPException(
-                status_code=400,
-                detail="Email or CPF already exists.",
-            )
-
         client = Client(**client_in.model_dump())  # Usando model_dump() em vez de dict()
         db.add(client)
-        db.flush()  # Atualiza o ID sem fazer commit
-        db.refresh(client)
+        db.flush()  # INSERT ... RETURNING id, sem fazer commit
 
         return client
     except HTTPException:
         raise
+    except IntegrityError as e:
+        db.rollback()
+        if not unique_violation(e):
+            raise HTTPException(status_code=400, detail="Invalid client data.")
+        raise HTTPException(
+            status_code=400,
+            detail="Email or CPF already exists.",
+        )
     except Exception as e:
         db.rollback()
         logger.error("Erro inesperado ao criar cliente: %s", str(e), exc_info=True)
@@ -65,12 +86,139 @@ def create_client(
         raise HTTPException(status_code=500, detail="Erro interno inesperado")
 
 
+@router.post(
+    "/bulk",
+    response_model=ClientBulkResult,
+    responses={
+        200: {
+            "description": "Importação concluída; conflitos são informados por linha",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "created": [
+                            {
+                                "index": 0,
+                                "id": 1,
+                                "name": "João Silva",
+                                "email": "joao@exemplo.com",
+                                "phone": "11999999999",
+                                "cpf": "12345678901",
+                                "address": "Rua das Flores, 123"
+                            }
+                        ],
+                        "conflicts": [
+                            {
+                                "index": 1,
+                                "email": "maria@exemplo.com",
+                                "cpf": "12345678901",
+                                "detail": "Duplicate CPF in batch."
+                            }
+                        ]
+                    }
+                }
+            },
+        },
+        400: {"description": "Email ou CPF cadastrado em paralelo à importação."},
+    },
+)
+def bulk_create_clients(
+    bulk_in: ClientBulkCreate,
+    db: Session = Depends(get_db),
+    _: str = Depends(get_current_seller),
+):
+    """
+    Importa uma lista de clientes de uma só vez.
+
+    - Verifica todos os e-mails e CPFs do lote contra o banco em uma única consulta.
+    - Detecta e-mails e CPFs repetidos dentro do próprio lote.
+    - Insere os clientes válidos com INSERT de múltiplas linhas.
+    - Retorna os clientes criados e os conflitos, indicando a posição de cada linha no lote.
+
+    **Casos de uso:**
+    - Carga inicial da base de clientes de um parceiro.
+    - Migração de clientes vindos de outro sistema.
+    """
+    logger = logging.getLogger(__name__)
+    rows = bulk_in.clients
+    emails = {row.email for row in rows}
+    cpfs = {row.cpf for row in rows if row.cpf}
+
+    existing = (
+        db.query(Client.email, Client.cpf)
+        .filter(or_(Client.email.in_(emails), Client.cpf.in_(cpfs)))
+        .all()
+    )
+    taken_emails = {row.email for row in existing}
+    taken_cpfs = {row.cpf for row in existing}
+
+    batch_emails, batch_cpfs = set(), set()
+    to_insert, conflicts = [], []
+    for index, row in enumerate(rows):
+        if row.email in taken_emails:
+            detail = "Email already exists."
+        elif row.cpf in taken_cpfs:
+            detail = "CPF already exists."
+        elif row.email in batch_emails:
+            detail = "Duplicate email in batch."
+        elif row.cpf and row.cpf in batch_cpfs:
+            detail = "Duplicate CPF in batch."
+        else:
+            batch_emails.add(row.email)
+            if row.cpf:
+                batch_cpfs.add(row.cpf)
+            to_insert.append((index, row))
+            continue
+        conflicts.append({"index": index, "email": row.email, "cpf": row.cpf, "detail": detail})
+
+    created = []
+    if to_insert:
+        try:
+            result = db.execute(
+                insert(Client).returning(
+                    Client.id,
+                    Client.name,
+                    Client.email,
+                    Client.phone,
+                    Client.cpf,
+                    Client.address,
+                    sort_by_parameter_order=True,
+                ),
+                [row.model_dump() for _, row in to_insert],
+            )
+        except IntegrityError as e:
+            db.rollback()
+            if not unique_violation(e):
+                raise HTTPException(status_code=400, detail="Invalid client data.")
+            raise HTTPException(
+                status_code=400,
+                detail="Email or CPF already exists.",
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error("Erro inesperado ao importar clientes: %s", str(e), exc_info=True)
+            sentry_sdk.capture_exception(e)
+            raise HTTPException(status_code=500, detail="Erro interno inesperado")
+
+        created = [
+            {"index": index, **row._mapping}
+            for (index, _), row in zip(to_insert, result.all())
+        ]
+
+    return {"created": created, "conflicts": conflicts}
+
+
 @router.get(
     "/",
     response_model=List[ClientOut],
     responses={
         200: {
             "description": "Lista de clientes",
+            "headers": {
+                "X-Total-Count": {
+                    "description": "Total de registros com os filtros aplicados (apenas com o parâmetro count)",
+                    "schema": {"type": "integer"},
+                }
+            },
             "content": {
                 "application/json": {
                     "example": [
@@ -89,39 +237,132 @@ def create_client(
     },
 )
 def list_clients(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: str = Depends(get_current_seller),
     name: Optional[str] = None,
     email: Optional[str] = None,
     cpf: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
+    count: Optional[CountMode] = None,
+    sort: Optional[ClientSortField] = None,
+    descending: bool = True,
+    fields: Tuple[str, ...] = Depends(sparse_fields(ClientOut)),
 ):
     """
     Lista todos os clientes cadastrados, com filtros opcionais.
 
     - Permite filtrar por nome, e-mail ou CPF.
     - Retorna os clientes paginados (parâmetros skip e limit).
+    - Permite ordenar pelas estatísticas de pedidos (`sort=order_count`,
+      `total_spent` ou `last_order_at`), em ordem decrescente por padrão
+      (`descending=false` para crescente); clientes sem pedidos valem zero.
+    - Consulta apenas as colunas da resposta, sem carregar entidades na sessão.
+    - Com `count=exact` retorna o total de registros no cabeçalho `X-Total-Count`;
+      com `count=estimate`, uma estimativa do banco, mais barata em tabelas grandes.
+    - O parâmetro `fields` limita as colunas consultadas e os campos da resposta
+      (ex: `fields=id,name,phone`).
 
     **Casos de uso:**
     - Consulta geral de clientes.
     - Busca de clientes para pedidos ou relatórios.
+    - Ranking de clientes por valor gasto ou clientes inativos há mais tempo.
     """
-    query = db.query(Client)
+    query = select_schema(Client, ClientOut, fields)
 
     if name:
-        query = query.filter(Client.name.ilike(f"%{name}%"))
+        query = query.where(Client.name.ilike(f"%{name}%"))
     if email:
-        query = query.filter(Client.email == email)
+        query = query.where(Client.email == email)
     if cpf:
-        query = query.filter(Client.cpf == cpf)
+        query = query.where(Client.cpf == cpf)
+
+    page = query
+    if sort:
+        # Clientes sem linha de estatísticas (sem pedidos) ficam como os menores valores
+        column = getattr(ClientStats, sort.value)
+        page = query.outerjoin(ClientStats, ClientStats.client_id == Client.id).order_by(
+            column.desc().nulls_last() if descending else column.asc().nulls_first(),
+            Client.id.desc() if descending else Client.id,
+        )
+
+    clients = row_dicts(db.execute(page.offset(skip).limit(limit)))
+
+    headers = {"X-Total-Count": str(count_rows(db, query, count))} if count else None
+    return ORJSONResponse(clients, headers=headers)
+
+
+def _prefix_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+@router.get(
+    "/autocomplete",
+    response_model=List[ClientAutocompleteOut],
+    responses={
+        200: {
+            "description": "Clientes cujo nome, e-mail ou CPF começam com o termo",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": 1,
+                            "name": "João Silva",
+                            "email": "joao@exemplo.com",
+                            "cpf": "12345678901"
+                        }
+                    ]
+                }
+            },
+        }
+    },
+)
+def autocomplete_clients(
+    db: Session = Depends(get_read_db),
+    _: str = Depends(get_current_seller),
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """
+    Sugere clientes a partir do início do nome, e-mail ou CPF.
 
-    return query.offset(skip).limit(limit).all()
+    - Termos só com dígitos (pontuação de CPF é ignorada) buscam pelo prefixo do CPF.
+    - Termos com "@" buscam pelo prefixo do e-mail.
+    - Demais termos buscam pelo prefixo do nome ou do e-mail, sem diferenciar maiúsculas.
+    - A busca usa índices de prefixo, sem varrer a tabela de clientes.
+
+    **Casos de uso:**
+    - Campo de busca de cliente com sugestões enquanto o vendedor digita.
+    """
+    term = q.strip().lower()
+    digits = re.sub(r"[.\-\s]", "", term)
+
+    if digits.isdigit():
+        condition = Client.cpf.like(_prefix_pattern(digits), escape="\\")
+    elif "@" in term:
+        condition = func.lower(Client.email).like(_prefix_pattern(term), escape="\\")
+    else:
+        pattern = _prefix_pattern(term)
+        condition = or_(
+            func.lower(Client.name).like(pattern, escape="\\"),
+            func.lower(Client.email).like(pattern, escape="\\"),
+        )
+
+    clients = (
+        db.query(Client.id, Client.name, Client.email, Client.cpf)
+        .filter(condition)
+        .order_by(func.lower(Client.name))
+        .limit(limit)
+        .all()
+    )
+
+    return ORJSONResponse(model_rows(ClientAutocompleteOut, clients))
 
 
 @router.get(
     "/{client_id}",
-    response_model=ClientOut,
+    response_model=ClientDetailOut,
     responses={
         200: {
             "description": "Cliente encontrado",
@@ -133,7 +374,13 @@ def list_clients(
                         "email": "joao@exemplo.com",
                         "phone": "11999999999",
                         "cpf": "12345678901",
-                        "address": "Rua das Flores, 123"
+                        "address": "Rua das Flores, 123",
+                        "stats": {
+                            "order_count": 12,
+                            "total_spent": 1830.5,
+                            "last_order_at": "2025-05-25",
+                            "average_ticket": 152.54
+                        }
                     }
                 }
             },
@@ -143,25 +390,211 @@ def list_clients(
 )
 def get_client(
     client_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_db),
     _: str = Depends(get_current_seller),
+    fields: Tuple[str, ...] = Depends(sparse_fields(ClientDetailOut)),
 ):
     """
     Busca um cliente pelo seu ID.
 
     - Retorna todos os dados do cliente.
+    - `stats` traz quantidade de pedidos, valor total gasto, data do último
+      pedido e ticket médio, sem contar pedidos cancelados. Os valores são
+      lidos da tabela client_stats, mantida a cada alteração de pedido, sem
+      percorrer o histórico do cliente.
+    - O parâmetro `fields` limita os campos da resposta (ex: `fields=id,name,phone`);
+      com ele, a consulta lê só as colunas pedidas (e client_stats só quando
+      `stats` é pedido), direto do banco, sem passar pelo cache.
     - Retorna erro 404 caso o cliente não exista.
+    - Sem `fields`, o cliente é servido do cache compartilhado (ver `CACHE_TTL_SECONDS`),
+      invalidado a cada alteração do cadastro ou dos pedidos do cliente.
+      Faltas no cache são carregadas do primário, nunca de uma réplica atrasada.
 
     **Casos de uso:**
     - Visualização detalhada de um cliente.
     - Consulta para edição ou análise de dados do cliente.
     """
-    client = db.query(Client).filter(Client.id == client_id).first()
+    def load(session: Session, names: Tuple[str, ...]):
+        columns = [name for name in names if name != "stats"] or ["id"]
+        query = select_schema(Client, ClientOut, columns).where(Client.id == client_id)
+        if "stats" in names:
+            query = query.add_columns(
+                ClientStats.order_count, ClientStats.total_spent, ClientStats.last_order_at
+            ).outerjoin(ClientStats, ClientStats.client_id == Client.id)
+        row = session.execute(query).mappings().first()
+        if not row:
+            return None
+        client = {name: row[name] for name in names if name != "stats"}
+        if "stats" in names:
+            order_count = row["order_count"] or 0
+            total_spent = row["total_spent"] or 0.0
+            client["stats"] = {
+                "order_count": order_count,
+                "total_spent": round(total_spent, 2),
+                "last_order_at": row["last_order_at"],
+                "average_ticket": round(total_spent / order_count, 2) if order_count else None,
+            }
+        return client
+
+    all_fields = tuple(ClientDetailOut.model_fields)
+    if fields != all_fields:
+        # Resposta parcial: só as colunas pedidas, sem o cache da linha completa
+        client = load(db, fields)
+    else:
+        client = cached_entity(
+            entity_key("client", client_id), lambda session: load(session, all_fields), primary, db
+        )
 
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
-    return client
+    return ORJSONResponse(client)
+
+
+@router.get(
+    "/{client_id}/orders",
+    response_model=CursorPage[ClientOrderOut],
+    responses={
+        200: {
+            "description": "Histórico de pedidos do cliente",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {
+                                "id": 7,
+                                "status": "delivered",
+                                "created_at": "2025-05-25",
+                                "total": 65.0,
+                                "products": [
+                                    {
+                                        "product_id": 1,
+                                        "description": "Camiseta Branca",
+                                        "quantity": 2,
+                                        "unit_price": 25.0,
+                                        "total": 50.0
+                                    },
+                                    {
+                                        "product_id": 2,
+                                        "description": "Meia",
+                                        "quantity": 1,
+                                        "unit_price": 15.0,
+                                        "total": 15.0
+                                    }
+                                ]
+                            }
+                        ],
+                        "next_cursor": "WyIyMDI1LTA1LTI1Iiw3XQ"
+                    }
+                }
+            },
+        },
+        400: {"description": "Invalid cursor."},
+        404: {"description": "Client not found"},
+    },
+)
+def list_client_orders(
+    client_id: int,
+    db: Session = Depends(get_read_db),
+    _: str = Depends(get_current_seller),
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Lista o histórico de pedidos de um cliente, do mais recente ao mais antigo.
+
+    - Cada pedido traz seus itens com descrição, quantidade, preço unitário
+      e total da linha, além do total do pedido.
+    - O preço unitário é o registrado no momento do pedido; para pedidos
+      antigos, sem esse registro, é usado o preço atual do produto.
+    - Permite filtrar por status e por período (start_date/end_date).
+    - Usa paginação por cursor: envie o `next_cursor` da resposta para obter
+      a próxima página.
+    - Pedidos e itens são carregados com uma única consulta, usando o índice
+      (client_id, created_at, id) de pedidos.
+
+    **Casos de uso:**
+    - Atendimento ao cliente: consultar as compras de um cliente em uma só tela.
+    - Conferência de valores cobrados em pedidos anteriores.
+    """
+    page = select(Order.id, Order.status, Order.created_at).where(Order.client_id == client_id)
+
+    if status:
+        page = page.where(Order.status == status.value)
+    if start_date:
+        page = page.where(Order.created_at >= start_date)
+    if end_date:
+        page = page.where(Order.created_at <= end_date)
+    if cursor:
+        last_date, last_id = decode_cursor(cursor, date.fromisoformat, int)
+        page = page.where(
+            tuple_(Order.created_at, Order.id) < tuple_(last_date, last_id)
+        )
+
+    page = (
+        page.order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            page.c.id,
+            page.c.status,
+            page.c.created_at,
+            OrderProduct.c.product_id,
+            OrderProduct.c.quantity,
+            func.coalesce(OrderProduct.c.unit_price, Product.price).label("unit_price"),
+            Product.description,
+        )
+        .select_from(page)
+        .outerjoin(
+            OrderProduct,
+            (OrderProduct.c.order_id == page.c.id)
+            & (OrderProduct.c.order_created_at == page.c.created_at),
+        )
+        .outerjoin(Product, Product.id == OrderProduct.c.product_id)
+        .order_by(page.c.created_at.desc(), page.c.id.desc(), OrderProduct.c.product_id)
+    ).all()
+
+    orders = {}
+    for row in rows:
+        order = orders.get(row.id)
+        if order is None:
+            order = orders[row.id] = {
+                "id": row.id,
+                "status": row.status,
+                "created_at": row.created_at,
+                "total": 0.0,
+                "products": [],
+            }
+        if row.product_id is None:
+            continue
+        line_total = row.quantity * row.unit_price
+        order["products"].append(
+            {
+                "product_id": row.product_id,
+                "description": row.description,
+                "quantity": row.quantity,
+                "unit_price": row.unit_price,
+                "total": line_total,
+            }
+        )
+        order["total"] += line_total
+
+    items = list(orders.values())
+    if not items and not db.query(Client.id).filter(Client.id == client_id).first():
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
 
 
 @router.put(
@@ -183,6 +616,7 @@ def get_client(
                 }
             },
         },
+        400: {"description": "Email ou CPF já existe."},
         404: {"description": "Client not found"},
     },
 )
@@ -203,31 +637,26 @@ def update_client(
     - Correção de dados cadastrais.
     - Atualização de informações para contato ou entrega.
     """
-    client = db.query(Client).filter(Client.id == client_id).first()
+    try:
+        client = db.execute(
+            update(Client)
+            .where(Client.id == client_id)
+            .values(**client_in.model_dump(exclude_unset=True))
+            .returning(Client)
+        ).scalar_one_or_none()
+        invalidate_on_commit(db, entity_key("client", client_id))
+    except IntegrityError as e:
+        db.rollback()
+        constraint = unique_violation(e)
+        if constraint and "email" in constraint:
+            raise HTTPException(status_code=400, detail="Email already exists.")
+        if constraint and "cpf" in constraint:
+            raise HTTPException(status_code=400, detail="CPF already exists.")
+        raise HTTPException(status_code=400, detail="Invalid client data.")
 
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
-    existing_email = db.query(Client).filter(Client.email == client_in.email).first()
-    existing_cpf = db.query(Client).filter(Client.cpf == client_in.cpf).first()
-
-    if existing_email and existing_email.id != client_id:
-        raise HTTPException(
-            status_code=400,
-            detail="Email already exists.",
-        )
-    if existing_cpf and existing_cpf.id != client_id:
-        raise HTTPException(
-            status_code=400,
-            detail="CPF already exists.",
-        )
-
-    for field, value in client_in.dict(exclude_unset=True).items():
-        setattr(client, field, value)
-
-    db.commit()
-    db.refresh(client)
-
     return client
 
 
@@ -259,6 +688,7 @@ def delete_client(
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
+    invalidate_on_commit(db, entity_key("client", client_id))
     db.delete(client)
     db.commit()
 
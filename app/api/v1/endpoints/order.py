@@ -1,20 +1,89 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import List, Optional, Sequence, Tuple
 import logging
 import sentry_sdk
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_seller, get_db
+from app.api.deps import get_current_seller, get_db, get_read_db, sparse_fields
+from app.core.archive import find_archived_order
+from app.core.cache import data_version_key, invalidate_on_commit
+from app.core.responses import ORJSONResponse
+from app.integrations.whatsapp.queue import enqueue_whatsapp_messages
 from app.integrations.whatsapp.whatsapp import send_whatsapp_message
 from app.models.client import Client
 from app.models.order import Order, OrderProduct, OrderStatusHistory
 from app.models.product import Product
-from app.schemas.order import OrderCreate, OrderOut, OrderUpdateStatus
+from app.models.user import User
+from app.repositories.client_stats import order_totals, record_client_orders, remove_client_orders
+from app.repositories.count import count_rows
+from app.repositories.idempotency import (
+    IdempotencyKeyInProgress,
+    IdempotencyKeyMismatch,
+    claim_idempotency_key,
+    complete_idempotency_key,
+    release_idempotency_key,
+    request_fingerprint,
+)
+from app.repositories.stock import InsufficientStock, apply_stock_movements
+from app.schemas.order import (
+    OrderBulkStatusResult,
+    OrderBulkStatusUpdate,
+    OrderCreate,
+    OrderOut,
+    OrderStatus,
+    OrderTimelineOut,
+    OrderUpdateStatus,
+    allowed_previous_statuses,
+    transition_not_allowed,
+)
+from app.schemas.pagination import CountMode
+from app.schemas.stock import StockMovementReason
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
+def _select_orders(fields: Sequence[str]):
+    # id e created_at são sempre consultados para associar os itens (created_at
+    # limita as partições lidas); saem da resposta se não foram pedidos
+    return select(
+        Order.id,
+        Order.created_at,
+        *(getattr(Order, name) for name in fields if name not in ("id", "created_at", "products")),
+    )
+
+
+def _load_orders(db: Session, query, fields: Sequence[str]) -> List[dict]:
+    """
+    Executa a consulta de pedidos e monta a resposta só com os campos pedidos.
+    Os itens de todos os pedidos são carregados em uma única consulta, e apenas
+    quando `products` faz parte dos campos.
+    """
+    rows = db.execute(query).mappings().all()
+    orders = {row["id"]: {name: row[name] for name in fields if name != "products"} for row in rows}
+
+    if "products" in fields and orders:
+        for order in orders.values():
+            order["products"] = []
+        dates = [row["created_at"] for row in rows]
+        lines = db.execute(
+            select(OrderProduct.c.order_id, OrderProduct.c.product_id, OrderProduct.c.quantity)
+            .where(
+                OrderProduct.c.order_id.in_(orders),
+                OrderProduct.c.order_created_at.between(min(dates), max(dates)),
+            )
+            .order_by(OrderProduct.c.order_id, OrderProduct.c.product_id)
+        )
+        for line in lines:
+            orders[line.order_id]["products"].append(
+                {"product_id": line.product_id, "quantity": line.quantity}
+            )
+
+    return list(orders.values())
+
+
 @router.post(
     "/",
     response_model=OrderOut,
@@ -22,6 +91,12 @@ router = APIRouter(prefix="/orders", tags=["orders"])
     responses={
         201: {
             "description": "Pedido criado com sucesso",
+            "headers": {
+                "Idempotent-Replayed": {
+                    "description": "true quando a resposta é a gravada para a mesma Idempotency-Key",
+                    "schema": {"type": "string"},
+                }
+            },
             "content": {
                 "application/json": {
                     "example": {
@@ -39,30 +114,74 @@ router = APIRouter(prefix="/orders", tags=["orders"])
         },
         404: {"description": "Client or product not found."},
         400: {"description": "Estoque insuficiente."},
+        409: {"description": "Requisição com a mesma Idempotency-Key ainda em processamento."},
+        422: {"description": "Idempotency-Key já usada com outro corpo de requisição."},
     },
 )
 def create_order(
     order_in: OrderCreate,
     db: Session = Depends(get_db),
-    _: str = Depends(get_current_seller),
+    current_user: User = Depends(get_current_seller),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
 ):
+    """
+    Cria um novo pedido para um cliente.
+
+    - O cliente deve existir no banco de dados.
+    - Todos os produtos informados devem existir e ter estoque suficiente.
+    - O estoque de cada produto é decrementado conforme a quantidade solicitada,
+      com o registro da saída no livro de movimentações de estoque.
+    - O pedido é criado com status inicial "pending".
+    - Uma mensagem de WhatsApp é enviada ao cliente confirmando o recebimento do pedido.
+    - Retorna o pedido criado, incluindo os produtos e quantidades.
+    - Com o header `Idempotency-Key`, repetições da mesma requisição (mesmo usuário,
+      chave e corpo) devolvem a resposta original, com `Idempotent-Replayed: true`,
+      sem criar outro pedido. Uma repetição que chega enquanto a original ainda
+      está em processamento aguarda o resultado dela. As chaves expiram após
+      IDEMPOTENCY_KEY_TTL_HOURS horas.
+
+    **Casos de uso:**
+    - Vendedor realiza um novo pedido para um cliente já cadastrado.
+    - Integração com WhatsApp para notificação automática do cliente.
+    - Garante integridade de estoque e validação de existência de cliente/produto.
+    - Clientes que reenviam o pedido após timeout ou queda de conexão sem duplicá-lo.
+    """
+    if not idempotency_key:
+        return _create_order(db, order_in, current_user)
+
+    try:
+        stored = claim_idempotency_key(
+            current_user.id, idempotency_key, request_fingerprint(order_in.model_dump_json())
+        )
+    except IdempotencyKeyMismatch:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request body.",
+        )
+    except IdempotencyKeyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress.",
+        )
+
+    if stored is not None:
+        return ORJSONResponse(
+            stored.body, status_code=stored.status_code, headers={"Idempotent-Replayed": "true"}
+        )
+
+    try:
+        return _create_order(db, order_in, current_user, idempotency_key)
+    except Exception:
+        db.rollback()
+        release_idempotency_key(current_user.id, idempotency_key)
+        raise
+
+
+def _create_order(
+    db: Session, order_in: OrderCreate, current_user: User, idempotency_key: Optional[str] = None
+) -> OrderOut:
     logger = logging.getLogger(__name__)
     try:
-        """
-        Cria um novo pedido para um cliente.
-
-        - O cliente deve existir no banco de dados.
-        - Todos os produtos informados devem existir e ter estoque suficiente.
-        - O estoque de cada produto é decrementado conforme a quantidade solicitada.
-        - O pedido é criado com status inicial "pending".
-        - Uma mensagem de WhatsApp é enviada ao cliente confirmando o recebimento do pedido.
-        - Retorna o pedido criado, incluindo os produtos e quantidades.
-        
-        **Casos de uso:**
-        - Vendedor realiza um novo pedido para um cliente já cadastrado.
-        - Integração com WhatsApp para notificação automática do cliente.
-        - Garante integridade de estoque e validação de existência de cliente/produto.
-        """
         client = db.query(Client).filter(Client.id == order_in.client_id).first()
 
         if not client:
@@ -71,52 +190,70 @@ def create_order(
                 detail="Client not found.",
             )
 
-        for item in order_in.products:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
+        products = {
+            product.id: product
+            for product in db.query(Product).filter(
+                Product.id.in_({item.product_id for item in order_in.products})
+            )
+        }
 
-            if not product:
+        for item in order_in.products:
+            if item.product_id not in products:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Product with id {item.product_id} not found.",
                 )
 
-            if product.stock < item.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for product {product.description}.",
-                )
-
-            product.stock -= item.quantity
-
         order = Order(
             client_id=order_in.client_id, status="pending", created_at=order_in.created_at
         )
 
         db.add(order)
-        db.commit()
-        db.refresh(order)
+        db.flush()
+
+        try:
+            apply_stock_movements(
+                db,
+                [(item.product_id, -item.quantity) for item in order_in.products],
+                reason=StockMovementReason.order.value,
+                order_id=order.id,
+                user_id=current_user.id,
+            )
+        except InsufficientStock as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient stock for product {products[e.product_id].description}.",
+            )
 
         # Adiciona produtos na relação many-to-many e insere quantidade na tabela associativa
-        for item in order_in.products:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if product:
-                db.execute(
-                    OrderProduct.insert().values(
-                        order_id=order.id,
-                        product_id=product.id,
-                        quantity=item.quantity,
-                    )
-                )
-        db.commit()
-
-        send_whatsapp_message(
-            client.phone,
-            f"Recebemos seu pedido #{order.id}. Assim que o pagamento for aprovado te avisaremos.",
+        if order_in.products:
+            db.execute(
+                OrderProduct.insert(),
+                [
+                    {
+                        "order_id": order.id,
+                        "order_created_at": order.created_at,
+                        "product_id": item.product_id,
+                        "quantity": item.quantity,
+                        "unit_price": products[item.product_id].price,
+                    }
+                    for item in order_in.products
+                ],
+            )
+        record_client_orders(
+            db,
+            order.client_id,
+            1,
+            sum(item.quantity * products[item.product_id].price for item in order_in.products),
+            order.created_at,
         )
 
         # Montar resposta no formato do schema
         result = db.execute(
-            OrderProduct.select().where(OrderProduct.c.order_id == order.id)
+            OrderProduct.select().where(
+                OrderProduct.c.order_id == order.id,
+                OrderProduct.c.order_created_at == order.created_at,
+            )
         )
         products = [
             {"product_id": row.product_id, "quantity": row.quantity}
@@ -129,6 +266,24 @@ def create_order(
             created_at=order.created_at,
             products=products,
         )
+
+        # A resposta é gravada na mesma transação do pedido
+        if idempotency_key:
+            complete_idempotency_key(
+                db,
+                current_user.id,
+                idempotency_key,
+                status.HTTP_201_CREATED,
+                order_out.model_dump(mode="json"),
+            )
+        # Resultados de analytics calculados antes deste pedido deixam de valer
+        invalidate_on_commit(db, data_version_key("orders"))
+        db.commit()
+
+        send_whatsapp_message(
+            client.phone,
+            f"Recebemos seu pedido #{order.id}. Assim que o pagamento for aprovado te avisaremos.",
+        )
         return order_out
     except HTTPException:
         raise
@@ -145,6 +300,12 @@ def create_order(
     responses={
         200: {
             "description": "Lista de pedidos",
+            "headers": {
+                "X-Total-Count": {
+                    "description": "Total de registros com os filtros aplicados (apenas com o parâmetro count)",
+                    "schema": {"type": "integer"},
+                }
+            },
             "content": {
                 "application/json": {
                     "example": [
@@ -164,7 +325,7 @@ def create_order(
     },
 )
 def list_orders(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: str = Depends(get_current_seller),
     client_id: Optional[int] = None,
     status: Optional[str] = None,
@@ -172,50 +333,138 @@ def list_orders(
     end_date: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
+    count: Optional[CountMode] = None,
+    fields: Tuple[str, ...] = Depends(sparse_fields(OrderOut)),
 ):
     """
     Lista todos os pedidos cadastrados, com filtros opcionais.
 
     - Permite filtrar por cliente, status, data de início e fim.
     - Retorna os pedidos paginados (parâmetros skip e limit).
-    - Cada pedido inclui os produtos e quantidades associadas.
+    - Cada pedido inclui os produtos e quantidades associadas, carregados
+      em uma única consulta para toda a página.
+    - Consulta apenas as colunas da resposta, sem carregar entidades na sessão.
+    - Com `count=exact` retorna o total de registros no cabeçalho `X-Total-Count`;
+      com `count=estimate`, uma estimativa do banco, mais barata em tabelas grandes.
+    - O parâmetro `fields` limita as colunas consultadas e os campos da resposta
+      (ex: `fields=id,status,created_at`).
     
     **Casos de uso:**
     - Consulta geral de pedidos para acompanhamento.
     - Filtros para relatórios ou buscas específicas por cliente, período ou status.
     """
-    query = db.query(Order)
+    query = _select_orders(fields)
 
     if client_id:
-        query = query.filter(Order.client_id == client_id)
+        query = query.where(Order.client_id == client_id)
     if status:
-        query = query.filter(Order.status == status)
+        query = query.where(Order.status == status)
     if start_date and end_date:
-        query = query.filter(Order.created_at.between(start_date, end_date))
+        query = query.where(Order.created_at.between(start_date, end_date))
     if start_date and not end_date:
-        query = query.filter(Order.created_at >= start_date)
+        query = query.where(Order.created_at >= start_date)
     if end_date and not start_date:
-        query = query.filter(Order.created_at <= end_date)
+        query = query.where(Order.created_at <= end_date)
 
-    orders = query.offset(skip).limit(limit).all()
-    order_out_list = []
-    for order in orders:
-        result = db.execute(
-            OrderProduct.select().where(OrderProduct.c.order_id == order.id)
+    orders = _load_orders(db, query.offset(skip).limit(limit), fields)
+
+    headers = {"X-Total-Count": str(count_rows(db, query, count))} if count else None
+    return ORJSONResponse(orders, headers=headers)
+
+
+@router.get(
+    "/timeline",
+    response_model=List[OrderTimelineOut],
+    responses={
+        200: {
+            "description": "Histórico de status de vários pedidos",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "order_id": 1,
+                            "status": "shipped",
+                            "history": [
+                                {
+                                    "previous_status": "pending",
+                                    "new_status": "processing",
+                                    "changed_at": "2025-05-25T14:03:00+00:00",
+                                    "changed_by": 2
+                                },
+                                {
+                                    "previous_status": "processing",
+                                    "new_status": "shipped",
+                                    "changed_at": "2025-05-26T09:40:00+00:00",
+                                    "changed_by": 3
+                                }
+                            ]
+                        }
+                    ]
+                }
+            },
+        },
+        400: {"description": "Invalid ids."},
+    },
+)
+def get_orders_timeline(
+    db: Session = Depends(get_read_db),
+    _: str = Depends(get_current_seller),
+    ids: str = Query(..., description="IDs dos pedidos separados por vírgula (máximo 100)"),
+):
+    """
+    Retorna o status atual e o histórico de status de vários pedidos.
+
+    - Carrega os pedidos e seus históricos em uma única consulta.
+    - Cada mudança de status informa quando ocorreu e qual usuário a fez.
+    - Pedidos inexistentes são omitidos da resposta.
+
+    **Casos de uso:**
+    - Tela de rastreamento com uma página de pedidos.
+    - Auditoria de mudanças de status.
+    """
+    try:
+        order_ids = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        order_ids = []
+    if not order_ids or len(order_ids) > 100:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ids.")
+
+    rows = db.execute(
+        select(
+            Order.id,
+            Order.status,
+            OrderStatusHistory.previous_status,
+            OrderStatusHistory.new_status,
+            OrderStatusHistory.changed_at,
+            OrderStatusHistory.changed_by,
         )
-        products = [
-            {"product_id": row.product_id, "quantity": row.quantity}
-            for row in result.fetchall()
-        ]
-        order_out = OrderOut(
-            id=order.id,
-            client_id=order.client_id,
-            status=order.status,
-            created_at=order.created_at,
-            products=products,
+        .outerjoin(
+            OrderStatusHistory,
+            (OrderStatusHistory.order_id == Order.id)
+            & (OrderStatusHistory.order_created_at == Order.created_at),
+        )
+        .where(Order.id.in_(order_ids))
+        .order_by(Order.id, OrderStatusHistory.changed_at, OrderStatusHistory.id)
+    ).all()
+
+    timelines = {}
+    for row in rows:
+        timeline = timelines.setdefault(
+            row.id, {"order_id": row.id, "status": row.status, "history": []}
         )
-        order_out_list.append(order_out)
-    return order_out_list
+        if row.new_status is not None:
+            timeline["history"].append(
+                {
+                    "previous_status": row.previous_status,
+                    "new_status": row.new_status,
+                    "changed_at": row.changed_at,
+                    "changed_by": row.changed_by,
+                }
+            )
+
+    return ORJSONResponse(
+        [timelines[order_id] for order_id in order_ids if order_id in timelines]
+    )
 
 
 @router.get(
@@ -243,43 +492,160 @@ def list_orders(
 )
 def get_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: str = Depends(get_current_seller),
+    fields: Tuple[str, ...] = Depends(sparse_fields(OrderOut)),
 ):
     """
     Busca um pedido pelo seu ID.
 
     - Retorna todos os dados do pedido, incluindo produtos e quantidades.
+    - O parâmetro `fields` limita as colunas consultadas e os campos da resposta
+      (ex: `fields=id,status,created_at`).
+    - Pedidos antigos já arquivados são buscados no arquivo frio, com a mesma resposta.
     - Retorna erro 404 caso o pedido não exista.
     
     **Casos de uso:**
     - Visualização detalhada de um pedido específico.
     - Consulta para acompanhamento de status e itens do pedido.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    orders = _load_orders(db, _select_orders(fields).where(Order.id == order_id), fields)
+    if orders:
+        return ORJSONResponse(orders[0])
 
-    if not order:
+    archived = find_archived_order(order_id)
+    if archived is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found."
         )
-
-    # Buscar produtos e quantidades na tabela associativa
-    result = db.execute(
-        OrderProduct.select().where(OrderProduct.c.order_id == order.id)
-    )
-    products = [
-        {"product_id": row.product_id, "quantity": row.quantity}
-        for row in result.fetchall()
+    archived["products"] = [
+        {"product_id": line["product_id"], "quantity": line["quantity"]}
+        for line in archived["products"]
     ]
+    return ORJSONResponse({name: archived[name] for name in fields})
 
-    order_out = OrderOut(
-        id=order.id,
-        client_id=order.client_id,
-        status=order.status,
-        created_at=order.created_at,
-        products=products,
+
+@router.put(
+    "/status",
+    response_model=OrderBulkStatusResult,
+    responses={
+        200: {
+            "description": "Status atualizado nos pedidos elegíveis",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "updated": [1, 2],
+                        "skipped": [
+                            {"order_id": 3, "detail": "Transition from delivered to shipped not allowed."},
+                            {"order_id": 4, "detail": "Order not found."}
+                        ]
+                    }
+                }
+            },
+        },
+    },
+)
+def bulk_update_order_status(
+    status_in: OrderBulkStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_seller),
+):
+    """
+    Atualiza o status de vários pedidos de uma só vez.
+
+    - Só atualiza pedidos cujo status atual permite a transição
+      (pending → processing/canceled, processing → shipped/canceled, shipped → delivered).
+    - Atualiza todos os pedidos elegíveis com um único UPDATE ... RETURNING
+      e grava o histórico de status com um único INSERT de múltiplas linhas.
+    - As mensagens de WhatsApp são enfileiradas e enviadas em background.
+    - Retorna os pedidos atualizados e, para os demais, o motivo.
+
+    **Casos de uso:**
+    - Expedição: marcar como enviados todos os pedidos de uma carga.
+    - Cancelamento em lote de pedidos pendentes.
+    """
+    new_status = status_in.status.value
+    order_ids = list(dict.fromkeys(status_in.order_ids))
+    eligible = allowed_previous_statuses(status_in.status)
+
+    rows = []
+    if eligible:
+        # Trava os pedidos elegíveis para que o status anterior lido aqui
+        # seja o mesmo que o UPDATE abaixo vai substituir.
+        previous = {
+            row.id: row
+            for row in db.execute(
+                select(Order.id, Order.client_id, Order.created_at, Order.status, Client.phone)
+                .join(Client, Client.id == Order.client_id)
+                .where(Order.id.in_(order_ids), Order.status.in_(eligible))
+                .with_for_update(of=Order)
+            )
+        }
+        if previous:
+            updated = db.execute(
+                update(Order)
+                .where(Order.id.in_(previous), Order.status.in_(eligible))
+                .values(status=new_status)
+                .returning(Order.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            rows = [previous[order_id] for order_id in updated]
+
+    if rows:
+        db.execute(
+            insert(OrderStatusHistory),
+            [
+                {
+                    "order_id": row.id,
+                    "order_created_at": row.created_at,
+                    "previous_status": row.status,
+                    "new_status": new_status,
+                    "changed_by": current_user.id,
+                }
+                for row in rows
+            ],
+        )
+
+    # Pedidos cancelados saem das estatísticas dos clientes
+    if rows and new_status == OrderStatus.canceled.value:
+        totals = order_totals(db, [(row.id, row.created_at) for row in rows])
+        canceled = defaultdict(lambda: (0, 0.0))
+        for row in rows:
+            count, spent = canceled[row.client_id]
+            canceled[row.client_id] = (count + 1, spent + totals[row.id])
+        remove_client_orders(db, canceled)
+
+    updated_ids = {row.id for row in rows}
+    skipped_ids = [order_id for order_id in order_ids if order_id not in updated_ids]
+    current_statuses = {}
+    if skipped_ids:
+        current_statuses = dict(
+            db.query(Order.id, Order.status).filter(Order.id.in_(skipped_ids)).all()
+        )
+
+    if rows:
+        invalidate_on_commit(db, data_version_key("orders"))
+    db.commit()
+
+    enqueue_whatsapp_messages(
+        (row.phone, f"Seu pedido # {row.id} foi atualizado para o status {new_status}.")
+        for row in rows
     )
-    return order_out
+
+    return {
+        "updated": [order_id for order_id in order_ids if order_id in updated_ids],
+        "skipped": [
+            {
+                "order_id": order_id,
+                "detail": (
+                    transition_not_allowed(current_statuses[order_id], status_in.status)
+                    if order_id in current_statuses
+                    else "Order not found."
+                ),
+            }
+            for order_id in skipped_ids
+        ],
+    }
 
 
 @router.put(
@@ -311,7 +677,7 @@ def update_order(
     order_id: int,
     order_in: OrderCreate,
     db: Session = Depends(get_db),
-    _: str = Depends(get_current_seller),
+    current_user: User = Depends(get_current_seller),
 ):
     logger = logging.getLogger(__name__)
     try:
@@ -321,6 +687,7 @@ def update_order(
         - Permite alterar o cliente do pedido e os produtos/quantidades.
         - Valida existência do cliente e dos produtos, além do estoque disponível.
         - Atualiza a tabela associativa de produtos do pedido.
+        - Registra no livro de estoque apenas a diferença de quantidade de cada produto.
         - Retorna erro 404 caso o pedido não exista.
         - Retorna erro 400 caso algum produto não exista ou não haja estoque suficiente.
 
@@ -328,7 +695,8 @@ def update_order(
         - Correção de pedidos lançados com informações erradas.
         - Alteração de itens ou cliente antes do processamento do pedido.
         """
-        order = db.query(Order).filter(Order.id == order_id).first()
+        # Trava o pedido: o status lido aqui decide se ele conta nas estatísticas
+        order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
         if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found.")
 
@@ -336,33 +704,72 @@ def update_order(
         if not client:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found.")
 
-        # Repor estoque dos produtos antigos
-        result = db.execute(OrderProduct.select().where(OrderProduct.c.order_id == order.id))
-        for row in result.fetchall():
-            product = db.query(Product).filter(Product.id == row.product_id).first()
-            if product:
-                product.stock += row.quantity
+        products = {
+            product.id: product
+            for product in db.query(Product).filter(
+                Product.id.in_({item.product_id for item in order_in.products})
+            )
+        }
+        for item in order_in.products:
+            if item.product_id not in products:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product with id {item.product_id} not found.")
 
-        # Limpar produtos antigos do pedido
-        db.execute(OrderProduct.delete().where(OrderProduct.c.order_id == order.id))
-        db.commit()
+        # Valor anterior do pedido, para as estatísticas do cliente
+        counted = order.status != OrderStatus.canceled.value
+        if counted:
+            previous_total = order_totals(db, [(order.id, order.created_at)])[order.id]
 
-        # Validar e atualizar produtos/quantidades
+        # Diferença de estoque: repõe os itens antigos e retira os novos
+        changes = defaultdict(int)
+        result = db.execute(OrderProduct.select().where(OrderProduct.c.order_id == order.id, OrderProduct.c.order_created_at == order.created_at))
+        for row in result.fetchall():
+            changes[row.product_id] += row.quantity
         for item in order_in.products:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if not product:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product with id {item.product_id} not found.")
-            if product.stock < item.quantity:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient stock for product {product.description}.")
-            product.stock -= item.quantity
-            db.execute(OrderProduct.insert().values(order_id=order.id, product_id=product.id, quantity=item.quantity))
+            changes[item.product_id] -= item.quantity
+
+        try:
+            apply_stock_movements(
+                db,
+                changes.items(),
+                reason=StockMovementReason.order_update.value,
+                order_id=order.id,
+                user_id=current_user.id,
+            )
+        except InsufficientStock as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient stock for product {products[e.product_id].description}.")
+
+        # Substituir produtos do pedido
+        db.execute(OrderProduct.delete().where(OrderProduct.c.order_id == order.id, OrderProduct.c.order_created_at == order.created_at))
+        if order_in.products:
+            db.execute(
+                OrderProduct.insert(),
+                [
+                    {
+                        "order_id": order.id,
+                        "order_created_at": order.created_at,
+                        "product_id": item.product_id,
+                        "quantity": item.quantity,
+                        "unit_price": products[item.product_id].price,
+                    }
+                    for item in order_in.products
+                ],
+            )
 
+        previous_client_id = order.client_id
         order.client_id = order_in.client_id
+        if counted:
+            total = sum(item.quantity * products[item.product_id].price for item in order_in.products)
+            if previous_client_id != order.client_id:
+                remove_client_orders(db, {previous_client_id: (1, previous_total)})
+                record_client_orders(db, order.client_id, 1, total, order.created_at)
+            else:
+                record_client_orders(db, order.client_id, 0, total - previous_total, None)
+        invalidate_on_commit(db, data_version_key("orders"))
         db.commit()
         db.refresh(order)
 
         # Montar resposta
-        result = db.execute(OrderProduct.select().where(OrderProduct.c.order_id == order.id))
+        result = db.execute(OrderProduct.select().where(OrderProduct.c.order_id == order.id, OrderProduct.c.order_created_at == order.created_at))
         products = [
             {"product_id": row.product_id, "quantity": row.quantity}
             for row in result.fetchall()
@@ -395,6 +802,7 @@ def update_order(
                 }
             },
         },
+        400: {"description": "Transition from delivered to pending not allowed."},
         404: {"description": "Order not found."},
     },
 )
@@ -402,20 +810,25 @@ def update_order_status(
     order_id: int,
     status_update: OrderUpdateStatus,
     db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_seller),
 ):
     """
     Atualiza o status de um pedido existente.
 
-    - Permite alterar o status do pedido (ex: pending, processing, shipped, delivered, canceled).
-    - Registra o histórico de status do pedido.
+    - Permite alterar o status do pedido (ex: pending, processing, shipped, delivered, canceled),
+      seguindo as mesmas transições da atualização em lote
+      (pending → processing/canceled, processing → shipped/canceled, shipped → delivered).
+    - Registra o histórico de status do pedido, com data/hora e usuário responsável.
     - Envia mensagem de WhatsApp ao cliente informando a atualização do status.
-    - Retorna erro 404 caso o pedido não exista.
+    - Pedidos cancelados saem das estatísticas do cliente (client_stats).
+    - Retorna erro 400 caso a transição não seja permitida e 404 caso o pedido não exista.
     
     **Casos de uso:**
     - Mudança de status operacional (ex: pedido enviado, entregue, cancelado).
     - Comunicação automática com o cliente sobre o andamento do pedido.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Trava o pedido para que a transição seja validada contra o status que será substituído
+    order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
 
     if not order:
         raise HTTPException(
@@ -423,15 +836,28 @@ def update_order_status(
         )
 
     previous_status = order.status
-    order.status = status_update.status
+    if previous_status not in allowed_previous_statuses(status_update.status):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=transition_not_allowed(previous_status, status_update.status),
+        )
+    order.status = status_update.status.value
 
     status_hystory = OrderStatusHistory(
         order_id=order.id,
+        order_created_at=order.created_at,
         previous_status=previous_status,
         new_status=order.status,
+        changed_by=current_user.id,
     )
 
     db.add(status_hystory)
+
+    # Pedidos cancelados não contam nas estatísticas do cliente (canceled é um status final)
+    if order.status == OrderStatus.canceled.value:
+        total = order_totals(db, [(order.id, order.created_at)])[order.id]
+        remove_client_orders(db, {order.client_id: (1, total)})
+    invalidate_on_commit(db, data_version_key("orders"))
     db.commit()
 
     # Buscar o cliente manualmente para garantir acesso ao telefone
@@ -462,20 +888,29 @@ def delete_order(
     Remove um pedido do sistema.
 
     - Exclui o pedido e suas associações de produtos.
+    - Desconta o pedido das estatísticas do cliente (client_stats).
     - Retorna erro 404 caso o pedido não exista.
     
     **Casos de uso:**
     - Exclusão de pedidos criados por engano ou cancelados antes do processamento.
     - Limpeza de dados antigos ou testes.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Trava o pedido: o status lido aqui decide se ele sai das estatísticas
+    order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
 
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found."
         )
 
+    counted = order.status != OrderStatus.canceled.value
+    if counted:
+        total = order_totals(db, [(order.id, order.created_at)])[order.id]
+
     db.delete(order)
+    if counted:
+        remove_client_orders(db, {order.client_id: (1, total)})
+    invalidate_on_commit(db, data_version_key("orders"))
     db.commit()
 
     return None
@@ -1,17 +1,57 @@
-from typing import List, Optional
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 import logging
 import sentry_sdk
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_seller, get_db
+from app.api.deps import (
+    get_current_admin,
+    get_current_seller,
+    get_db,
+    get_read_db,
+    sparse_fields,
+)
+from app.core.cache import cached_entity, data_version_key, entity_key, invalidate_on_commit
+from app.core.database import unique_violation
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import ORJSONResponse, model_rows, row_dicts, select_schema
 from app.models.product import Product
+from app.models.stock_movement import StockMovement
 from app.models.user import User
-from app.schemas.product import ProductCreate, ProductOut, ProductUpdate
+from app.repositories.count import count_rows
+from app.repositories.stock import InsufficientStock, apply_stock_movements
+from app.schemas.pagination import CountMode, CursorPage
+from app.schemas.product import (
+    ProductCreate,
+    ProductOut,
+    ProductUpdate,
+    SectionReorderThreshold,
+)
+from app.schemas.stock import StockMovementCreate, StockMovementOut, StockMovementReason
+from app.tasks.low_stock import get_low_stock_products
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+
+def _raise_product_conflict(e: IntegrityError):
+    constraint = unique_violation(e)
+    if constraint and "description" in constraint:
+        raise HTTPException(
+            status_code=400,
+            detail="Product with this name already exists.",
+        )
+    if constraint and "barcode" in constraint:
+        raise HTTPException(
+            status_code=400,
+            detail="Product with this barcode already exists.",
+        )
+    raise HTTPException(status_code=400, detail="Invalid product data.")
+
+
 @router.post(
     "/",
     response_model=ProductOut,
@@ -27,6 +67,7 @@ router = APIRouter(prefix="/products", tags=["products"])
                         "barcode": "1234567890123",
                         "section": "Roupas",
                         "stock": 10,
+                        "reorder_threshold": 3,
                         "expiration_date": "2025-12-31",
                         "image": "https://exemplo.com/camiseta.jpg"
                     }
@@ -39,26 +80,31 @@ router = APIRouter(prefix="/products", tags=["products"])
 def create_product(
     product_in: ProductCreate,
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_seller),
+    current_user: User = Depends(get_current_seller),
 ):
     logger = logging.getLogger(__name__)
     try:
-        existing_product = db.query(Product).filter(Product.description == product_in.description).first()
-
-        if existing_product:
-            raise HTTPException(
-                status_code=400,
-                detail="Product with this name already exists.",
-            )
-
         product = Product(**product_in.model_dump())  # Usando model_dump() em vez de dict()
         db.add(product)
-        db.flush()  # Atualiza o ID sem fazer commit
-        db.refresh(product)
+        db.flush()  # INSERT ... RETURNING id, sem fazer commit
+
+        if product.stock:
+            # Saldo inicial no livro de movimentações de estoque
+            db.execute(
+                insert(StockMovement).values(
+                    product_id=product.id,
+                    quantity=product.stock,
+                    reason=StockMovementReason.opening.value,
+                    user_id=current_user.id,
+                )
+            )
 
         return product
     except HTTPException:
         raise
+    except IntegrityError as e:
+        db.rollback()
+        _raise_product_conflict(e)
     except Exception as e:
         db.rollback()
         logger.error("Erro inesperado ao criar produto: %s", str(e), exc_info=True)
@@ -71,6 +117,12 @@ def create_product(
     responses={
         200: {
             "description": "Lista de produtos",
+            "headers": {
+                "X-Total-Count": {
+                    "description": "Total de registros com os filtros aplicados (apenas com o parâmetro count)",
+                    "schema": {"type": "integer"},
+                }
+            },
             "content": {
                 "application/json": {
                     "example": [
@@ -81,6 +133,7 @@ def create_product(
                             "barcode": "1234567890123",
                             "section": "Roupas",
                             "stock": 10,
+                            "reorder_threshold": 3,
                             "expiration_date": "2025-12-31",
                             "image": "https://exemplo.com/camiseta.jpg"
                         }
@@ -91,33 +144,208 @@ def create_product(
     },
 )
 def list_products(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: str = Depends(get_current_seller),
     description: Optional[str] = None,
     section: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
+    count: Optional[CountMode] = None,
+    fields: Tuple[str, ...] = Depends(sparse_fields(ProductOut)),
 ):
     """
     Lista todos os produtos cadastrados, com filtros opcionais.
 
     - Permite filtrar por descrição e seção.
     - Retorna os produtos paginados (parâmetros skip e limit).
+    - Consulta apenas as colunas da resposta, sem carregar entidades na sessão.
+    - Com `count=exact` retorna o total de registros no cabeçalho `X-Total-Count`;
+      com `count=estimate`, uma estimativa do banco, mais barata em tabelas grandes.
+    - O parâmetro `fields` limita as colunas consultadas e os campos da resposta
+      (ex: `fields=id,description,price,stock`).
 
     **Casos de uso:**
     - Consulta geral de produtos para venda ou estoque.
     - Busca de produtos para pedidos ou relatórios.
     """
-    query = db.query(Product)
+    query = select_schema(Product, ProductOut, fields)
 
     if description:
-        query = query.filter(Product.description.ilike(f"%{description}%"))
+        query = query.where(Product.description.ilike(f"%{description}%"))
+    if section:
+        query = query.where(Product.section == section)
+
+    products = row_dicts(db.execute(query.offset(skip).limit(limit)))
+
+    headers = {"X-Total-Count": str(count_rows(db, query, count))} if count else None
+    return ORJSONResponse(products, headers=headers)
+
+@router.get(
+    "/low-stock",
+    response_model=List[ProductOut],
+    responses={
+        200: {
+            "description": "Produtos no ponto de reposição ou abaixo dele",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": 1,
+                            "description": "Camiseta Preta",
+                            "price": 49.9,
+                            "barcode": "1234567890123",
+                            "section": "Roupas",
+                            "stock": 2,
+                            "reorder_threshold": 3,
+                            "expiration_date": "2025-12-31",
+                            "image": "https://exemplo.com/camiseta.jpg"
+                        }
+                    ]
+                }
+            },
+        }
+    },
+)
+def list_low_stock_products(
+    db: Session = Depends(get_read_db),
+    _: str = Depends(get_current_seller),
+    section: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+):
+    """
+    Lista os produtos cujo estoque está no ponto de reposição ou abaixo dele.
+
+    - Permite filtrar por seção.
+    - Consulta apenas o índice parcial de produtos abaixo do ponto de reposição.
+    - Retorna os produtos ordenados por seção e estoque (parâmetros skip e limit).
+
+    **Casos de uso:**
+    - Planejamento de compras e reposição de estoque.
+    - Antecipar rupturas antes que um pedido falhe por estoque insuficiente.
+    """
+    products = get_low_stock_products(db, section=section).offset(skip).limit(limit).all()
+
+    return ORJSONResponse(model_rows(ProductOut, products))
+
+
+@router.get(
+    "/expiring",
+    response_model=CursorPage[ProductOut],
+    responses={
+        200: {
+            "description": "Produtos que vencem nos próximos dias",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {
+                                "id": 1,
+                                "description": "Iogurte Natural",
+                                "price": 4.5,
+                                "barcode": "7891234567890",
+                                "section": "Laticínios",
+                                "stock": 30,
+                                "reorder_threshold": 10,
+                                "expiration_date": "2025-06-03",
+                                "image": None
+                            }
+                        ],
+                        "next_cursor": "WyIyMDI1LTA2LTAzIiwxXQ"
+                    }
+                }
+            },
+        },
+        400: {"description": "Invalid cursor."},
+    },
+)
+def list_expiring_products(
+    db: Session = Depends(get_read_db),
+    _: str = Depends(get_current_seller),
+    within_days: int = Query(7, ge=0, le=365),
+    section: Optional[str] = None,
+    include_expired: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """
+    Lista os produtos que vencem nos próximos `within_days` dias.
+
+    - Permite filtrar por seção e incluir produtos já vencidos.
+    - Ordena por data de validade e usa paginação por cursor: envie o
+      `next_cursor` da resposta para obter a próxima página.
+    - A consulta usa os índices (section, expiration_date) e (expiration_date).
+
+    **Casos de uso:**
+    - Conferência diária de produtos próximos do vencimento.
+    - Planejamento de promoções e retirada de produtos das prateleiras.
+    """
+    today = date.today()
+    query = db.query(Product).filter(
+        Product.expiration_date <= today + timedelta(days=within_days)
+    )
+
+    if not include_expired:
+        query = query.filter(Product.expiration_date >= today)
     if section:
         query = query.filter(Product.section == section)
+    if cursor:
+        last_date, last_id = decode_cursor(cursor, date.fromisoformat, int)
+        query = query.filter(
+            tuple_(Product.expiration_date, Product.id) > tuple_(last_date, last_id)
+        )
+
+    products = query.order_by(Product.expiration_date, Product.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor(products[-1].expiration_date, products[-1].id)
+
+    return ORJSONResponse(
+        {"items": model_rows(ProductOut, products), "next_cursor": next_cursor}
+    )
+
+
+@router.put(
+    "/sections/{section}/reorder-threshold",
+    responses={
+        200: {
+            "description": "Ponto de reposição da seção atualizado",
+            "content": {
+                "application/json": {
+                    "example": {"section": "Roupas", "updated": 12}
+                }
+            },
+        },
+        403: {"description": "Admin privileges required"},
+    },
+)
+def update_section_reorder_threshold(
+    section: str,
+    threshold_in: SectionReorderThreshold,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_admin),
+):
+    """
+    Define o ponto de reposição de todos os produtos de uma seção.
 
-    products = query.offset(skip).limit(limit).all()
+    - Atualiza todos os produtos da seção com um único UPDATE.
+    - Valores individuais podem ser ajustados depois pelo PUT do produto.
+
+    **Casos de uso:**
+    - Configurar a reposição de uma seção inteira de uma só vez.
+    """
+    product_ids = db.execute(
+        update(Product)
+        .where(Product.section == section)
+        .values(reorder_threshold=threshold_in.reorder_threshold)
+        .returning(Product.id)
+    ).scalars().all()
+    invalidate_on_commit(db, *(entity_key("product", product_id) for product_id in product_ids))
+
+    return {"section": section, "updated": len(product_ids)}
 
-    return products
 
 @router.get(
     "/{product_id}",
@@ -134,6 +362,7 @@ def list_products(
                         "barcode": "1234567890123",
                         "section": "Roupas",
                         "stock": 10,
+                        "reorder_threshold": 3,
                         "expiration_date": "2025-12-31",
                         "image": "https://exemplo.com/camiseta.jpg"
                     }
@@ -145,25 +374,46 @@ def list_products(
 )
 def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_db),
     _: str = Depends(get_current_seller),
+    fields: Tuple[str, ...] = Depends(sparse_fields(ProductOut)),
 ):
     """
     Busca um produto pelo seu ID.
 
     - Retorna todos os dados do produto.
+    - O parâmetro `fields` limita os campos da resposta
+      (ex: `fields=id,description,price,stock`); com ele, a consulta lê só as
+      colunas pedidas, direto do banco, sem passar pelo cache.
     - Retorna erro 404 caso o produto não exista.
+    - Sem `fields`, o produto é servido do cache compartilhado (ver `CACHE_TTL_SECONDS`),
+      invalidado a cada alteração do produto ou do seu estoque. Faltas no
+      cache são carregadas do primário, nunca de uma réplica atrasada.
 
     **Casos de uso:**
     - Visualização detalhada de um produto.
     - Consulta para edição ou análise de dados do produto.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    def load(session: Session, names: Tuple[str, ...]):
+        row = session.execute(
+            select_schema(Product, ProductOut, names).where(Product.id == product_id)
+        ).mappings().first()
+        return dict(row) if row else None
+
+    all_fields = tuple(ProductOut.model_fields)
+    if fields != all_fields:
+        # Resposta parcial: só as colunas pedidas, sem o cache da linha completa
+        product = load(db, fields)
+    else:
+        product = cached_entity(
+            entity_key("product", product_id), lambda session: load(session, all_fields), primary, db
+        )
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found.")
 
-    return product
+    return ORJSONResponse(product)
 
 @router.put(
     "/{product_id}",
@@ -180,12 +430,14 @@ def get_product(
                         "barcode": "1234567890123",
                         "section": "Roupas",
                         "stock": 10,
+                        "reorder_threshold": 3,
                         "expiration_date": "2025-12-31",
                         "image": "https://exemplo.com/camiseta.jpg"
                     }
                 }
             },
         },
+        400: {"description": "Produto já existe."},
         404: {"description": "Product not found."},
     },
 )
@@ -193,30 +445,193 @@ def update_product(
     product_id: int,
     product_in: ProductUpdate,
     db: Session = Depends(get_db),
-    _: str = Depends(get_current_seller),
+    current_user: User = Depends(get_current_seller),
 ):
     """
     Atualiza os dados de um produto existente.
 
-    - Permite alterar descrição, preço, código de barras, seção, estoque, validade e imagem.
+    - Permite alterar descrição, preço, código de barras, seção, estoque, ponto de reposição, validade e imagem.
+    - Alterações de estoque são registradas como ajuste no livro de movimentações.
     - Retorna erro 404 caso o produto não exista.
 
     **Casos de uso:**
     - Correção de dados de produtos.
     - Atualização de informações para estoque ou vendas.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    values = product_in.model_dump(exclude_unset=True)
+    new_stock = values.pop("stock", None)
+
+    try:
+        if new_stock is not None:
+            current_stock = db.execute(
+                select(Product.stock).where(Product.id == product_id).with_for_update()
+            ).scalar_one_or_none()
+            if current_stock is None:
+                raise HTTPException(status_code=404, detail="Product not found.")
+            apply_stock_movements(
+                db,
+                [(product_id, new_stock - current_stock)],
+                reason=StockMovementReason.adjustment.value,
+                user_id=current_user.id,
+            )
+
+        product = db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(**values)
+            .returning(Product)
+        ).scalar_one_or_none()
+        # Descrição, seção e preço aparecem nos resultados de analytics
+        invalidate_on_commit(db, entity_key("product", product_id), data_version_key("orders"))
+    except InsufficientStock:
+        raise HTTPException(status_code=400, detail="Stock cannot be negative.")
+    except IntegrityError as e:
+        db.rollback()
+        _raise_product_conflict(e)
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found.")
 
-    for field, value in product_in.dict(exclude_unset=True).items():
-        setattr(product, field, value)
+    return product
 
-    db.commit()
-    db.refresh(product)
+@router.post(
+    "/{product_id}/stock-movements",
+    response_model=StockMovementOut,
+    status_code=201,
+    responses={
+        201: {
+            "description": "Movimentação de estoque registrada",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": 10,
+                        "product_id": 1,
+                        "quantity": 24,
+                        "reason": "restock",
+                        "order_id": None,
+                        "user_id": 1,
+                        "created_at": "2025-06-05T10:15:00+00:00"
+                    }
+                }
+            },
+        },
+        400: {"description": "Estoque insuficiente."},
+        404: {"description": "Product not found."},
+    },
+)
+def create_stock_movement(
+    product_id: int,
+    movement_in: StockMovementCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_seller),
+):
+    """
+    Registra uma entrada (reposição) ou um ajuste no estoque de um produto.
+
+    - Reposições devem ter quantidade positiva; ajustes aceitam quantidade negativa.
+    - O saldo do produto é atualizado na mesma transação da movimentação.
+    - Retorna erro 400 caso o ajuste deixe o estoque negativo.
+
+    **Casos de uso:**
+    - Entrada de mercadoria recebida do fornecedor.
+    - Correção de estoque após inventário, perdas ou avarias.
+    """
+    product = db.query(Product.description).filter(Product.id == product_id).first()
+
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found.")
+
+    try:
+        movements = apply_stock_movements(
+            db,
+            [(product_id, movement_in.quantity)],
+            reason=movement_in.reason.value,
+            user_id=current_user.id,
+        )
+    except InsufficientStock:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Insufficient stock for product {product.description}.",
+        )
+
+    return movements[0]
+
+
+@router.get(
+    "/{product_id}/stock-movements",
+    response_model=CursorPage[StockMovementOut],
+    responses={
+        200: {
+            "description": "Histórico de movimentações de estoque do produto",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {
+                                "id": 11,
+                                "product_id": 1,
+                                "quantity": -2,
+                                "reason": "order",
+                                "order_id": 5,
+                                "user_id": 1,
+                                "created_at": "2025-06-05T11:02:00+00:00"
+                            }
+                        ],
+                        "next_cursor": None
+                    }
+                }
+            },
+        },
+        400: {"description": "Invalid cursor."},
+        404: {"description": "Product not found."},
+    },
+)
+def list_stock_movements(
+    product_id: int,
+    db: Session = Depends(get_read_db),
+    _: str = Depends(get_current_seller),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """
+    Lista o histórico de movimentações de estoque de um produto.
+
+    - Ordena da movimentação mais recente para a mais antiga.
+    - Usa paginação por cursor: envie o `next_cursor` da resposta para obter a próxima página.
+    - Movimentações antigas aparecem compactadas em uma movimentação "compaction".
+
+    **Casos de uso:**
+    - Auditoria de entradas, vendas e ajustes de estoque.
+    - Conferência de divergências de inventário.
+    """
+    query = db.query(StockMovement).filter(StockMovement.product_id == product_id)
+
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, datetime.fromisoformat, int)
+        query = query.filter(
+            tuple_(StockMovement.created_at, StockMovement.id)
+            < tuple_(last_created_at, last_id)
+        )
+
+    movements = (
+        query.order_by(StockMovement.created_at.desc(), StockMovement.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    if not movements and not cursor:
+        if not db.query(Product.id).filter(Product.id == product_id).first():
+            raise HTTPException(status_code=404, detail="Product not found.")
+
+    next_cursor = None
+    if len(movements) > limit:
+        movements = movements[:limit]
+        next_cursor = encode_cursor(movements[-1].created_at, movements[-1].id)
+
+    return ORJSONResponse(
+        {"items": model_rows(StockMovementOut, movements), "next_cursor": next_cursor}
+    )
 
-    return product
 
 @router.delete(
     "/{product_id}",
@@ -246,6 +661,7 @@ def delete_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found.")
 
+    invalidate_on_commit(db, entity_key("product", product_id), data_version_key("orders"))
     db.delete(product)
     db.commit()
 
@@ -0,0 +1,151 @@
+import gzip
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import orjson
+
+from app.core.config import settings
+
+# Pedidos por membro gzip: a leitura de um pedido descomprime só o seu bloco
+_BLOCK_ORDERS = 100
+_MANIFEST = "manifest.sqlite3"
+_MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived_orders (
+    order_id INTEGER PRIMARY KEY,
+    client_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    path TEXT NOT NULL,
+    block_offset INTEGER NOT NULL,
+    block_length INTEGER NOT NULL,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_archived_orders_client_id_created_at
+    ON archived_orders (client_id, created_at);
+"""
+
+
+def _manifest() -> sqlite3.Connection:
+    os.makedirs(settings.ORDER_ARCHIVE_DIR, exist_ok=True)
+    connection = sqlite3.connect(os.path.join(settings.ORDER_ARCHIVE_DIR, _MANIFEST), timeout=30)
+    # WAL: os workers leem o manifesto enquanto o job de arquivamento escreve
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_MANIFEST_SCHEMA)
+    return connection
+
+
+def _write_shard(month: date, records: List[dict], archived_at: datetime) -> List[tuple]:
+    """Grava um arquivo NDJSON comprimido do mês e devolve as entradas do manifesto."""
+    relative = os.path.join(
+        f"{month:%Y}", f"{month:%m}", f"orders-{archived_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+    )
+    path = os.path.join(settings.ORDER_ARCHIVE_DIR, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    entries = []
+    with open(f"{path}.tmp", "wb") as f:
+        for start in range(0, len(records), _BLOCK_ORDERS):
+            block = records[start:start + _BLOCK_ORDERS]
+            data = gzip.compress(b"".join(orjson.dumps(record) + b"\n" for record in block))
+            offset = f.tell()
+            f.write(data)
+            entries.extend(
+                (
+                    record["id"],
+                    record["client_id"],
+                    record["status"],
+                    str(record["created_at"]),
+                    relative,
+                    offset,
+                    len(data),
+                    archived_at.isoformat(),
+                )
+                for record in block
+            )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+    return entries
+
+
+def archive_orders(records: Iterable[dict]) -> int:
+    """
+    Grava pedidos no arquivo frio, em NDJSON comprimido com gzip.
+
+    - Um arquivo por mês de criação do pedido em cada execução
+      (`<ORDER_ARCHIVE_DIR>/<ano>/<mês>/orders-<execução>.ndjson.gz`).
+    - Cada arquivo é uma sequência de membros gzip de até 100 pedidos: continua
+      legível por `zcat`, e a busca de um pedido lê apenas o seu membro.
+    - O manifesto SQLite registra arquivo, posição e tamanho do membro de cada
+      pedido. Pedidos arquivados de novo apontam para a cópia mais recente.
+    - Os arquivos estão gravados em disco (fsync) quando a função retorna.
+    """
+    shards: Dict[date, List[dict]] = {}
+    for record in records:
+        shards.setdefault(record["created_at"].replace(day=1), []).append(record)
+    if not shards:
+        return 0
+
+    archived_at = datetime.now(timezone.utc)
+    entries = []
+    for month, shard in sorted(shards.items()):
+        entries.extend(_write_shard(month, shard, archived_at))
+
+    connection = _manifest()
+    try:
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO archived_orders VALUES (?, ?, ?, ?, ?, ?, ?, ?)", entries
+            )
+    finally:
+        connection.close()
+    return len(entries)
+
+
+def find_archived_order(order_id: int) -> Optional[dict]:
+    """Busca um pedido no arquivo frio; None se ele não foi arquivado."""
+    if not os.path.exists(os.path.join(settings.ORDER_ARCHIVE_DIR, _MANIFEST)):
+        return None
+    connection = _manifest()
+    try:
+        entry = connection.execute(
+            "SELECT path, block_offset, block_length FROM archived_orders WHERE order_id = ?", (order_id,)
+        ).fetchone()
+    finally:
+        connection.close()
+    if entry is None:
+        return None
+
+    path, offset, length = entry
+    with open(os.path.join(settings.ORDER_ARCHIVE_DIR, path), "rb") as f:
+        f.seek(offset)
+        block = gzip.decompress(f.read(length))
+    for line in block.splitlines():
+        record = orjson.loads(line)
+        if record["id"] == order_id:
+            return record
+    return None
+
+
+def last_archived_order_dates(client_ids: Iterable[int]) -> Dict[int, date]:
+    """
+    Data do pedido não cancelado mais recente de cada cliente no arquivo frio,
+    lendo o manifesto uma única vez. Clientes sem pedidos arquivados ficam de fora.
+    """
+    client_ids = list(client_ids)
+    if not client_ids or not os.path.exists(os.path.join(settings.ORDER_ARCHIVE_DIR, _MANIFEST)):
+        return {}
+    connection = _manifest()
+    try:
+        rows = connection.execute(
+            "SELECT client_id, MAX(created_at) FROM archived_orders "
+            f"WHERE client_id IN ({', '.join('?' * len(client_ids))}) AND status <> 'canceled' "
+            "GROUP BY client_id",
+            client_ids,
+        ).fetchall()
+    finally:
+        connection.close()
+    return {client_id: date.fromisoformat(last) for client_id, last in rows}
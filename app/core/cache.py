@@ -0,0 +1,268 @@
+import logging
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_MEMORY_ENTRIES = 10_000
+# Tempo máximo de uma carga; depois disso outro processo pode assumir a chave
+_LOAD_LOCK_SECONDS = 5
+# Uma versão expirada só gera uma versão nova (e recálculo dos resultados)
+_DATA_VERSION_SECONDS = 7 * 24 * 3600
+_local_locks = [threading.Lock() for _ in range(64)]
+
+
+class MemoryCacheBackend:
+    """Cache no próprio processo: cada worker tem o seu."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def get_many(self, *keys: str) -> List[Optional[bytes]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: int):
+        with self._lock:
+            self._make_room()
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        with self._lock:
+            if self.get(key) is not None:
+                return False
+            self._make_room()
+            self._entries[key] = (time.monotonic() + ttl, value)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def close(self):
+        self._entries.clear()
+
+    def _make_room(self):
+        if len(self._entries) < _MAX_MEMORY_ENTRIES:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        if len(self._entries) >= _MAX_MEMORY_ENTRIES:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Cache no Redis, compartilhado por todos os workers."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def get_many(self, *keys: str) -> List[Optional[bytes]]:
+        return self._client.mget(keys)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        self._client.set(key, value, ex=ttl)
+
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        return bool(self._client.set(key, value, ex=ttl, nx=True))
+
+    def delete(self, *keys: str):
+        self._client.delete(*keys)
+
+    def close(self):
+        self._client.close()
+
+
+_backend: Optional[MemoryCacheBackend | RedisCacheBackend] = None
+
+
+def get_cache():
+    """Retorna o backend de cache: Redis com REDIS_URL, senão em memória."""
+    global _backend
+    if _backend is None:
+        _backend = RedisCacheBackend(settings.REDIS_URL) if settings.REDIS_URL else MemoryCacheBackend()
+    return _backend
+
+
+def close_cache():
+    global _backend
+    if _backend is not None:
+        _backend.close()
+        _backend = None
+
+
+def entity_key(kind: str, entity_id: int) -> str:
+    return f"cache:{kind}:{entity_id}"
+
+
+def _version_key(key: str) -> str:
+    return f"{key}:version"
+
+
+def _call(method: str, *args, default: Any = None) -> Any:
+    # Falhas do backend não derrubam a leitura nem a escrita que o usa
+    try:
+        return getattr(get_cache(), method)(*args)
+    except Exception as e:
+        logger.warning("Falha no backend de cache (%s): %s", method, str(e))
+        return default
+
+
+def cached(key: str, loader: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+    """
+    Retorna o valor em cache ou o carrega com `loader`, guardando-o por `ttl`
+    segundos (padrão: CACHE_TTL_SECONDS; 0 desativa o cache).
+
+    - Resultados None (ex: registro inexistente) não são guardados.
+    - Single-flight: quando a chave expira, apenas uma requisição por vez
+      executa `loader`; as demais, neste e nos outros workers, aguardam o
+      valor carregado em vez de irem todas ao banco.
+    - Se o backend estiver indisponível, o valor é carregado do banco.
+    - Cada valor é gravado com a versão da chave lida antes da carga; uma
+      invalidação troca a versão, e um valor carregado antes dela (e gravado
+      depois) não é mais servido.
+    """
+    ttl = settings.CACHE_TTL_SECONDS if ttl is None else ttl
+    if ttl <= 0:
+        return loader()
+
+    found, value, version = _lookup(key)
+    if found:
+        return value
+
+    with _local_locks[zlib.crc32(key.encode()) % len(_local_locks)]:
+        found, value, version = _lookup(key)
+        if found:
+            return value
+
+        lock_key = f"{key}:loading"
+        if not _call("add", lock_key, b"1", _LOAD_LOCK_SECONDS, default=True):
+            # Outro worker está carregando a chave; aguarda o valor dele
+            deadline = time.monotonic() + _LOAD_LOCK_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                found, value, _ = _lookup(key)
+                if found:
+                    return value
+            return loader()
+
+        try:
+            result = loader()
+            if result is not None and version is not None:
+                _call("set", key, orjson.dumps([version, result]), ttl)
+            return result
+        finally:
+            _call("delete", lock_key)
+
+
+def cached_entity(key: str, load: Callable[[Session], Any], primary: Session, read: Session) -> Any:
+    """
+    Busca uma entidade pelo cache, carregando-a do primário quando falta:
+    a sessão de leitura pode ser uma réplica atrasada, e o valor gravado no
+    cache é servido a todos os clientes. Com o cache desativado, `load`
+    usa a sessão de leitura.
+    """
+    if settings.CACHE_TTL_SECONDS <= 0:
+        return load(read)
+    return cached(key, lambda: load(primary))
+
+
+def _lookup(key: str) -> Tuple[bool, Any, Optional[str]]:
+    """
+    Lê o valor e a versão atual da chave. Retorna (encontrado, valor, versão);
+    versão None quando o backend está indisponível (o valor não é gravado).
+    """
+    values = _call("get_many", key, _version_key(key))
+    if values is None:
+        return False, None, None
+    value, version = values
+    version = version.decode() if version is not None else ""
+    if value is not None:
+        stored_version, result = orjson.loads(value)
+        if stored_version == version:
+            return True, result, version
+    return False, None, version
+
+
+def set_flag(key: str, ttl: int):
+    """Grava uma marca que expira em `ttl` segundos, visível para todos os workers com Redis."""
+    _call("set", key, b"1", ttl)
+
+
+def has_flag(key: str, on_error: bool = False) -> bool:
+    """Indica se a marca existe; `on_error` é a resposta quando o backend está indisponível."""
+    value = _call("get", key, default=b"1" if on_error else None)
+    return value is not None
+
+
+def data_version(name: str) -> Optional[str]:
+    """
+    Versão atual de um conjunto de dados (ex: "orders"), para compor chaves de
+    cache de resultados derivados dele. Escritas que invalidam
+    `data_version_key(name)` com invalidate_on_commit geram uma versão nova,
+    e os resultados antigos deixam de ser usados. None se o backend estiver
+    indisponível.
+    """
+    key = data_version_key(name)
+    value = _call("get", key)
+    if value is None:
+        # Entre workers concorrentes, a primeira versão gravada prevalece
+        _call("add", key, uuid.uuid4().hex.encode(), _DATA_VERSION_SECONDS)
+        value = _call("get", key)
+    return value.decode() if value is not None else None
+
+
+def data_version_key(name: str) -> str:
+    return f"cache:version:{name}"
+
+
+def invalidate_on_commit(db: Session, *keys: str):
+    """
+    Remove as chaves do cache quando a transação da sessão for confirmada.
+    Em caso de rollback, nada é removido.
+    """
+    db.info.setdefault("cache_invalidations", set()).update(keys)
+
+
+def invalidate(*keys: str):
+    """
+    Remove as chaves do cache e troca a versão de cada uma, para que valores
+    carregados antes da invalidação não sejam gravados como atuais.
+    """
+    for key in keys:
+        _call("set", _version_key(key), uuid.uuid4().hex.encode(), _DATA_VERSION_SECONDS)
+    _call("delete", *keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    keys = session.info.pop("cache_invalidations", None)
+    if keys:
+        invalidate(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session):
+    session.info.pop("cache_invalidations", None)
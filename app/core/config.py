@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,6 +8,16 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: str = ""
+    READ_YOUR_WRITES_SECONDS: int = 5
+    REPLICA_RETRY_SECONDS: int = 30
+    DB_POOL_WARMUP_CONNECTIONS: int = 2
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WEB_CONCURRENCY: int = 0
+    MAX_REQUESTS_PER_WORKER: int = 10000
+    MAX_REQUESTS_JITTER: int = 1000
+    GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS: int = 30
     SENTRY_SECRET_KEY: str
     SENTRY_ENVIRONMENT: str = ""
     SENTRY_DSN: str = ""
@@ -18,10 +30,61 @@ class Settings(BaseSettings):
     WA_API_KEY: str
     WA_INSTANCE_NAME: str
     WA_AUTHENTICATION_API_KEY: str
+    LOW_STOCK_DIGEST_INTERVAL_MINUTES: int = 1440
+    STOCK_LEDGER_COMPACTION_INTERVAL_MINUTES: int = 1440
+    STOCK_LEDGER_RETENTION_DAYS: int = 90
+    COUNT_ESTIMATE_TTL_SECONDS: int = 30
+    COUNT_ESTIMATE_EXACT_THRESHOLD: int = 1000
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: int = 10
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60
+    IDEMPOTENCY_CLEANUP_INTERVAL_MINUTES: int = 60
+    ORDER_PARTITION_MONTHS_AHEAD: int = 3
+    ORDER_PARTITION_INTERVAL_MINUTES: int = 1440
+    ORDER_ARCHIVE_DIR: str = "archive/orders"
+    ORDER_ARCHIVE_AFTER_DAYS: int = 730
+    ORDER_ARCHIVE_BATCH_SIZE: int = 1000
+    ORDER_ARCHIVE_INTERVAL_MINUTES: int = 1440
+    REDIS_URL: str = ""
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT: str = "300/minute"
+    RATE_LIMITS: Dict[str, str] = {"orders": "120/minute"}
+    CACHE_TTL_SECONDS: int = 60
+    ANALYTICS_CACHE_TTL_SECONDS: int = 3600
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
 
-settings = Settings()
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    """
+    Retorna as configurações da aplicação, lendo o ambiente no primeiro uso.
+    """
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def configure_settings(new_settings: Settings):
+    """Substitui as configurações em uso (ex: create_app com Settings próprios)."""
+    global _settings
+    _settings = new_settings
+
+
+class _LazySettings:
+    """
+    Proxy de `Settings` que adia a leitura do ambiente até o primeiro acesso
+    a um atributo, para que importar os módulos da aplicação não exija todas
+    as variáveis de ambiente.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
@@ -1,13 +1,92 @@
-from sqlalchemy import create_engine
+import hashlib
+import itertools
+import threading
+import time
+
+from fastapi import Depends, Request
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.cache import has_flag, set_flag
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_engine: Engine | None = None
+_replica_engines: list[Engine] | None = None
+_replica_cycle = None
+_replica_down_until = {}
+_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Retorna o engine do banco primário, criado no primeiro uso
+    (e não na importação do módulo).
+    """
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = create_engine(settings.DATABASE_URL)
+    return _engine
+
+
+def get_replica_engines() -> list[Engine]:
+    """Engines das réplicas de leitura (DATABASE_REPLICA_URL, separadas por vírgula)."""
+    global _replica_engines, _replica_cycle
+    if _replica_engines is None:
+        with _lock:
+            if _replica_engines is None:
+                engines = [
+                    create_engine(url.strip(), pool_pre_ping=True)
+                    for url in settings.DATABASE_REPLICA_URL.split(",")
+                    if url.strip()
+                ]
+                _replica_cycle = itertools.cycle(range(len(engines)))
+                _replica_engines = engines
+    return _replica_engines
+
+
+def warm_up_pool(connections: int):
+    """Abre `connections` conexões com o primário para já deixá-las no pool."""
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def dispose_engines():
+    """Fecha as conexões do pool do primário e das réplicas."""
+    for engine in [_engine, *(_replica_engines or [])]:
+        if engine is not None:
+            engine.dispose()
+
+
+def __getattr__(name: str):
+    # Compatibilidade com `from app.core.database import engine`
+    if name == "engine":
+        return get_engine()
+    if name == "replica_engines":
+        return get_replica_engines()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw) -> Session:
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
 
 def get_db():
     """
@@ -23,3 +102,103 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+def recent_write_key(authorization: str) -> str:
+    """Chave da marca de escrita recente do cliente com o header Authorization informado."""
+    return f"cache:recent-write:{hashlib.sha256(authorization.encode()).hexdigest()}"
+
+
+def mark_write(request: Request):
+    """
+    Registra que o cliente da requisição acabou de escrever no banco.
+    Suas leituras vão para o primário durante READ_YOUR_WRITES_SECONDS.
+
+    A marca fica no backend de cache: com REDIS_URL vale para todos os
+    workers; sem ele, fica na memória do processo e só é confiável com um
+    único worker (WEB_CONCURRENCY=1).
+    """
+    authorization = request.headers.get("authorization")
+    if not authorization or not get_replica_engines():
+        return
+    set_flag(recent_write_key(authorization), settings.READ_YOUR_WRITES_SECONDS)
+
+
+def recent_write(request: Request) -> bool:
+    """
+    Indica se o cliente escreveu há menos de READ_YOUR_WRITES_SECONDS.
+    Com o backend de cache indisponível, considera que sim (lê do primário).
+    """
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return False
+    return has_flag(recent_write_key(authorization), on_error=True)
+
+
+def _next_replica():
+    """Escolhe a próxima réplica saudável (round-robin) ou None."""
+    replicas = get_replica_engines()
+    now = time.monotonic()
+    with _lock:
+        for _ in range(len(replicas)):
+            index = next(_replica_cycle)
+            if _replica_down_until.get(index, 0) <= now:
+                return index
+    return None
+
+
+def _mark_replica_down(index: int):
+    with _lock:
+        _replica_down_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Dependency de sessão somente leitura para os endpoints GET.
+
+    - Usa uma réplica de leitura quando DATABASE_REPLICA_URL está configurado.
+    - Usa o primário (a sessão de get_db) quando não há réplica, quando todas
+      estão indisponíveis ou quando o cliente escreveu há menos de
+      READ_YOUR_WRITES_SECONDS segundos (read-your-writes).
+    - Uma réplica que falha ao conectar fica fora da rotação por
+      REPLICA_RETRY_SECONDS segundos.
+    """
+    replicas = get_replica_engines()
+    if not replicas or recent_write(request):
+        yield db
+        return
+
+    index = _next_replica()
+    if index is None:
+        yield db
+        return
+
+    replica = SessionLocal(bind=replicas[index])
+    try:
+        replica.connection()
+    except OperationalError:
+        replica.close()
+        _mark_replica_down(index)
+        yield db
+        return
+
+    try:
+        yield replica
+    finally:
+        replica.rollback()
+        replica.close()
+
+
+def unique_violation(exc: IntegrityError) -> str | None:
+    """
+    Identifica a constraint única violada por um IntegrityError.
+    Retorna o nome da constraint (ou a mensagem do driver) e None quando
+    o erro não é de unicidade (ex: NOT NULL ou chave estrangeira).
+    """
+    orig = exc.orig
+    if getattr(orig, "pgcode", None) == "23505":
+        return orig.diag.constraint_name or str(orig)
+    message = str(orig)
+    if "unique" in message.lower():
+        return message
+    return None
@@ -1,20 +1,50 @@
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 LOGGING_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_LEVEL = logging.INFO
 
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+
 
 def setup_log():
     """
     Set up logging configuration.
+
+    Os registros passam por uma fila e são gravados no stdout e no arquivo
+    por uma thread separada, sem bloquear as requisições.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOGGING_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout), logging.FileHandler("app.log")]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_queue_handler)
+    _listener.start()
+
+
+def shutdown_log():
+    """
+    Grava os registros que ainda estão na fila e encerra a thread de logging.
     """
-    logging.basicConfig(
-        level=LOG_LEVEL,
-        format=LOGGING_FORMAT,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler("app.log"),
-        ],
-    )
-    
\ No newline at end of file
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
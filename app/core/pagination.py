@@ -0,0 +1,33 @@
+import base64
+import json
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Gera um cursor opaco (base64 url-safe) a partir da chave de ordenação
+    do último item da página.
+    """
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *converters: Callable[[Any], Any]) -> tuple:
+    """
+    Decodifica um cursor gerado por `encode_cursor`, aplicando um conversor
+    por valor (ex: `date.fromisoformat`, `int`).
+    Retorna erro 400 caso o cursor seja inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if len(values) != len(converters):
+            raise ValueError("Unexpected cursor size")
+        return tuple(convert(value) for convert, value in zip(converters, values))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
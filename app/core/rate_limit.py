@@ -0,0 +1,168 @@
+import logging
+import math
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+_MAX_MEMORY_BUCKETS = 100_000
+
+# Balde de fichas atômico no Redis; o relógio é o do próprio Redis,
+# para que todos os workers vejam o mesmo tempo.
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+@lru_cache(maxsize=64)
+def parse_rate(spec: str) -> Tuple[int, float]:
+    """
+    Converte um limite no formato "<quantidade>/<second|minute|hour>"
+    (ex: "120/minute") em (capacidade do balde, fichas repostas por segundo).
+    """
+    amount, _, period = spec.partition("/")
+    if period not in _PERIODS or not amount.strip().isdigit() or int(amount) < 1:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return int(amount), int(amount) / _PERIODS[period]
+
+
+class MemoryRateLimitBackend:
+    """Baldes de fichas no próprio processo: cada worker tem os seus."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def acquire(self, key: str, capacity: int, rate: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        if len(self._buckets) >= _MAX_MEMORY_BUCKETS and key not in self._buckets:
+            self._buckets.clear()
+        self._buckets[key] = (tokens, now)
+        return wait
+
+    async def close(self):
+        self._buckets.clear()
+
+
+class RedisRateLimitBackend:
+    """Baldes de fichas no Redis, compartilhados por todos os workers."""
+
+    def __init__(self, url: str):
+        import redis.asyncio
+
+        self._client = redis.asyncio.from_url(url)
+        self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, key: str, capacity: int, rate: float) -> float:
+        return float(await self._script(keys=[key], args=[capacity, rate]))
+
+    async def close(self):
+        await self._client.aclose()
+
+
+_backend: Optional[MemoryRateLimitBackend | RedisRateLimitBackend] = None
+
+
+def get_rate_limit_backend():
+    """Retorna o backend de rate limit: Redis com REDIS_URL, senão em memória."""
+    global _backend
+    if _backend is None:
+        _backend = (
+            RedisRateLimitBackend(settings.REDIS_URL)
+            if settings.REDIS_URL
+            else MemoryRateLimitBackend()
+        )
+    return _backend
+
+
+async def close_rate_limit_backend():
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+
+
+def route_group(path: str) -> Optional[str]:
+    """Grupo de rotas da API (ex: "orders" para /api/v1/orders/1); None fora da API."""
+    prefix = settings.API_V1_STR.rstrip("/") + "/"
+    if not path.startswith(prefix):
+        return None
+    return path[len(prefix):].split("/", 1)[0] or None
+
+
+def client_identity(request: Request) -> str:
+    """
+    Usuário do token JWT da requisição, sem consultar o banco. Requisições
+    sem token válido são identificadas pelo IP de origem.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+            if payload.get("sub") is not None:
+                return f"user:{payload['sub']}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def rate_limit(request: Request, call_next):
+    """
+    Limita as requisições por usuário e grupo de rotas com um balde de fichas.
+
+    - O limite de cada grupo vem de RATE_LIMITS (ex: {"orders": "120/minute"});
+      os demais grupos usam RATE_LIMIT_DEFAULT.
+    - Acima do limite, responde 429 com `Retry-After` (segundos).
+    - Se o backend compartilhado estiver indisponível, a requisição segue sem limite.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return await call_next(request)
+    group = route_group(request.url.path)
+    if group is None:
+        return await call_next(request)
+
+    capacity, rate = parse_rate(settings.RATE_LIMITS.get(group, settings.RATE_LIMIT_DEFAULT))
+    key = f"rate_limit:{group}:{client_identity(request)}"
+    try:
+        wait = await get_rate_limit_backend().acquire(key, capacity, rate)
+    except Exception as e:
+        logger.warning("Falha no backend de rate limit: %s", str(e))
+        wait = 0
+
+    if wait > 0:
+        return ORJSONResponse(
+            {"detail": "Too many requests."},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+    return await call_next(request)
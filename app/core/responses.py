@@ -0,0 +1,54 @@
+from decimal import Decimal
+from typing import Any, Iterable, List, Optional, Sequence, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Result
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada com orjson.
+
+    Quando uma rota retorna esta resposta diretamente, o FastAPI não valida o
+    conteúdo contra o `response_model` (que continua documentando a rota no
+    OpenAPI); o conteúdo deve, portanto, já estar no formato do schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_rows(schema: Type[BaseModel], objects: Iterable[Any]) -> List[dict]:
+    """
+    Converte objetos ORM (ou linhas de consulta) em dicionários com os campos
+    do schema, sem passar pela validação do pydantic.
+    """
+    fields = tuple(schema.model_fields)
+    return [{name: getattr(obj, name) for name in fields} for obj in objects]
+
+
+def select_schema(
+    model: Any, schema: Type[BaseModel], fields: Optional[Sequence[str]] = None
+) -> Select:
+    """
+    Monta um `select()` só com as colunas do modelo que compõem o schema
+    (ou apenas os `fields` informados, para respostas parciais).
+    As linhas resultantes não passam pelo identity map da sessão.
+    """
+    return select(*(getattr(model, name) for name in fields or schema.model_fields))
+
+
+def row_dicts(result: Result) -> List[dict]:
+    """Converte as linhas de uma consulta Core em dicionários."""
+    return [dict(row) for row in result.mappings()]
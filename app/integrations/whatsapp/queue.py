@@ -0,0 +1,67 @@
+import logging
+import queue
+import threading
+import time
+from typing import Iterable, Tuple
+
+import sentry_sdk
+
+from app.integrations.whatsapp.whatsapp import send_whatsapp_message
+
+
+class NotificationQueue:
+    """
+    Fila em memória para envio de mensagens de WhatsApp fora do ciclo da
+    requisição. Um único worker em background envia as mensagens em ordem.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, messages: Iterable[Tuple[str, str]]):
+        for phone_number, message in messages:
+            self._queue.put((phone_number, message))
+        self._ensure_worker()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Aguarda o envio de todas as mensagens enfileiradas.
+        Retorna False se o tempo limite acabar antes de a fila esvaziar.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="whatsapp-notifications", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        logger = logging.getLogger(__name__)
+        while True:
+            phone_number, message = self._queue.get()
+            try:
+                send_whatsapp_message(phone_number, message)
+            except Exception as e:
+                logger.error("Erro ao enviar mensagem de WhatsApp: %s", str(e), exc_info=True)
+                sentry_sdk.capture_exception(e)
+            finally:
+                self._queue.task_done()
+
+
+notification_queue = NotificationQueue()
+
+
+def enqueue_whatsapp_messages(messages: Iterable[Tuple[str, str]]):
+    notification_queue.enqueue(messages)
@@ -1,9 +1,10 @@
-import requests
-
 from app.core.config import settings
 
 
 def send_whatsapp_message(phone_number: str, message: str):
+    # Importado sob demanda: só quem envia mensagens paga o custo de importar requests
+    import requests
+
     url = f"{settings.WA_API_URL}/message/sendText/{settings.WA_INSTANCE_NAME}"
 
     headers = {
@@ -1,22 +1,105 @@
-import sentry_sdk
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 
 from app.api.v1.api_router import api_router
-from app.core.config import settings
-from app.core.logging import setup_log
+from app.core.cache import close_cache
+from app.core.config import Settings, configure_settings, get_settings
+from app.core.database import dispose_engines, mark_write, warm_up_pool
+from app.core.logging import setup_log, shutdown_log
+from app.core.rate_limit import close_rate_limit_backend, rate_limit
+from app.integrations.whatsapp.queue import notification_queue
+from app.tasks.scheduler import start_periodic_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def init_sentry(settings: Settings):
+    """Inicializa o Sentry somente quando há DSN configurado."""
+    if not settings.SENTRY_DSN:
+        return
+    import sentry_sdk
 
-sentry_sdk.init(dsn=settings.SENTRY_DSN, environment=settings.SENTRY_ENVIRONMENT)
-setup_log()
+    sentry_sdk.init(dsn=settings.SENTRY_DSN, environment=settings.SENTRY_ENVIRONMENT)
 
-app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION)
+
+async def track_writes(request: Request, call_next):
+    """
+    Marca o cliente como autor de uma escrita recente após requisições que
+    alteram dados, para que suas próximas leituras usem o primário.
+    """
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        mark_write(request)
+    return response
 
 
-@app.get("/health", tags=["health"])
-def health_check():
+def create_app(settings: Settings | None = None) -> FastAPI:
     """
-    Health check endpoint.
+    Cria a aplicação FastAPI.
+
+    - Importar este módulo não lê o ambiente, não abre conexões e não
+      inicializa integrações; isso acontece aqui ou no lifespan.
+    - Sentry, logging, aquecimento do pool de conexões e tarefas periódicas
+      são iniciados no lifespan, quando o servidor sobe.
+    - Requisições à API passam pelo rate limit por usuário e grupo de rotas.
+    - No encerramento, as mensagens de WhatsApp pendentes e os logs em fila
+      são enviados antes de fechar as conexões.
+    - `settings` permite criar a aplicação com configurações próprias
+      (ex: testes e ferramentas de linha de comando).
     """
-    return {"status": "ok", "version": settings.VERSION}
+    if settings is not None:
+        configure_settings(settings)
+    settings = get_settings()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        init_sentry(settings)
+        setup_log()
+        if settings.DB_POOL_WARMUP_CONNECTIONS:
+            try:
+                await asyncio.to_thread(warm_up_pool, settings.DB_POOL_WARMUP_CONNECTIONS)
+            except Exception as e:
+                logger.warning("Falha ao aquecer o pool de conexões: %s", str(e))
+        jobs = start_periodic_jobs()
+        yield
+        for job in jobs:
+            job.cancel()
+        if not await asyncio.to_thread(
+            notification_queue.flush, settings.GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS
+        ):
+            logger.warning("Mensagens de WhatsApp pendentes descartadas no encerramento")
+        await close_rate_limit_backend()
+        close_cache()
+        dispose_engines()
+        shutdown_log()
+
+    app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
+    app.middleware("http")(track_writes)
+    app.middleware("http")(rate_limit)
+
+    @app.get("/health", tags=["health"])
+    def health_check():
+        """
+        Health check endpoint.
+        """
+        return {"status": "ok", "version": settings.VERSION}
+
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    return app
+
+
+_app: FastAPI | None = None
 
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
+def __getattr__(name: str):
+    # `uvicorn app.main:app` e `from app.main import app` criam a aplicação
+    # no primeiro acesso, com as configurações do ambiente.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String, func
 from app.core.database import Base
 
 class Client(Base):
@@ -11,5 +11,25 @@ class Client(Base):
     cpf = Column(String, unique=True, nullable=False, index=True)
     address = Column(String, nullable=False)
 
+    __table_args__ = (
+        # Índices de prefixo (text_pattern_ops) usados pelo autocomplete:
+        # permitem LIKE 'abc%' independente da collation do banco.
+        Index(
+            "ix_clients_name_lower_prefix",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_clients_email_lower_prefix",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_clients_cpf_prefix",
+            cpf,
+            postgresql_ops={"cpf": "text_pattern_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"<Client(id={self.id}, name={self.name}, email={self.email})>"
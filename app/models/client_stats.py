@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer, func
+from app.core.database import Base
+
+class ClientStats(Base):
+    __tablename__ = "client_stats"
+
+    # Totais dos pedidos não cancelados do cliente, mantidos na mesma transação
+    # de cada criação, alteração, cancelamento e exclusão de pedido
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_spent = Column(Float, nullable=False, default=0)
+    last_order_at = Column(Date, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_client_stats_order_count", order_count),
+        Index("ix_client_stats_total_spent", total_spent),
+        Index("ix_client_stats_last_order_at", last_order_at),
+    )
+
+    def __repr__(self):
+        return f"<ClientStats(client_id={self.client_id}, order_count={self.order_count}, total_spent={self.total_spent})>"
@@ -1,13 +1,38 @@
-from sqlalchemy import Column, Date, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    Table,
+    func,
+)
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
+# orders, order_product e order_status_history são particionadas por mês da data
+# do pedido (no Postgres). Itens e histórico guardam a data do pedido para ficar
+# na partição do mesmo mês e referenciam o pedido pela chave (id, created_at).
 OrderProduct = Table(
     "order_product",
     Base.metadata,
-    Column("order_id", Integer, ForeignKey("orders.id")),
+    Column("order_id", Integer),
+    Column("order_created_at", Date, nullable=False),
     Column("product_id", Integer, ForeignKey("products.id")),
     Column("quantity", Integer, nullable=False),
+    # Preço do produto no momento do pedido (nulo para pedidos antigos)
+    Column("unit_price", Float, nullable=True),
+    ForeignKeyConstraint(
+        ["order_id", "order_created_at"],
+        ["orders.id", "orders.created_at"],
+        onupdate="CASCADE",
+    ),
+    Index("ix_order_product_order_id", "order_id"),
+    postgresql_partition_by="RANGE (order_created_at)",
 )
 
 
@@ -15,11 +40,25 @@ class OrderStatusHistory(Base):
     __tablename__ = "order_status_history"
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, nullable=False)
+    order_created_at = Column(Date, primary_key=True)
     previous_status = Column(String, nullable=False)
     new_status = Column(String, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    changed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     order = relationship("Order", back_populates="status_history")
 
+    __table_args__ = (
+        ForeignKeyConstraint(
+            [order_id, order_created_at],
+            ["orders.id", "orders.created_at"],
+            onupdate="CASCADE",
+        ),
+        Index("ix_order_status_history_order_id_changed_at", order_id, changed_at),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
     def __repr__(self):
         return f"<OrderStatusHistory(id={self.id}, order_id={self.order_id}, status={self.new_status})>"
 
@@ -30,7 +69,7 @@ class Order(Base):
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     status = Column(String, default="pending", nullable=False)
-    created_at = Column(Date, nullable=False)
+    created_at = Column(Date, primary_key=True)
     products = relationship(
         "Product",
         secondary=OrderProduct,
@@ -42,8 +81,16 @@ class Order(Base):
         "OrderStatusHistory",
         back_populates="order",
         cascade="all, delete-orphan",
-        lazy="dynamic",
+        order_by="OrderStatusHistory.changed_at",
+    )
+
+    __table_args__ = (
+        Index("ix_orders_client_id_created_at_id", client_id, created_at, id),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+    # A chave primária inclui created_at por exigência do particionamento;
+    # o id vem de uma sequência e identifica o pedido sozinho
+    __mapper_args__ = {"primary_key": [id]}
 
     def __repr__(self):
         return f"<Order(id={self.id}, client_id={self.client_id}, date={self.created_at})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Float, Integer, String
+from sqlalchemy import Column, Date, Float, Index, Integer, String
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -6,11 +6,12 @@ class Product(Base):
     __tablename__ = "products"
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    description = Column(String, nullable=False)
+    description = Column(String, unique=True, nullable=False, index=True)
     price = Column(Float, nullable=False)
     barcode = Column(String, unique=True, nullable=False, index=True)
     section = Column(String, nullable=False)
     stock = Column(Integer, default=0, nullable=False)
+    reorder_threshold = Column(Integer, default=0, server_default="0", nullable=False)
     expiration_date = Column(Date, nullable=False)
     image = Column(String, nullable=True)
 
@@ -21,5 +22,18 @@ class Product(Base):
         lazy="dynamic",
     )
 
+    __table_args__ = (
+        # Índice parcial: contém apenas os produtos abaixo do ponto de reposição.
+        Index(
+            "ix_products_low_stock",
+            section,
+            stock,
+            postgresql_where=stock <= reorder_threshold,
+        ),
+        # Produtos a vencer: ordenação (expiration_date, id) para paginação por cursor.
+        Index("ix_products_section_expiration_date", section, expiration_date, id),
+        Index("ix_products_expiration_date", expiration_date, id),
+    )
+
     def __repr__(self):
         return f"<Product(id={self.id}, name={self.description}, price={self.price}), stock={self.stock})>"
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, DateTime, String
+from app.core.database import Base
+
+class ScheduledJob(Base):
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String, primary_key=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<ScheduledJob(name={self.name}, last_run_at={self.last_run_at})>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
+from app.core.database import Base
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)
+    order_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_movements_product_id_created_at", product_id, created_at, id),
+        Index("ix_stock_movements_created_at", created_at),
+    )
+
+    def __repr__(self):
+        return f"<StockMovement(id={self.id}, product_id={self.product_id}, quantity={self.quantity}, reason={self.reason})>"
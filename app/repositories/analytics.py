@@ -0,0 +1,154 @@
+from datetime import date
+from typing import List, NamedTuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.order import Order, OrderProduct
+from app.models.product import Product
+from app.schemas.order import OrderStatus
+
+# Linhas por lote do cursor do servidor
+_CHUNK_ROWS = 50_000
+
+
+class SalesColumns(NamedTuple):
+    """Vendas por (dia, produto) em colunas NumPy alinhadas."""
+
+    day: np.ndarray
+    product_id: np.ndarray
+    quantity: np.ndarray
+    revenue: np.ndarray
+
+
+def load_sales(db: Session, start: date, end: date) -> SalesColumns:
+    """
+    Carrega as vendas entre `start` e `end` (inclusive) em arrays NumPy, com
+    uma única consulta lida em lotes por um cursor do servidor.
+
+    - O banco soma os itens por (dia, produto): o volume transferido depende
+      de dias x produtos vendidos, não do número de itens de pedido.
+    - Pedidos cancelados não entram; a receita usa o preço do item no pedido
+      (ou o preço atual do produto para pedidos antigos sem preço gravado).
+    - O filtro por order_created_at lê apenas as partições do período.
+    """
+    price = func.coalesce(OrderProduct.c.unit_price, Product.price)
+    query = (
+        select(
+            OrderProduct.c.order_created_at,
+            OrderProduct.c.product_id,
+            func.sum(OrderProduct.c.quantity),
+            func.sum(OrderProduct.c.quantity * price),
+        )
+        .join(
+            Order,
+            (Order.id == OrderProduct.c.order_id)
+            & (Order.created_at == OrderProduct.c.order_created_at),
+        )
+        .join(Product, Product.id == OrderProduct.c.product_id)
+        .where(
+            OrderProduct.c.order_created_at.between(start, end),
+            Order.status != OrderStatus.canceled.value,
+        )
+        .group_by(OrderProduct.c.order_created_at, OrderProduct.c.product_id)
+        .execution_options(yield_per=_CHUNK_ROWS)
+    )
+
+    days, product_ids, quantities, revenues = [], [], [], []
+    for rows in db.execute(query).partitions():
+        day, product_id, quantity, revenue = zip(*rows)
+        days.append(np.array(day, dtype="datetime64[D]"))
+        product_ids.append(np.array(product_id, dtype=np.int64))
+        quantities.append(np.array(quantity, dtype=np.int64))
+        revenues.append(np.array(revenue, dtype=np.float64))
+    if not days:
+        return SalesColumns(
+            np.empty(0, dtype="datetime64[D]"),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.float64),
+        )
+    return SalesColumns(
+        np.concatenate(days),
+        np.concatenate(product_ids),
+        np.concatenate(quantities),
+        np.concatenate(revenues),
+    )
+
+
+def top_products_by_section(db: Session, sales: SalesColumns, limit: int) -> List[dict]:
+    """
+    Os `limit` produtos de maior receita de cada seção, com quantidade vendida.
+    Seções em ordem alfabética; produtos em ordem decrescente de receita.
+    """
+    if not len(sales.product_id):
+        return []
+
+    products, inverse = np.unique(sales.product_id, return_inverse=True)
+    revenue = np.bincount(inverse, weights=sales.revenue)
+    quantity = np.bincount(inverse, weights=sales.quantity).astype(np.int64)
+
+    details = {
+        row.id: row
+        for row in db.execute(
+            select(Product.id, Product.description, Product.section).where(
+                Product.id.in_(products.tolist())
+            )
+        )
+    }
+    sections, section_index = np.unique(
+        np.array([details[product_id].section for product_id in products.tolist()]),
+        return_inverse=True,
+    )
+
+    # Ordena por seção e receita decrescente; a posição dentro da seção é o
+    # índice na ordenação menos o início do grupo da seção
+    order = np.lexsort((products, -revenue, section_index))
+    grouped = section_index[order]
+    starts = np.searchsorted(grouped, np.arange(len(sections)))
+    rank = np.arange(len(order)) - starts[grouped]
+    top = order[rank < limit]
+
+    result = [{"section": section, "products": []} for section in sections.tolist()]
+    for i in top.tolist():
+        product_id = int(products[i])
+        result[section_index[i]]["products"].append(
+            {
+                "product_id": product_id,
+                "description": details[product_id].description,
+                "quantity": int(quantity[i]),
+                "revenue": round(float(revenue[i]), 2),
+            }
+        )
+    return result
+
+
+def daily_revenue(sales: SalesColumns, start: date, end: date, window: int) -> List[dict]:
+    """
+    Receita e itens vendidos por dia entre `start` e `end` (dias sem vendas
+    com zero) e a média móvel da receita nos últimos `window` dias.
+
+    `sales` deve começar `window - 1` dias antes de `start`, para que a média
+    dos primeiros dias do período também cubra a janela inteira.
+    """
+    first = np.datetime64(start, "D") - (window - 1)
+    days = (end - start).days + window
+    index = (sales.day - first).astype(np.int64)
+    revenue = np.bincount(index, weights=sales.revenue, minlength=days)
+    quantity = np.bincount(index, weights=sales.quantity, minlength=days).astype(np.int64)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(revenue)))
+    moving_average = (cumulative[window:] - cumulative[:-window]) / window
+
+    period = slice(window - 1, None)
+    dates = first + np.arange(days)
+    return [
+        {"date": day, "revenue": day_revenue, "quantity": day_quantity, "moving_average": average}
+        for day, day_revenue, day_quantity, average in zip(
+            dates[period].tolist(),
+            np.round(revenue[period], 2).tolist(),
+            quantity[period].tolist(),
+            np.round(moving_average, 2).tolist(),
+        )
+    ]
@@ -0,0 +1,103 @@
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.archive import last_archived_order_dates
+from app.core.cache import entity_key, invalidate_on_commit
+from app.models.client_stats import ClientStats
+from app.models.order import Order, OrderProduct
+from app.models.product import Product
+from app.schemas.order import OrderStatus
+
+
+def order_totals(db: Session, orders: Iterable[Tuple[int, date]]) -> Dict[int, float]:
+    """
+    Valor de cada pedido (id, data do pedido): soma de quantidade x preço dos
+    itens, com o preço atual do produto para itens antigos sem preço gravado.
+    Pedidos sem itens valem zero.
+    """
+    orders = list(orders)
+    if not orders:
+        return {}
+    dates = [created_at for _, created_at in orders]
+    totals = dict.fromkeys((order_id for order_id, _ in orders), 0.0)
+    rows = db.execute(
+        select(
+            OrderProduct.c.order_id,
+            func.sum(OrderProduct.c.quantity * func.coalesce(OrderProduct.c.unit_price, Product.price)),
+        )
+        .join(Product, Product.id == OrderProduct.c.product_id)
+        .where(
+            OrderProduct.c.order_id.in_(totals),
+            OrderProduct.c.order_created_at.between(min(dates), max(dates)),
+        )
+        .group_by(OrderProduct.c.order_id)
+    )
+    totals.update((order_id, float(total or 0)) for order_id, total in rows)
+    return totals
+
+
+def record_client_orders(db: Session, client_id: int, orders: int, spent: float, last_order_at: Optional[date]):
+    """
+    Soma pedidos e valor às estatísticas do cliente, na transação corrente,
+    com um único INSERT ... ON CONFLICT DO UPDATE (cria a linha se faltar).
+    `last_order_at` só avança.
+    """
+    stats = ClientStats.__table__
+    statement = insert(stats).values(
+        client_id=client_id, order_count=orders, total_spent=spent, last_order_at=last_order_at
+    )
+    excluded = statement.excluded
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[stats.c.client_id],
+            set_={
+                "order_count": stats.c.order_count + excluded.order_count,
+                "total_spent": stats.c.total_spent + excluded.total_spent,
+                "last_order_at": case(
+                    (
+                        or_(stats.c.last_order_at.is_(None), excluded.last_order_at > stats.c.last_order_at),
+                        excluded.last_order_at,
+                    ),
+                    else_=stats.c.last_order_at,
+                ),
+                "updated_at": func.current_timestamp(),
+            },
+        )
+    )
+    invalidate_on_commit(db, entity_key("client", client_id))
+
+
+def remove_client_orders(db: Session, removed: Dict[int, Tuple[int, float]]):
+    """
+    Desconta pedidos cancelados ou excluídos das estatísticas dos clientes, na
+    transação corrente. `removed` traz, por cliente, (pedidos, valor).
+
+    Chamar depois de alterar os pedidos: a data do último pedido é recalculada
+    pelo índice (client_id, created_at) de orders e pelo manifesto do arquivo
+    frio, já que pedidos arquivados continuam contando. As duas leituras são
+    feitas uma vez para todos os clientes.
+    """
+    if not removed:
+        return
+    db.flush()
+    for client_id, (orders, spent) in sorted(removed.items()):
+        record_client_orders(db, client_id, -orders, -spent, None)
+    hot = dict(
+        db.execute(
+            select(Order.client_id, func.max(Order.created_at))
+            .where(Order.client_id.in_(removed), Order.status != OrderStatus.canceled.value)
+            .group_by(Order.client_id)
+        ).all()
+    )
+    archived = last_archived_order_dates(removed)
+    for client_id in sorted(removed):
+        dates = [value for value in (hot.get(client_id), archived.get(client_id)) if value is not None]
+        db.execute(
+            update(ClientStats)
+            .where(ClientStats.client_id == client_id)
+            .values(last_order_at=max(dates) if dates else None)
+        )
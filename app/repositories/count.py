@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from typing import Dict, Tuple
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.pagination import CountMode
+
+_MAX_CACHED_ESTIMATES = 1024
+_estimates: Dict[Tuple, Tuple[float, int]] = {}
+_estimates_lock = threading.Lock()
+
+
+def count_rows(db: Session, query: Select, mode: CountMode) -> int:
+    """
+    Conta as linhas de uma consulta de listagem (antes de offset/limit).
+
+    - `exact`: COUNT(*) sobre a mesma consulta, com os mesmos filtros.
+    - `estimate`: estimativa do planejador do Postgres, sem varrer a tabela.
+      Consultas sem filtro usam `pg_class.reltuples`; as demais, as linhas
+      previstas pelo EXPLAIN. Estimativas abaixo de COUNT_ESTIMATE_EXACT_THRESHOLD
+      são trocadas pela contagem exata, que nesse caso é barata.
+      Em outros bancos, a contagem é sempre exata.
+    """
+    query = query.limit(None).offset(None).order_by(None)
+
+    if mode == CountMode.estimate and db.get_bind().dialect.name == "postgresql":
+        estimate = _cached_estimate(db, query)
+        if estimate >= settings.COUNT_ESTIMATE_EXACT_THRESHOLD:
+            return estimate
+
+    return db.execute(select(func.count()).select_from(query.subquery())).scalar_one()
+
+
+def _cached_estimate(db: Session, query: Select) -> int:
+    compiled = query.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True}
+    )
+    key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+    now = time.monotonic()
+
+    with _estimates_lock:
+        cached = _estimates.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    estimate = _estimate(db, query, compiled)
+    with _estimates_lock:
+        if len(_estimates) >= _MAX_CACHED_ESTIMATES:
+            for expired in [k for k, (expires, _) in _estimates.items() if expires <= now]:
+                del _estimates[expired]
+            if len(_estimates) >= _MAX_CACHED_ESTIMATES:
+                _estimates.clear()
+        _estimates[key] = (now + settings.COUNT_ESTIMATE_TTL_SECONDS, estimate)
+    return estimate
+
+
+def _estimate(db: Session, query: Select, compiled) -> int:
+    froms = query.get_final_froms()
+    if query.whereclause is None and len(froms) == 1 and hasattr(froms[0], "fullname"):
+        reltuples = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": froms[0].fullname},
+        ).scalar()
+        # reltuples é -1 (ou 0) enquanto a tabela não foi analisada
+        if reltuples and reltuples > 0:
+            return int(reltuples)
+
+    plan = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
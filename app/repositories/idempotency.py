@@ -0,0 +1,143 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyKeyMismatch(Exception):
+    def __init__(self, key: str):
+        super().__init__(f"Idempotency key {key} was used with a different request")
+        self.key = key
+
+
+class IdempotencyKeyInProgress(Exception):
+    def __init__(self, key: str):
+        super().__init__(f"Request with idempotency key {key} is still in progress")
+        self.key = key
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    body: Any
+
+
+def request_fingerprint(payload: str) -> str:
+    """Hash do corpo da requisição, usado para detectar reuso da chave com outro conteúdo."""
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def claim_idempotency_key(user_id: int, key: str, request_hash: str) -> Optional[StoredResponse]:
+    """
+    Reserva uma chave de idempotência para o usuário, em transação própria.
+
+    - Retorna None quando a chave foi reservada: a requisição deve ser processada
+      e concluída com `complete_idempotency_key`.
+    - Retorna a resposta gravada quando a chave já foi concluída com o mesmo conteúdo.
+    - Se outra requisição com a mesma chave ainda está em processamento, aguarda
+      até IDEMPOTENCY_WAIT_SECONDS e lança IdempotencyKeyInProgress se ela não terminar.
+    - Lança IdempotencyKeyMismatch se a chave foi usada com outro conteúdo.
+    - Chaves expiradas e reservas abandonadas (mais antigas que
+      IDEMPOTENCY_LOCK_TIMEOUT_SECONDS, sem resposta) são descartadas e reservadas de novo.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    pk = and_(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+
+    while True:
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            db.execute(
+                delete(IdempotencyKey).where(
+                    pk,
+                    or_(
+                        IdempotencyKey.expires_at <= now,
+                        and_(
+                            IdempotencyKey.status_code.is_(None),
+                            IdempotencyKey.created_at
+                            <= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS),
+                        ),
+                    ),
+                )
+            )
+            db.add(
+                IdempotencyKey(
+                    user_id=user_id,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+                )
+            )
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            row = db.execute(
+                select(
+                    IdempotencyKey.request_hash,
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.response_body,
+                ).where(pk)
+            ).first()
+        finally:
+            db.close()
+
+        if row is None:
+            # Removida entre a inserção e a consulta; tenta reservar de novo
+            continue
+        if row.request_hash != request_hash:
+            raise IdempotencyKeyMismatch(key)
+        if row.status_code is not None:
+            return StoredResponse(row.status_code, row.response_body)
+        if time.monotonic() >= deadline:
+            raise IdempotencyKeyInProgress(key)
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def complete_idempotency_key(db: Session, user_id: int, key: str, status_code: int, body: Any):
+    """
+    Grava a resposta da requisição na chave reservada, na transação corrente,
+    para que ela seja confirmada junto com as alterações da própria requisição.
+    """
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status_code=status_code, response_body=body)
+    )
+
+
+def release_idempotency_key(user_id: int, key: str):
+    """
+    Libera uma chave reservada cuja requisição falhou, permitindo uma nova
+    tentativa. Chaves já concluídas não são removidas.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def delete_expired_idempotency_keys(db: Session, now: datetime) -> int:
+    """Remove as chaves expiradas. Retorna o número de chaves removidas."""
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+    return result.rowcount
@@ -0,0 +1,90 @@
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.archive import archive_orders
+from app.core.cache import data_version_key, invalidate_on_commit
+from app.models.order import Order, OrderProduct, OrderStatusHistory
+from app.schemas.order import OrderStatus
+
+# Status finais: pedidos nesses status não mudam mais
+CLOSED_STATUSES = (OrderStatus.delivered.value, OrderStatus.canceled.value)
+
+
+def archive_closed_orders(
+    db: Session, before: date, limit: int, order_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Move até `limit` pedidos entregues ou cancelados criados antes de `before`,
+    com itens e histórico de status, para o arquivo frio, na transação corrente.
+    `order_ids` limita o arquivamento a esses pedidos (padrão: todos).
+    Retorna a quantidade de pedidos arquivados.
+
+    - Os arquivos e o manifesto são gravados antes de as linhas serem
+      removidas; se a transação falhar, o pedido continua no banco e é
+      arquivado de novo na próxima execução.
+    - Pedidos travados por outra transação ficam para a próxima execução.
+    """
+    scope = [Order.status.in_(CLOSED_STATUSES), Order.created_at < before]
+    if order_ids is not None:
+        scope.append(Order.id.in_(list(order_ids)))
+    orders = db.execute(
+        select(Order.id, Order.client_id, Order.status, Order.created_at)
+        .where(*scope)
+        .order_by(Order.created_at, Order.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).mappings().all()
+    if not orders:
+        return 0
+
+    records = {row["id"]: {**row, "products": [], "history": []} for row in orders}
+    # Intervalo de datas dos pedidos: limita as partições lidas e apagadas
+    dates = (orders[0]["created_at"], orders[-1]["created_at"])
+    lines = db.execute(
+        select(OrderProduct.c.order_id, OrderProduct.c.product_id, OrderProduct.c.quantity, OrderProduct.c.unit_price)
+        .where(OrderProduct.c.order_id.in_(records), OrderProduct.c.order_created_at.between(*dates))
+        .order_by(OrderProduct.c.order_id, OrderProduct.c.product_id)
+    )
+    for line in lines:
+        records[line.order_id]["products"].append(
+            {"product_id": line.product_id, "quantity": line.quantity, "unit_price": line.unit_price}
+        )
+    history = db.execute(
+        select(
+            OrderStatusHistory.order_id,
+            OrderStatusHistory.previous_status,
+            OrderStatusHistory.new_status,
+            OrderStatusHistory.changed_at,
+            OrderStatusHistory.changed_by,
+        )
+        .where(OrderStatusHistory.order_id.in_(records), OrderStatusHistory.order_created_at.between(*dates))
+        .order_by(OrderStatusHistory.order_id, OrderStatusHistory.changed_at, OrderStatusHistory.id)
+    )
+    for row in history:
+        records[row.order_id]["history"].append(
+            {
+                "previous_status": row.previous_status,
+                "new_status": row.new_status,
+                "changed_at": row.changed_at,
+                "changed_by": row.changed_by,
+            }
+        )
+
+    archive_orders(records.values())
+
+    db.execute(
+        delete(OrderStatusHistory).where(
+            OrderStatusHistory.order_id.in_(records), OrderStatusHistory.order_created_at.between(*dates)
+        )
+    )
+    db.execute(
+        delete(OrderProduct).where(
+            OrderProduct.c.order_id.in_(records), OrderProduct.c.order_created_at.between(*dates)
+        )
+    )
+    db.execute(delete(Order).where(Order.id.in_(records), Order.created_at.between(*dates)))
+    invalidate_on_commit(db, data_version_key("orders"))
+    return len(records)
@@ -0,0 +1,169 @@
+import logging
+import re
+from datetime import date
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+# Tabelas particionadas por mês da data do pedido: (tabela, coluna da partição).
+# order_product e order_status_history acompanham as partições de orders.
+PARTITIONED_TABLES = (
+    ("orders", "created_at"),
+    ("order_product", "order_created_at"),
+    ("order_status_history", "order_created_at"),
+)
+_MONTH_PARTITION = re.compile(r"^orders_p(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    """Primeiro dia do mês `months` meses depois (ou antes) do mês de `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_ranges(first: date, count: int) -> List[Tuple[date, date]]:
+    """Intervalos [início, fim) de `count` meses consecutivos a partir do mês de `first`."""
+    return [(add_months(first, i), add_months(first, i + 1)) for i in range(count)]
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def create_order_partitions(db: Session, today: date, months_ahead: int) -> List[str]:
+    """
+    Garante as partições mensais do mês de `today` até `months_ahead` meses à
+    frente nas três tabelas de pedidos. Retorna as partições criadas.
+
+    - Partições existentes são mantidas.
+    - Cada mês é criado em um savepoint próprio: a falha de um mês é
+      registrada no log e não impede os demais.
+    - Pedidos de um mês ainda sem partição ficam na partição DEFAULT, e o
+      Postgres recusa criar a partição enquanto houver linhas do mês nela.
+      Essas linhas são copiadas para tabelas temporárias, removidas da
+      DEFAULT e reinseridas depois de criar a partição, na mesma transação.
+    - Fora do Postgres não há particionamento e nada é feito.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return []
+
+    logger = logging.getLogger(__name__)
+    existing = set(
+        db.execute(
+            text("SELECT relname FROM pg_class WHERE relname = ANY(:names)"),
+            {
+                "names": [
+                    partition_name(table, start)
+                    for start, _ in month_ranges(today, months_ahead + 1)
+                    for table, _ in PARTITIONED_TABLES
+                ]
+            },
+        ).scalars()
+    )
+    created = []
+    for start, end in month_ranges(today, months_ahead + 1):
+        missing = [
+            (table, column)
+            for table, column in PARTITIONED_TABLES
+            if partition_name(table, start) not in existing
+        ]
+        if not missing:
+            continue
+        try:
+            with db.begin_nested():
+                _create_month_partitions(db, missing, start, end)
+        except DBAPIError as e:
+            logger.error("Falha ao criar as partições de pedidos de %s: %s", f"{start:%Y-%m}", str(e))
+            continue
+        created.extend(partition_name(table, start) for table, _ in missing)
+    return created
+
+
+def _create_month_partitions(db: Session, tables: List[Tuple[str, str]], start: date, end: date):
+    """Cria as partições do mês, tirando antes da DEFAULT as linhas do mês."""
+    bounds = {"start": start, "end": end}
+    moved = []
+    for table, column in tables:
+        moving = f"{partition_name(table, start)}_moving"
+        db.execute(
+            text(
+                f"CREATE TEMP TABLE {moving} ON COMMIT DROP AS "
+                f"SELECT * FROM {default_partition_name(table)} "
+                f"WHERE {column} >= :start AND {column} < :end"
+            ),
+            bounds,
+        )
+        moved.append((table, column, moving))
+
+    # Itens e histórico referenciam o pedido: saem antes e voltam depois dele
+    for table, column, _ in reversed(moved):
+        db.execute(
+            text(f"DELETE FROM {default_partition_name(table)} WHERE {column} >= :start AND {column} < :end"),
+            bounds,
+        )
+    for table, _, moving in moved:
+        db.execute(
+            text(
+                f"CREATE TABLE {partition_name(table, start)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+        db.execute(text(f"INSERT INTO {table} SELECT * FROM {moving}"))
+        db.execute(text(f"DROP TABLE {moving}"))
+
+
+def detach_order_partitions(db: Session, before: date) -> List[str]:
+    """
+    Desanexa as partições mensais inteiramente anteriores ao mês de `before`,
+    na transação corrente. Retorna as tabelas desanexadas.
+
+    - DETACH PARTITION só altera o catálogo: não há cópia nem DELETE de linhas,
+      e as tabelas desanexadas continuam no banco para arquivamento ou DROP.
+    - Itens e histórico de cada mês são desanexados antes do pedido, e suas
+      chaves estrangeiras para orders são removidas, para que a partição de
+      orders possa sair sem checar referências.
+    - Fora do Postgres não há particionamento e nada é feito.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return []
+
+    partitions = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'orders'::regclass"
+        )
+    ).scalars()
+    cutoff = before.replace(day=1)
+    months = sorted(
+        date(int(match[1]), int(match[2]), 1)
+        for match in map(_MONTH_PARTITION.match, partitions)
+        if match and date(int(match[1]), int(match[2]), 1) < cutoff
+    )
+
+    detached = []
+    for month in months:
+        for table, _ in PARTITIONED_TABLES[1:]:
+            name = partition_name(table, month)
+            db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            constraints = db.execute(
+                text(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f' "
+                    "AND confrelid = 'orders'::regclass"
+                ),
+                {"name": name},
+            ).scalars().all()
+            for constraint in constraints:
+                db.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+            detached.append(name)
+        name = partition_name("orders", month)
+        db.execute(text(f"ALTER TABLE orders DETACH PARTITION {name}"))
+        detached.append(name)
+    return detached
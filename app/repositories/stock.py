@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import entity_key, invalidate_on_commit
+from app.models.product import Product
+from app.models.stock_movement import StockMovement
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id: int):
+        super().__init__(f"Insufficient stock for product {product_id}")
+        self.product_id = product_id
+
+
+def apply_stock_movements(
+    db: Session,
+    changes: Iterable[Tuple[int, int]],
+    reason: str,
+    order_id: int | None = None,
+    user_id: int | None = None,
+) -> List[StockMovement]:
+    """
+    Aplica variações de estoque (product_id, quantidade com sinal) e registra
+    cada uma no livro de movimentações, na transação corrente.
+
+    - O saldo em `products.stock` é atualizado atomicamente (stock = stock + n),
+      sem ler e regravar a linha do produto.
+    - Lança InsufficientStock se alguma variação deixar o estoque negativo.
+    - Retorna as movimentações registradas.
+    """
+    movements: List[dict] = []
+
+    # Ordem fixa de product_id evita deadlocks entre pedidos concorrentes.
+    for product_id, quantity in sorted(changes):
+        if quantity == 0:
+            continue
+        result = db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock + quantity >= 0)
+            .values(stock=Product.stock + quantity)
+        )
+        if result.rowcount != 1:
+            raise InsufficientStock(product_id)
+        invalidate_on_commit(db, entity_key("product", product_id))
+        movements.append(
+            {
+                "product_id": product_id,
+                "quantity": quantity,
+                "reason": reason,
+                "order_id": order_id,
+                "user_id": user_id,
+            }
+        )
+
+    if not movements:
+        return []
+
+    return db.scalars(
+        insert(StockMovement).returning(StockMovement, sort_by_parameter_order=True),
+        movements,
+    ).all()
+
+
+def compact_stock_movements(
+    db: Session, before: datetime, product_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Compacta as movimentações anteriores a `before` em uma única movimentação
+    "compaction" por produto, preservando o saldo do livro.
+    `product_ids` limita a compactação a esses produtos (padrão: todos).
+    Retorna a quantidade de movimentações removidas.
+    """
+    scope = [StockMovement.created_at < before]
+    if product_ids is not None:
+        scope.append(StockMovement.product_id.in_(list(product_ids)))
+    max_id = db.scalar(select(func.max(StockMovement.id)).where(*scope))
+    if max_id is None:
+        return 0
+
+    old = (*scope, StockMovement.id <= max_id)
+    db.execute(
+        insert(StockMovement).from_select(
+            ["product_id", "quantity", "reason", "created_at"],
+            select(
+                StockMovement.product_id,
+                func.sum(StockMovement.quantity),
+                literal("compaction"),
+                literal(before, StockMovement.created_at.type),
+            )
+            .where(*old)
+            .group_by(StockMovement.product_id),
+        )
+    )
+    result = db.execute(delete(StockMovement).where(*old))
+
+    return result.rowcount
+
+
+def find_stock_discrepancies(db: Session):
+    """
+    Compara o saldo de `products.stock` com a soma do livro de movimentações.
+    Com o livro compactado, a soma percorre poucas linhas por produto.
+    """
+    ledger = (
+        select(
+            StockMovement.product_id,
+            func.sum(StockMovement.quantity).label("total"),
+        )
+        .group_by(StockMovement.product_id)
+        .subquery()
+    )
+    ledger_total = func.coalesce(ledger.c.total, 0)
+
+    return db.execute(
+        select(Product.id, Product.stock, ledger_total.label("ledger_total"))
+        .outerjoin(ledger, ledger.c.product_id == Product.id)
+        .where(Product.stock != ledger_total)
+    ).all()
@@ -0,0 +1,23 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel
+
+
+class TopProduct(BaseModel):
+    product_id: int
+    description: str
+    quantity: int
+    revenue: float
+
+
+class SectionTopProducts(BaseModel):
+    section: str
+    products: List[TopProduct]
+
+
+class DailyRevenue(BaseModel):
+    date: date
+    revenue: float
+    quantity: int
+    moving_average: float
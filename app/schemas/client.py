@@ -1,4 +1,8 @@
-from pydantic import BaseModel, EmailStr, constr
+from datetime import date
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel, EmailStr, Field, constr
 from typing_extensions import Annotated
 
 
@@ -23,3 +27,50 @@ class ClientOut(ClientBase):
 
     class Config:
         from_attributes = True
+
+
+class ClientStatsOut(BaseModel):
+    order_count: int = 0
+    total_spent: float = 0.0
+    last_order_at: date | None = None
+    average_ticket: float | None = None
+
+
+class ClientDetailOut(ClientOut):
+    stats: ClientStatsOut
+
+
+class ClientSortField(str, Enum):
+    order_count = "order_count"
+    total_spent = "total_spent"
+    last_order_at = "last_order_at"
+
+
+class ClientAutocompleteOut(BaseModel):
+    id: int
+    name: str
+    email: str
+    cpf: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class ClientBulkCreate(BaseModel):
+    clients: List[ClientCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class ClientBulkCreated(ClientOut):
+    index: int
+
+
+class ClientBulkConflict(BaseModel):
+    index: int
+    email: str
+    cpf: str | None = None
+    detail: str
+
+
+class ClientBulkResult(BaseModel):
+    created: List[ClientBulkCreated]
+    conflicts: List[ClientBulkConflict]
@@ -1,8 +1,8 @@
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class OrderStatus(str, Enum):
@@ -13,6 +13,29 @@ class OrderStatus(str, Enum):
     canceled = "canceled"
 
 
+# Transições de status permitidas: status atual -> próximos status possíveis
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.pending: {OrderStatus.processing, OrderStatus.canceled},
+    OrderStatus.processing: {OrderStatus.shipped, OrderStatus.canceled},
+    OrderStatus.shipped: {OrderStatus.delivered},
+    OrderStatus.delivered: set(),
+    OrderStatus.canceled: set(),
+}
+
+
+def allowed_previous_statuses(new_status: OrderStatus) -> List[str]:
+    """Status atuais a partir dos quais o pedido pode passar para `new_status`."""
+    return [
+        current.value
+        for current, targets in ORDER_STATUS_TRANSITIONS.items()
+        if new_status in targets
+    ]
+
+
+def transition_not_allowed(current: str, new_status: OrderStatus) -> str:
+    return f"Transition from {current} to {OrderStatus(new_status).value} not allowed."
+
+
 class OrderProduct(BaseModel):
     product_id: int
     quantity: int
@@ -28,8 +51,8 @@ class OrderCreate(OrderBase):
     products: List[OrderProduct]
 
 
-class OrderUpdateStatus(OrderBase):
-    status: str
+class OrderUpdateStatus(BaseModel):
+    status: OrderStatus
 
 
 class OrderOut(OrderBase):
@@ -38,3 +61,47 @@ class OrderOut(OrderBase):
 
     class Config:
         from_attributes = True
+
+
+class OrderStatusHistoryOut(BaseModel):
+    previous_status: str
+    new_status: str
+    changed_at: datetime
+    changed_by: Optional[int] = None
+
+
+class OrderTimelineOut(BaseModel):
+    order_id: int
+    status: str
+    history: List[OrderStatusHistoryOut]
+
+
+class OrderBulkStatusUpdate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: OrderStatus
+
+
+class OrderBulkStatusSkipped(BaseModel):
+    order_id: int
+    detail: str
+
+
+class OrderBulkStatusResult(BaseModel):
+    updated: List[int]
+    skipped: List[OrderBulkStatusSkipped]
+
+
+class ClientOrderLineOut(BaseModel):
+    product_id: int
+    description: str
+    quantity: int
+    unit_price: float
+    total: float
+
+
+class ClientOrderOut(BaseModel):
+    id: int
+    status: str
+    created_at: date
+    total: float
+    products: List[ClientOrderLineOut]
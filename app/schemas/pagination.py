@@ -0,0 +1,16 @@
+from enum import Enum
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,7 @@
 from datetime import date
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ProductBase(BaseModel):
@@ -10,6 +10,7 @@ class ProductBase(BaseModel):
     barcode: str
     section: str
     stock: int
+    reorder_threshold: int = Field(0, ge=0)
     expiration_date: Optional[date]
     image: Optional[str] = None
 
@@ -27,3 +28,7 @@ class ProductOut(ProductBase):
 
     class Config:
         from_attributes = True
+
+
+class SectionReorderThreshold(BaseModel):
+    reorder_threshold: int = Field(..., ge=0)
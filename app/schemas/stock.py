@@ -0,0 +1,40 @@
+from datetime import datetime
+from enum import Enum
+from typing import Literal, Optional
+
+from pydantic import BaseModel, model_validator
+
+
+class StockMovementReason(str, Enum):
+    opening = "opening"
+    order = "order"
+    order_update = "order_update"
+    restock = "restock"
+    adjustment = "adjustment"
+    compaction = "compaction"
+
+
+class StockMovementCreate(BaseModel):
+    quantity: int
+    reason: Literal[StockMovementReason.restock, StockMovementReason.adjustment]
+
+    @model_validator(mode="after")
+    def check_quantity(self):
+        if self.quantity == 0:
+            raise ValueError("quantity must not be zero")
+        if self.reason == StockMovementReason.restock and self.quantity < 0:
+            raise ValueError("restock quantity must be positive")
+        return self
+
+
+class StockMovementOut(BaseModel):
+    id: int
+    product_id: int
+    quantity: int
+    reason: StockMovementReason
+    order_id: Optional[int] = None
+    user_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,102 @@
+"""
+Ponto de entrada de produção: `python -m app.server`.
+
+Sobe o uvicorn com um worker por CPU disponível (ou WEB_CONCURRENCY), sem
+reload. Cada worker aquece seu pool de conexões no lifespan; ao receber
+SIGTERM, para de aceitar conexões, conclui as requisições em andamento e
+envia as notificações e logs pendentes antes de sair. Os workers são
+reciclados após MAX_REQUESTS_PER_WORKER requisições para conter o
+crescimento de memória.
+
+Com réplicas de leitura e mais de um worker, REDIS_URL é necessário para
+que o read-your-writes valha entre workers.
+"""
+import inspect
+import logging
+import math
+import os
+
+import uvicorn
+
+from app.core.config import Settings, get_settings
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> float | None:
+    """
+    Limite de CPU do container (cgroup v2 `cpu.max` ou v1 `cpu.cfs_quota_us`),
+    em número de CPUs, ou None quando não há limite.
+    """
+    cpu_max = _read(os.path.join(root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and quota.isdigit() and period.isdigit() and int(period):
+            return int(quota) / int(period)
+        return None
+
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+    try:
+        if quota and period and int(quota) > 0 and int(period) > 0:
+            return int(quota) / int(period)
+    except ValueError:
+        pass
+    return None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> int:
+    """CPUs que o processo pode usar: afinidade, limitada pela cota do cgroup."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpu_limit(root)
+    if limit:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def worker_count(settings: Settings) -> int:
+    return settings.WEB_CONCURRENCY or available_cpus()
+
+
+def server_options(settings: Settings) -> dict:
+    options = {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": worker_count(settings),
+        "proxy_headers": True,
+        "timeout_graceful_shutdown": settings.GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS,
+    }
+    if settings.MAX_REQUESTS_PER_WORKER:
+        options["limit_max_requests"] = settings.MAX_REQUESTS_PER_WORKER
+        # Jitter evita que todos os workers reiniciem ao mesmo tempo
+        # (disponível nas versões mais recentes do uvicorn)
+        if "limit_max_requests_jitter" in inspect.signature(uvicorn.Config).parameters:
+            options["limit_max_requests_jitter"] = settings.MAX_REQUESTS_JITTER
+    return options
+
+
+def main():
+    settings = get_settings()
+    options = server_options(settings)
+    if options["workers"] > 1 and settings.DATABASE_REPLICA_URL and not settings.REDIS_URL:
+        logging.getLogger(__name__).warning(
+            "Read-your-writes sem REDIS_URL fica na memória de cada worker: "
+            "leituras logo após uma escrita podem ir para uma réplica atrasada."
+        )
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
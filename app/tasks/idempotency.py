@@ -0,0 +1,13 @@
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.repositories.idempotency import delete_expired_idempotency_keys
+
+
+def purge_idempotency_keys(db: Session):
+    """Remove as chaves de idempotência de pedidos que já expiraram."""
+    logger = logging.getLogger(__name__)
+    removed = delete_expired_idempotency_keys(db, datetime.now(timezone.utc))
+    logger.info("Chaves de idempotência expiradas removidas: %s", removed)
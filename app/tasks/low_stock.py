@@ -0,0 +1,61 @@
+from sqlalchemy.orm import Session
+
+from app.integrations.whatsapp.whatsapp import send_whatsapp_message
+from app.models.product import Product
+from app.models.user import AccessLevel, User
+
+DIGEST_MAX_PRODUCTS = 50
+
+
+def get_low_stock_products(db: Session, section: str | None = None):
+    """
+    Consulta os produtos com estoque no ponto de reposição ou abaixo dele.
+    O filtro coincide com o predicado do índice parcial `ix_products_low_stock`.
+    """
+    query = db.query(Product).filter(Product.stock <= Product.reorder_threshold)
+
+    if section:
+        query = query.filter(Product.section == section)
+
+    return query.order_by(Product.section, Product.stock, Product.id)
+
+
+def build_low_stock_digest(db: Session) -> str | None:
+    products = get_low_stock_products(db).limit(DIGEST_MAX_PRODUCTS + 1).all()
+
+    if not products:
+        return None
+
+    lines = ["Produtos com estoque baixo:"]
+    for product in products[:DIGEST_MAX_PRODUCTS]:
+        lines.append(
+            f"- {product.description} ({product.section}): "
+            f"{product.stock} em estoque, reposição em {product.reorder_threshold}"
+        )
+    if len(products) > DIGEST_MAX_PRODUCTS:
+        lines.append("Consulte /products/low-stock para a lista completa.")
+
+    return "\n".join(lines)
+
+
+def send_low_stock_digest(db: Session):
+    """
+    Envia aos administradores ativos, via WhatsApp, o resumo dos produtos
+    com estoque baixo. Não envia nada quando não há produtos para repor.
+    """
+    message = build_low_stock_digest(db)
+
+    if not message:
+        return
+
+    admins = (
+        db.query(User.phone)
+        .filter(
+            User.access_level == AccessLevel.admin,
+            User.is_active.is_(True),
+            User.phone.isnot(None),
+        )
+        .all()
+    )
+    for admin in admins:
+        send_whatsapp_message(admin.phone, message)
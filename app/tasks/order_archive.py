@@ -0,0 +1,25 @@
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.order_archive import archive_closed_orders
+
+
+def archive_old_orders(db: Session):
+    """
+    Move para o arquivo frio os pedidos entregues e cancelados com mais de
+    ORDER_ARCHIVE_AFTER_DAYS dias, em lotes de ORDER_ARCHIVE_BATCH_SIZE pedidos
+    confirmados um a um.
+    """
+    logger = logging.getLogger(__name__)
+    before = date.today() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+    total = 0
+    while True:
+        archived = archive_closed_orders(db, before, settings.ORDER_ARCHIVE_BATCH_SIZE)
+        db.commit()
+        total += archived
+        if archived < settings.ORDER_ARCHIVE_BATCH_SIZE:
+            break
+    logger.info("Pedidos arquivados: %s", total)
@@ -0,0 +1,15 @@
+import logging
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.partitions import create_order_partitions
+
+
+def create_future_order_partitions(db: Session):
+    """Cria as partições mensais de pedidos dos próximos ORDER_PARTITION_MONTHS_AHEAD meses."""
+    logger = logging.getLogger(__name__)
+    created = create_order_partitions(db, date.today(), settings.ORDER_PARTITION_MONTHS_AHEAD)
+    if created:
+        logger.info("Partições de pedidos criadas: %s", ", ".join(created))
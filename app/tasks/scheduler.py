@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Tuple
+
+import sentry_sdk
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.scheduled_job import ScheduledJob
+
+Job = Callable[[Session], None]
+
+
+def get_periodic_jobs() -> List[Tuple[str, Job, int]]:
+    """
+    Lista os jobs periódicos habilitados: (nome, função, intervalo em segundos).
+    Um intervalo igual a zero desabilita o job.
+    """
+    from app.tasks.idempotency import purge_idempotency_keys
+    from app.tasks.low_stock import send_low_stock_digest
+    from app.tasks.order_archive import archive_old_orders
+    from app.tasks.partitions import create_future_order_partitions
+    from app.tasks.stock_ledger import compact_stock_ledger
+
+    jobs = [
+        ("low_stock_digest", send_low_stock_digest, settings.LOW_STOCK_DIGEST_INTERVAL_MINUTES * 60),
+        ("stock_ledger_compaction", compact_stock_ledger, settings.STOCK_LEDGER_COMPACTION_INTERVAL_MINUTES * 60),
+        ("idempotency_key_cleanup", purge_idempotency_keys, settings.IDEMPOTENCY_CLEANUP_INTERVAL_MINUTES * 60),
+        ("order_partition_maintenance", create_future_order_partitions, settings.ORDER_PARTITION_INTERVAL_MINUTES * 60),
+        ("order_archive", archive_old_orders, settings.ORDER_ARCHIVE_INTERVAL_MINUTES * 60),
+    ]
+    return [job for job in jobs if job[2] > 0]
+
+
+def claim_job_run(db: Session, name: str, interval_seconds: int) -> bool:
+    """
+    Reserva a execução de um job para o intervalo atual.
+
+    Com vários workers, apenas o primeiro que atualizar `last_run_at`
+    executa o job; os demais recebem False até o próximo intervalo.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        with db.begin_nested():
+            db.add(ScheduledJob(name=name, last_run_at=now))
+        return True
+    except IntegrityError:
+        pass
+
+    result = db.execute(
+        update(ScheduledJob)
+        .where(
+            ScheduledJob.name == name,
+            ScheduledJob.last_run_at <= now - timedelta(seconds=interval_seconds),
+        )
+        .values(last_run_at=now)
+    )
+    return result.rowcount == 1
+
+
+def run_job(name: str, job: Job, interval_seconds: int):
+    logger = logging.getLogger(__name__)
+    db = SessionLocal()
+    try:
+        if not claim_job_run(db, name, interval_seconds):
+            db.commit()
+            return
+        db.commit()
+        job(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro inesperado no job %s: %s", name, str(e), exc_info=True)
+        sentry_sdk.capture_exception(e)
+    finally:
+        db.close()
+
+
+async def run_periodically(name: str, job: Job, interval_seconds: int):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await run_in_threadpool(run_job, name, job, interval_seconds)
+
+
+def start_periodic_jobs() -> List[asyncio.Task]:
+    return [
+        asyncio.create_task(run_periodically(name, job, interval))
+        for name, job, interval in get_periodic_jobs()
+    ]
@@ -0,0 +1,31 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+import sentry_sdk
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.stock import compact_stock_movements, find_stock_discrepancies
+
+
+def compact_stock_ledger(db: Session):
+    """
+    Compacta o livro de movimentações de estoque e confere o saldo de cada
+    produto contra a soma do livro, registrando divergências no log e no Sentry.
+    """
+    logger = logging.getLogger(__name__)
+    before = datetime.now(timezone.utc) - timedelta(days=settings.STOCK_LEDGER_RETENTION_DAYS)
+
+    removed = compact_stock_movements(db, before)
+    logger.info("Livro de estoque compactado: %s movimentações removidas", removed)
+
+    discrepancies = find_stock_discrepancies(db)
+    if discrepancies:
+        logger.warning(
+            "Divergências de estoque encontradas: %s",
+            [(row.id, row.stock, row.ledger_total) for row in discrepancies],
+        )
+        sentry_sdk.capture_message(
+            f"{len(discrepancies)} produtos com estoque divergente do livro de movimentações",
+            level="warning",
+        )
@@ -0,0 +1,398 @@
+"""
+Gera uma massa de dados sintética para testes de desempenho e a carrega com
+COPY direto nas tabelas de `app/models` (clients, products, stock_movements,
+orders, order_product, order_status_history e client_stats).
+
+- Determinística: a mesma `--seed` e a mesma `--scale` geram os mesmos dados.
+- Escala: 1x = 10 mil clientes, 2 mil produtos e 50 mil pedidos (~3,5 itens
+  por pedido); `--scale 100` gera 1 milhão de clientes e 5 milhões de pedidos.
+- Distribuições realistas: popularidade de produtos e frequência de compra dos
+  clientes seguem Pareto; datas de pedido têm sazonalidade (Dia das Mães,
+  Black Friday, Natal, fins de semana) e tendência de crescimento; o status
+  depende da idade do pedido (antigos entregues ou cancelados, recentes em andamento).
+- Os IDs continuam a partir dos existentes e as sequências são ajustadas
+  (setval) ao final, para que a API continue inserindo normalmente.
+- Cada produto recebe a movimentação de saldo inicial no livro de estoque,
+  mantendo `products.stock` igual à soma do livro.
+- As estatísticas de pedidos dos clientes gerados (client_stats) são
+  calculadas durante a geração, como a API as manteria.
+
+Uso:
+    python -m benchmarks.generate_data --scale 10 --seed 42
+    python -m benchmarks.generate_data --scale 1 --truncate        # limpa as tabelas antes
+    python -m benchmarks.generate_data --scale 1 --output-dir /tmp/massa   # só gera CSVs
+
+A carga exige Postgres (psycopg2) em DATABASE_URL; com `--output-dir`, os
+arquivos CSV podem ser carregados depois com `\\copy` no psql.
+"""
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import os
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+from app.models.client import Client
+from app.models.client_stats import ClientStats
+from app.models.order import Order, OrderProduct, OrderStatusHistory
+from app.models.product import Product
+from app.models.stock_movement import StockMovement
+from app.repositories.partitions import PARTITIONED_TABLES, month_ranges, partition_name
+from app.schemas.stock import StockMovementReason
+
+BASE_CLIENTS = 10_000
+BASE_PRODUCTS = 2_000
+BASE_ORDERS = 50_000
+CHUNK_ROWS = 50_000
+
+FIRST_NAMES = [
+    "Ana", "Beatriz", "Bruno", "Camila", "Carlos", "Daniela", "Eduardo", "Fernanda",
+    "Gabriel", "Helena", "Igor", "Juliana", "Lucas", "Mariana", "Natália", "Pedro",
+    "Rafael", "Sofia", "Thiago", "Vitória",
+]
+LAST_NAMES = [
+    "Almeida", "Barbosa", "Carvalho", "Costa", "Ferreira", "Gomes", "Lima", "Martins",
+    "Oliveira", "Pereira", "Ribeiro", "Rocha", "Santos", "Silva", "Souza",
+]
+STREETS = ["Rua das Flores", "Av. Brasil", "Rua XV de Novembro", "Av. Paulista", "Rua da Paz"]
+SECTIONS = {
+    "Roupas": ["Camiseta", "Calça", "Vestido", "Saia", "Jaqueta", "Blusa"],
+    "Calçados": ["Tênis", "Sandália", "Bota", "Sapatilha"],
+    "Acessórios": ["Bolsa", "Cinto", "Óculos", "Relógio", "Colar"],
+    "Perfumaria": ["Perfume", "Hidratante", "Batom", "Esmalte"],
+    "Casa": ["Toalha", "Lençol", "Almofada", "Tapete"],
+}
+COLORS = ["Preto", "Branco", "Azul", "Vermelho", "Verde", "Bege", "Rosa", "Cinza"]
+
+# Sazonalidade do varejo: maio (Dia das Mães), novembro (Black Friday) e dezembro (Natal)
+MONTH_FACTOR = {1: 0.8, 2: 0.8, 3: 0.9, 4: 0.9, 5: 1.3, 6: 1.0, 7: 0.9, 8: 1.0, 9: 0.9, 10: 1.0, 11: 1.7, 12: 1.9}
+# Segunda a domingo
+WEEKDAY_FACTOR = [1.0, 0.95, 0.95, 1.0, 1.15, 1.35, 0.7]
+
+# Status por idade do pedido em dias: (idade máxima, [(status, peso), ...])
+STATUS_BY_AGE = [
+    (7, [("pending", 40), ("processing", 30), ("shipped", 20), ("canceled", 10)]),
+    (30, [("processing", 7), ("shipped", 25), ("delivered", 60), ("canceled", 8)]),
+    (None, [("delivered", 91), ("canceled", 9)]),
+]
+STATUS_PATH = ["pending", "processing", "shipped", "delivered"]
+
+
+class CopySink:
+    """Carrega as linhas com COPY ... FROM STDIN (psycopg2), em uma única transação."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+
+    def write(self, table, columns, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        self.cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+    def next_id(self, table):
+        self.cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table.name}")
+        return self.cursor.fetchone()[0]
+
+    def truncate(self, tables):
+        names = ", ".join(table.name for table in tables)
+        self.cursor.execute(f"TRUNCATE {names} RESTART IDENTITY CASCADE")
+
+    def create_partitions(self, first, last):
+        # Pedidos fora das partições mensais cairiam na partição DEFAULT
+        months = (last.year - first.year) * 12 + last.month - first.month + 1
+        for start, end in month_ranges(first, months):
+            for table, _ in PARTITIONED_TABLES:
+                self.cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+
+    def finish(self, tables):
+        for table in tables:
+            if "id" in table.c:
+                self.cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+                )
+        self.connection.commit()
+        # Estatísticas atualizadas para o planejador (e para count=estimate)
+        self.connection.autocommit = True
+        for table in tables:
+            self.cursor.execute(f"ANALYZE {table.name}")
+
+
+class CsvSink:
+    """Grava um CSV por tabela, com cabeçalho, em vez de carregar no banco."""
+
+    def __init__(self, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.files = {}
+
+    def write(self, table, columns, rows):
+        if table.name not in self.files:
+            f = open(os.path.join(self.output_dir, f"{table.name}.csv"), "w", newline="")
+            csv.writer(f).writerow(columns)
+            self.files[table.name] = f
+        csv.writer(self.files[table.name]).writerows(rows)
+
+    def next_id(self, table):
+        return 1
+
+    def truncate(self, tables):
+        pass
+
+    def create_partitions(self, first, last):
+        pass
+
+    def finish(self, tables):
+        for f in self.files.values():
+            f.close()
+
+
+def pareto_cum_weights(rng, n, alpha):
+    """Pesos acumulados de popularidade com cauda longa (poucos itens concentram a maioria)."""
+    return list(itertools.accumulate(rng.paretovariate(alpha) for _ in range(n)))
+
+
+def seasonal_days(start, days):
+    """Dias do período e pesos acumulados de volume de pedidos por dia."""
+    dates = [start + timedelta(days=i) for i in range(days)]
+    weights = (
+        MONTH_FACTOR[d.month] * WEEKDAY_FACTOR[d.weekday()] * (1 + 0.5 * i / days)
+        for i, d in enumerate(dates)
+    )
+    return dates, list(itertools.accumulate(weights))
+
+
+def order_status(rng, age_days):
+    for max_age, choices in STATUS_BY_AGE:
+        if max_age is None or age_days <= max_age:
+            statuses, weights = zip(*choices)
+            return rng.choices(statuses, weights)[0]
+
+
+def status_history(rng, order_id, created_at, status, next_history_id):
+    """Transições de status até o status atual, com horários crescentes a partir da criação."""
+    if status == "pending":
+        return []
+    if status == "canceled":
+        path = ["pending", "canceled"] if rng.random() < 0.6 else ["pending", "processing", "canceled"]
+    else:
+        path = STATUS_PATH[: STATUS_PATH.index(status) + 1]
+
+    changed_at = datetime.combine(created_at, dt_time(9), tzinfo=timezone.utc)
+    rows = []
+    for previous, new in zip(path, path[1:]):
+        changed_at += timedelta(hours=rng.randint(2, 72))
+        rows.append((next(next_history_id), order_id, created_at, previous, new, changed_at.isoformat(), None))
+    return rows
+
+
+def generate_clients(sink, rng, first_id, count):
+    columns = ("id", "name", "email", "phone", "cpf", "address")
+    rows = []
+    for client_id in range(first_id, first_id + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append(
+            (
+                client_id,
+                f"{first} {last}",
+                f"{first.lower()}.{last.lower()}.{client_id}@example.com",
+                f"119{rng.randrange(10**8):08d}",
+                f"9{client_id:010d}",
+                f"{rng.choice(STREETS)}, {rng.randint(1, 3000)}",
+            )
+        )
+        if len(rows) == CHUNK_ROWS:
+            sink.write(Client.__table__, columns, rows)
+            rows = []
+    if rows:
+        sink.write(Client.__table__, columns, rows)
+
+
+def generate_products(sink, rng, first_id, count, first_movement_id):
+    """Gera os produtos e o saldo inicial de cada um no livro; retorna os preços."""
+    columns = (
+        "id", "description", "price", "barcode", "section", "stock",
+        "reorder_threshold", "expiration_date", "image",
+    )
+    movement_columns = ("id", "product_id", "quantity", "reason", "order_id", "user_id", "created_at")
+    opened_at = datetime(2020, 1, 1, tzinfo=timezone.utc).isoformat()
+    sections = list(SECTIONS)
+    prices = []
+    rows, movements = [], []
+    for i, product_id in enumerate(range(first_id, first_id + count)):
+        section = sections[i % len(sections)]
+        price = round(rng.lognormvariate(4, 0.7), 2)
+        stock = rng.randint(0, 500)
+        prices.append(price)
+        rows.append(
+            (
+                product_id,
+                f"{rng.choice(SECTIONS[section])} {rng.choice(COLORS)} {product_id}",
+                price,
+                f"789{product_id:010d}",
+                section,
+                stock,
+                rng.choice((0, 5, 10, 20)),
+                date(2025, 1, 1) + timedelta(days=rng.randrange(1095)),
+                None,
+            )
+        )
+        if stock:
+            movements.append(
+                (first_movement_id + len(movements), product_id, stock,
+                 StockMovementReason.opening.value, None, None, opened_at)
+            )
+    for start in range(0, len(rows), CHUNK_ROWS):
+        sink.write(Product.__table__, columns, rows[start:start + CHUNK_ROWS])
+    for start in range(0, len(movements), CHUNK_ROWS):
+        sink.write(StockMovement.__table__, movement_columns, movements[start:start + CHUNK_ROWS])
+    return prices
+
+
+def generate_orders(sink, rng, args, first_ids, client_count, prices):
+    order_columns = ("id", "client_id", "status", "created_at")
+    line_columns = ("order_id", "order_created_at", "product_id", "quantity", "unit_price")
+    history_columns = (
+        "id", "order_id", "order_created_at", "previous_status", "new_status", "changed_at", "changed_by"
+    )
+
+    client_weights = pareto_cum_weights(rng, client_count, 1.8)
+    product_weights = pareto_cum_weights(rng, len(prices), 1.2)
+    dates, date_weights = seasonal_days(args.start_date, args.days)
+    end_date = dates[-1]
+    next_history_id = itertools.count(first_ids["history"])
+    product_ids = range(first_ids["product"], first_ids["product"] + len(prices))
+    client_ids = range(first_ids["client"], first_ids["client"] + client_count)
+
+    order_count = round(BASE_ORDERS * args.scale)
+    totals = {"orders": 0, "lines": 0, "history": 0}
+    # client_id -> [pedidos, valor gasto, último pedido], sem os cancelados
+    stats = {}
+    first_order = first_ids["order"]
+    for chunk_start in range(0, order_count, CHUNK_ROWS):
+        chunk = min(CHUNK_ROWS, order_count - chunk_start)
+        clients = rng.choices(client_ids, cum_weights=client_weights, k=chunk)
+        created = sorted(rng.choices(dates, cum_weights=date_weights, k=chunk))
+        orders, lines, history = [], [], []
+        for offset, (client_id, created_at) in enumerate(zip(clients, created)):
+            order_id = first_order + chunk_start + offset
+            status = order_status(rng, (end_date - created_at).days)
+            orders.append((order_id, client_id, status, created_at))
+
+            line_count = min(50, 1 + int(rng.expovariate(0.4)))
+            picked = dict.fromkeys(rng.choices(product_ids, cum_weights=product_weights, k=line_count))
+            order_total = 0.0
+            for product_id in picked:
+                quantity = rng.choices((1, 2, 3, 4, 5), (60, 20, 10, 5, 5))[0]
+                price = prices[product_id - first_ids["product"]]
+                lines.append((order_id, created_at, product_id, quantity, price))
+                order_total += quantity * price
+
+            if status != "canceled":
+                client_stats = stats.setdefault(client_id, [0, 0.0, created_at])
+                client_stats[0] += 1
+                client_stats[1] += order_total
+                client_stats[2] = max(client_stats[2], created_at)
+
+            history.extend(status_history(rng, order_id, created_at, status, next_history_id))
+
+        sink.write(Order.__table__, order_columns, orders)
+        sink.write(OrderProduct, line_columns, lines)
+        sink.write(OrderStatusHistory.__table__, history_columns, history)
+        totals["orders"] += len(orders)
+        totals["lines"] += len(lines)
+        totals["history"] += len(history)
+        print(f"  pedidos: {totals['orders']}/{order_count}", flush=True)
+
+    stats_columns = ("client_id", "order_count", "total_spent", "last_order_at")
+    stats_rows = [
+        (client_id, count, round(spent, 2), last_order_at)
+        for client_id, (count, spent, last_order_at) in sorted(stats.items())
+    ]
+    for start in range(0, len(stats_rows), CHUNK_ROWS):
+        sink.write(ClientStats.__table__, stats_columns, stats_rows[start:start + CHUNK_ROWS])
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera e carrega uma massa de dados sintética com COPY")
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = 10 mil clientes, 2 mil produtos, 50 mil pedidos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2023, 1, 1))
+    parser.add_argument("--days", type=int, default=730, help="período dos pedidos a partir de --start-date")
+    parser.add_argument("--truncate", action="store_true", help="esvazia as tabelas antes de carregar")
+    parser.add_argument("--output-dir", default=None, help="grava CSVs em vez de carregar no banco")
+    args = parser.parse_args()
+
+    tables = [
+        Client.__table__, Product.__table__, StockMovement.__table__,
+        Order.__table__, OrderProduct, OrderStatusHistory.__table__, ClientStats.__table__,
+    ]
+
+    connection = None
+    if args.output_dir:
+        sink = CsvSink(args.output_dir)
+    else:
+        from app.core.database import get_engine
+
+        engine = get_engine()
+        if engine.dialect.name != "postgresql":
+            parser.error("a carga com COPY exige Postgres em DATABASE_URL (ou use --output-dir)")
+        connection = engine.raw_connection()
+        sink = CopySink(connection)
+
+    started = time.perf_counter()
+    try:
+        if args.truncate:
+            sink.truncate(tables)
+        first_ids = {
+            "client": sink.next_id(Client.__table__),
+            "product": sink.next_id(Product.__table__),
+            "movement": sink.next_id(StockMovement.__table__),
+            "order": sink.next_id(Order.__table__),
+            "history": sink.next_id(OrderStatusHistory.__table__),
+        }
+
+        # Um gerador por tabela: mudar a escala de uma não altera as demais
+        client_count = round(BASE_CLIENTS * args.scale)
+        product_count = max(1, round(BASE_PRODUCTS * args.scale))
+        print(f"clientes: {client_count}", flush=True)
+        generate_clients(sink, random.Random(f"{args.seed}-clients"), first_ids["client"], client_count)
+        print(f"produtos: {product_count}", flush=True)
+        prices = generate_products(
+            sink, random.Random(f"{args.seed}-products"), first_ids["product"], product_count, first_ids["movement"]
+        )
+        sink.create_partitions(args.start_date, args.start_date + timedelta(days=args.days - 1))
+        totals = generate_orders(
+            sink, random.Random(f"{args.seed}-orders"), args, first_ids, client_count, prices
+        )
+        sink.finish(tables)
+    except BaseException:
+        if connection is not None:
+            connection.rollback()
+        raise
+    finally:
+        if connection is not None:
+            connection.close()
+
+    elapsed = time.perf_counter() - started
+    rows = client_count + product_count + sum(totals.values())
+    print(
+        f"\n{client_count} clientes, {product_count} produtos, {totals['orders']} pedidos, "
+        f"{totals['lines']} itens, {totals['history']} mudanças de status "
+        f"em {elapsed:.1f} s ({rows / elapsed:,.0f} linhas/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Mede o custo de partida a frio de um worker.
+
+Cada medição roda em um processo Python novo (sem módulos em cache):
+
+- import: `import app.main` (não deve ler o ambiente nem abrir conexões);
+- create_app: `create_app()` depois do import (lê as configurações e monta a aplicação).
+
+Também lista os pacotes mais caros de importar, segundo `python -X importtime`.
+
+Uso:
+    python -m benchmarks.import_time --repeat 10 --top 15
+    python -m benchmarks.import_time --max-import-ms 500   # falha se passar do limite
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Variáveis mínimas para que create_app() consiga montar as configurações
+ENV_DEFAULTS = {
+    "DATABASE_URL": "sqlite://",
+    "SENTRY_SECRET_KEY": "benchmark",
+    "SENTRY_REDIS_HOST": "benchmark",
+    "JWT_SECRET_KEY": "benchmark",
+    "WA_API_URL": "http://benchmark",
+    "WA_API_KEY": "benchmark",
+    "WA_INSTANCE_NAME": "benchmark",
+    "WA_AUTHENTICATION_API_KEY": "benchmark",
+}
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app.main.create_app()
+created = time.perf_counter()
+print((imported - start) * 1000, (created - imported) * 1000)
+"""
+
+
+def run(env):
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    import_ms, create_ms = map(float, output.split())
+    return import_ms, create_ms
+
+
+def slowest_imports(env, top):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    # Maior tempo cumulativo de cada pacote raiz (fastapi, sqlalchemy, app, ...)
+    packages = {}
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)", line)
+        if match:
+            root = match.group(2).split(".")[0]
+            packages[root] = max(packages.get(root, 0), int(match.group(1)))
+    return sorted(((us, name) for name, us in packages.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação e criação da aplicação")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    env = {**ENV_DEFAULTS, **os.environ}
+    results = [run(env) for _ in range(args.repeat)]
+    import_ms = statistics.median(r[0] for r in results)
+    create_ms = statistics.median(r[1] for r in results)
+
+    print(f"import app.main: {import_ms:8.1f} ms (mediana de {args.repeat})")
+    print(f"create_app():    {create_ms:8.1f} ms")
+    print("\nPacotes mais caros de importar (cumulativo):")
+    for cumulative_us, module in slowest_imports(env, args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"\nimport acima do limite de {args.max_import_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Compara os dois caminhos de leitura das listagens:
+
+- ORM: `db.query(Model)` carregando entidades na sessão e validando cada uma
+  com o schema de resposta (comportamento antigo de list_products/list_clients/list_orders).
+- Core: `select()` só das colunas da resposta, linhas convertidas direto em dicionários
+  (comportamento atual).
+
+Mede a mediana do tempo por página e pico de memória alocada (tracemalloc).
+
+Uso:
+    python -m benchmarks.list_read_paths --rows 20000 --page-size 500 --repeat 20
+
+DATABASE_URL deve apontar para um banco Postgres de testes com as migrações
+aplicadas (as tabelas de pedidos são particionadas); os dados de benchmark são
+removidos ao final.
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+for name in (
+    "SENTRY_SECRET_KEY",
+    "SENTRY_REDIS_HOST",
+    "JWT_SECRET_KEY",
+    "WA_API_URL",
+    "WA_API_KEY",
+    "WA_INSTANCE_NAME",
+    "WA_AUTHENTICATION_API_KEY",
+):
+    os.environ.setdefault(name, "benchmark")
+
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.api.v1.endpoints.order import _load_orders, _select_orders  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.responses import row_dicts, select_schema  # noqa: E402
+from app.models.client import Client  # noqa: E402
+from app.models.order import Order, OrderProduct  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.schemas.client import ClientOut  # noqa: E402
+from app.schemas.order import OrderOut  # noqa: E402
+from app.schemas.product import ProductOut  # noqa: E402
+
+
+def seed(rows: int, tag: str):
+    cpf_prefix = f"{int(tag[-8:], 16) % 100000:05d}"
+    Base.metadata.create_all(
+        engine,
+        tables=[Client.__table__, Product.__table__, Order.__table__, OrderProduct],
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Product),
+            [
+                {
+                    "description": f"{tag} produto {i}",
+                    "price": 10 + i % 90,
+                    "barcode": f"{tag}{i}",
+                    "section": f"Seção {i % 10}",
+                    "stock": 100,
+                    "reorder_threshold": 5,
+                    "expiration_date": date(2030, 1, 1),
+                }
+                for i in range(rows)
+            ],
+        )
+        conn.execute(
+            insert(Client),
+            [
+                {
+                    "name": f"{tag} cliente {i}",
+                    "email": f"{tag}.{i}@example.com",
+                    "phone": "11999999999",
+                    "cpf": f"{cpf_prefix}{i:06d}",
+                    "address": "Rua do Benchmark, 1",
+                }
+                for i in range(rows)
+            ],
+        )
+        product_ids = conn.execute(
+            select(Product.id).where(Product.barcode.like(f"{tag}%"))
+        ).scalars().all()
+        client_ids = conn.execute(
+            select(Client.id).where(Client.email.like(f"{tag}.%"))
+        ).scalars().all()
+        order_ids = conn.execute(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [
+                {
+                    "client_id": client_ids[i % len(client_ids)],
+                    "status": "pending",
+                    "created_at": date(2025, 1, 1) + timedelta(days=i % 365),
+                }
+                for i in range(rows)
+            ],
+        ).scalars().all()
+        conn.execute(
+            insert(OrderProduct),
+            [
+                {
+                    "order_id": order_id,
+                    "order_created_at": date(2025, 1, 1) + timedelta(days=i % 365),
+                    "product_id": product_ids[(i * 7 + k) % len(product_ids)],
+                    "quantity": 1 + k,
+                    "unit_price": 10.0,
+                }
+                for i, order_id in enumerate(order_ids)
+                for k in range(3)
+            ],
+        )
+    return product_ids, client_ids, order_ids
+
+
+def cleanup(product_ids, client_ids, order_ids):
+    with engine.begin() as conn:
+        conn.execute(delete(OrderProduct).where(OrderProduct.c.order_id.in_(order_ids)))
+        conn.execute(delete(Order).where(Order.id.in_(order_ids)))
+        conn.execute(delete(Client).where(Client.id.in_(client_ids)))
+        conn.execute(delete(Product).where(Product.id.in_(product_ids)))
+
+
+def orm_products(db, limit):
+    products = db.query(Product).limit(limit).all()
+    return [ProductOut.model_validate(p).model_dump() for p in products]
+
+
+def core_products(db, limit):
+    return row_dicts(db.execute(select_schema(Product, ProductOut).limit(limit)))
+
+
+def orm_clients(db, limit):
+    clients = db.query(Client).limit(limit).all()
+    return [ClientOut.model_validate(c).model_dump() for c in clients]
+
+
+def core_clients(db, limit):
+    return row_dicts(db.execute(select_schema(Client, ClientOut).limit(limit)))
+
+
+def orm_orders(db, limit):
+    result = []
+    for order in db.query(Order).limit(limit).all():
+        lines = db.execute(OrderProduct.select().where(OrderProduct.c.order_id == order.id))
+        result.append(
+            OrderOut(
+                id=order.id,
+                client_id=order.client_id,
+                status=order.status,
+                created_at=order.created_at,
+                products=[
+                    {"product_id": row.product_id, "quantity": row.quantity}
+                    for row in lines
+                ],
+            ).model_dump()
+        )
+    return result
+
+
+def core_orders(db, limit):
+    # O mesmo caminho de GET /orders/, sem filtros
+    fields = tuple(OrderOut.model_fields)
+    return _load_orders(db, _select_orders(fields).limit(limit), fields)
+
+
+def measure(fn, limit, repeat):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            tracemalloc.start()
+            start = time.perf_counter()
+            fn(db, limit)
+            timings.append(time.perf_counter() - start)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        finally:
+            db.close()
+    return statistics.median(timings) * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="máximo 999999")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    tag = f"bench{uuid.uuid4().hex[:8]}"
+    ids = seed(args.rows, tag)
+    try:
+        print(f"{'listagem':<10}{'caminho':<8}{'mediana (ms)':>14}{'pico (KiB)':>14}")
+        for name, orm_fn, core_fn in (
+            ("products", orm_products, core_products),
+            ("clients", orm_clients, core_clients),
+            ("orders", orm_orders, core_orders),
+        ):
+            # Aquece conexões e caches de compilação antes de medir
+            measure(orm_fn, args.page_size, 1)
+            measure(core_fn, args.page_size, 1)
+            for label, fn in (("orm", orm_fn), ("core", core_fn)):
+                elapsed, peak = measure(fn, args.page_size, args.repeat)
+                print(f"{name:<10}{label:<8}{elapsed:>14.2f}{peak:>14.1f}")
+    finally:
+        cleanup(*ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Teste de carga da API com cenários realistas, executado direto na aplicação
+ASGI (httpx + ASGITransport, sem servidor nem rede):
+
+- login: rajada de logins de vendedores (inclui o custo do bcrypt);
+- product_search: busca de produtos por descrição e seção;
+- order_create: criação de pedidos com 1 a 50 itens;
+- order_list: paginação de `GET /orders/` com os itens de cada pedido;
+- order_status: atualização de status de pedidos existentes, seguindo as
+  transições válidas (pending → processing → shipped → delivered).
+
+Para cada cenário mostra p50/p95/p99 (ms), requisições por segundo e erros,
+e compara com uma baseline salva em JSON. Um p95 acima da baseline ou um RPS
+abaixo dela, além da tolerância, encerra o script com código 1.
+
+Uso:
+    python -m benchmarks.load --requests 500 --concurrency 16 --save-baseline
+    python -m benchmarks.load --requests 500 --concurrency 16 --tolerance 0.2
+
+DATABASE_URL deve apontar para um banco Postgres de testes com as migrações
+aplicadas (as tabelas de pedidos são particionadas); os dados de benchmark são
+removidos ao final. As mensagens de WhatsApp não são enviadas.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+for name in (
+    "SENTRY_SECRET_KEY",
+    "SENTRY_REDIS_HOST",
+    "JWT_SECRET_KEY",
+    "WA_API_URL",
+    "WA_API_KEY",
+    "WA_INSTANCE_NAME",
+    "WA_AUTHENTICATION_API_KEY",
+):
+    os.environ.setdefault(name, "benchmark")
+# O rate limit limitaria o próprio benchmark
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.core.database import Base, engine  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.models.client import Client  # noqa: E402
+from app.models.client_stats import ClientStats  # noqa: E402
+from app.models.idempotency_key import IdempotencyKey  # noqa: E402
+from app.models.order import Order, OrderProduct, OrderStatusHistory  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.stock_movement import StockMovement  # noqa: E402
+from app.models.user import AccessLevel, User  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "load_baseline.json")
+PASSWORD = "benchmark123"
+SECTIONS = ["Roupas", "Calçados", "Acessórios", "Perfumaria", "Casa"]
+# Caminho de cada pedido no cenário order_status (os pedidos começam pending)
+STATUS_PATH = ["processing", "shipped", "delivered"]
+
+
+def seed(tag: str, users: int, clients: int, products: int, orders: int, rng: random.Random):
+    cpf_prefix = f"{int(tag[-8:], 16) % 100000:05d}"
+    Base.metadata.create_all(engine)
+    password = get_password_hash(PASSWORD)
+    with engine.begin() as conn:
+        user_ids = conn.execute(
+            insert(User).returning(User.id),
+            [
+                {
+                    "name": f"{tag} vendedor {i}",
+                    "email": f"{tag}.seller{i}@example.com",
+                    "phone": "11999999999",
+                    "password": password,
+                    "is_active": True,
+                    "access_level": AccessLevel.seller,
+                }
+                for i in range(users)
+            ],
+        ).scalars().all()
+        product_ids = conn.execute(
+            insert(Product).returning(Product.id),
+            [
+                {
+                    "description": f"{tag} {SECTIONS[i % len(SECTIONS)]} modelo {i}",
+                    "price": round(rng.uniform(5, 500), 2),
+                    "barcode": f"{tag}{i:07d}",
+                    "section": SECTIONS[i % len(SECTIONS)],
+                    "stock": 1_000_000,
+                    "reorder_threshold": 5,
+                    "expiration_date": date(2030, 1, 1),
+                }
+                for i in range(products)
+            ],
+        ).scalars().all()
+        client_ids = conn.execute(
+            insert(Client).returning(Client.id),
+            [
+                {
+                    "name": f"{tag} cliente {i}",
+                    "email": f"{tag}.{i}@example.com",
+                    "phone": "11999999999",
+                    "cpf": f"{cpf_prefix}{i:06d}",
+                    "address": "Rua do Benchmark, 1",
+                }
+                for i in range(clients)
+            ],
+        ).scalars().all()
+        order_rows = [
+            {
+                "client_id": rng.choice(client_ids),
+                "status": "pending",
+                "created_at": date(2025, 1, 1) + timedelta(days=rng.randrange(365)),
+            }
+            for _ in range(orders)
+        ]
+        orders = conn.execute(
+            insert(Order).returning(Order.id, Order.client_id, sort_by_parameter_order=True),
+            order_rows,
+        ).all()
+        lines = [
+            {
+                "order_id": order_id,
+                "order_created_at": row["created_at"],
+                "product_id": product_id,
+                "quantity": rng.randint(1, 5),
+                "unit_price": 10.0,
+            }
+            for (order_id, _), row in zip(orders, order_rows)
+            for product_id in rng.sample(product_ids, rng.randint(1, 5))
+        ]
+        conn.execute(insert(OrderProduct), lines)
+
+        # Estatísticas dos clientes, como a API as manteria
+        stats = {}
+        order_clients = {order_id: client_id for order_id, client_id in orders}
+        for (_, client_id), row in zip(orders, order_rows):
+            client_stats = stats.setdefault(client_id, [0, 0.0, row["created_at"]])
+            client_stats[0] += 1
+            client_stats[2] = max(client_stats[2], row["created_at"])
+        for line in lines:
+            stats[order_clients[line["order_id"]]][1] += line["quantity"] * line["unit_price"]
+        conn.execute(
+            insert(ClientStats),
+            [
+                {"client_id": client_id, "order_count": count, "total_spent": spent, "last_order_at": last_order_at}
+                for client_id, (count, spent, last_order_at) in stats.items()
+            ],
+        )
+    return user_ids, client_ids, product_ids, orders
+
+
+def cleanup(user_ids, client_ids, product_ids):
+    with engine.begin() as conn:
+        order_ids = select(Order.id).where(Order.client_id.in_(client_ids)).scalar_subquery()
+        conn.execute(delete(OrderStatusHistory).where(OrderStatusHistory.order_id.in_(order_ids)))
+        conn.execute(delete(OrderProduct).where(OrderProduct.c.order_id.in_(order_ids)))
+        conn.execute(delete(StockMovement).where(StockMovement.product_id.in_(product_ids)))
+        conn.execute(delete(Order).where(Order.client_id.in_(client_ids)))
+        conn.execute(delete(IdempotencyKey).where(IdempotencyKey.user_id.in_(user_ids)))
+        conn.execute(delete(Client).where(Client.id.in_(client_ids)))
+        conn.execute(delete(Product).where(Product.id.in_(product_ids)))
+        conn.execute(delete(User).where(User.id.in_(user_ids)))
+
+
+def build_scenarios(tag, user_ids, client_ids, product_ids, orders, rng: random.Random):
+    """Cada cenário é uma função que recebe o número da requisição e devolve (método, url, kwargs)."""
+    headers = [
+        {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+        for user_id in user_ids
+    ]
+    search_terms = [f"modelo {i}" for i in range(1, 100)] + SECTIONS
+    page_size = 20
+
+    def login(i):
+        user = i % len(user_ids)
+        return "POST", "/api/v1/auth/login", {
+            "json": {"email": f"{tag}.seller{user}@example.com", "password": PASSWORD}
+        }
+
+    def product_search(i):
+        params = {"limit": 20}
+        if i % 3:
+            params["description"] = rng.choice(search_terms)
+        else:
+            params["section"] = rng.choice(SECTIONS)
+        return "GET", "/api/v1/products/", {"params": params, "headers": headers[i % len(headers)]}
+
+    def order_create(i):
+        lines = rng.sample(product_ids, rng.randint(1, min(50, len(product_ids))))
+        body = {
+            "client_id": rng.choice(client_ids),
+            "created_at": str(date(2025, 1, 1) + timedelta(days=rng.randrange(365))),
+            "products": [{"product_id": p, "quantity": rng.randint(1, 3)} for p in lines],
+        }
+        return "POST", "/api/v1/orders/", {"json": body, "headers": headers[i % len(headers)]}
+
+    def order_list(i):
+        params = {"skip": (i * page_size) % max(len(orders), 1), "limit": page_size}
+        return "GET", "/api/v1/orders/", {"params": params, "headers": headers[i % len(headers)]}
+
+    # Sequência própria (inclui o aquecimento): cada pedido avança um passo por
+    # passada pela lista, e só recebe o próximo status depois de todos os outros
+    status_updates = itertools.count()
+
+    def order_status(i):
+        n = next(status_updates)
+        order_id, _ = orders[n % len(orders)]
+        body = {"status": STATUS_PATH[n // len(orders)]}
+        return "PUT", f"/api/v1/orders/{order_id}/status", {
+            "json": body,
+            "headers": headers[i % len(headers)],
+        }
+
+    return {
+        "login": login,
+        "product_search": product_search,
+        "order_create": order_create,
+        "order_list": order_list,
+        "order_status": order_status,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, requests: int, concurrency: int):
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "rps": round(requests / elapsed, 1),
+        "errors": errors,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lista as regressões em relação à baseline: p95 mais alto ou RPS mais baixo."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms (baseline {previous['p95_ms']} ms)")
+        if result["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']} req/s (baseline {previous['rps']} req/s)")
+        if result["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {result['errors']} erros (baseline {previous.get('errors', 0)})")
+    return regressions
+
+
+async def run(args, scenarios):
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        results = {}
+        for name, make_request in scenarios.items():
+            # Aquece conexões, caches de compilação e o threadpool antes de medir
+            await run_scenario(client, make_request, min(args.concurrency, args.requests), args.concurrency)
+            results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API com cenários realistas")
+    parser.add_argument("--requests", type=int, default=200, help="requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", default=None, help="ex: order_create,order_list")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="ex: 0.2 = 20%%")
+    args = parser.parse_args()
+
+    status_requests = args.requests + min(args.concurrency, args.requests)
+    if (not args.scenarios or "order_status" in args.scenarios.split(",")) and (
+        status_requests > args.orders * len(STATUS_PATH)
+    ):
+        parser.error(f"order_status precisa de --orders >= {-(-status_requests // len(STATUS_PATH))}")
+
+    rng = random.Random(args.seed)
+    tag = f"load{uuid.uuid4().hex[:8]}"
+    ids = seed(tag, args.users, args.clients, args.products, args.orders, rng)
+    scenarios = build_scenarios(tag, *ids, rng)
+    if args.scenarios:
+        scenarios = {name: scenarios[name] for name in args.scenarios.split(",")}
+
+    whatsapp = Mock(status_code=200)
+    whatsapp.json.return_value = {"status": "SENT"}
+    try:
+        with patch("requests.post", return_value=whatsapp):
+            results = asyncio.run(run(args, scenarios))
+    finally:
+        cleanup(*ids[:3])
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'cenário':<16}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'req/s':>10}{'erros':>8}{'Δ p95':>9}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        delta = f"{(result['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%" if previous else "-"
+        print(
+            f"{name:<16}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+            f"{result['rps']:>10.1f}{result['errors']:>8}{delta:>9}"
+        )
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2, sort_keys=True)
+        print(f"\nBaseline salva em {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressões em relação à baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import uuid
+from datetime import date
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.repositories.analytics import SalesColumns, daily_revenue
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def mock_whatsapp():
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"status": "SENT"}
+
+    with patch('requests.post', return_value=mock_response) as mock:
+        yield mock
+
+
+def get_auth_header():
+    unique_email = f"analytics_{uuid.uuid4()}@example.com"
+    user_data = {
+        "name": "Analista",
+        "email": unique_email,
+        "phone": "11999999977",
+        "access_level": "seller",
+        "password": "12345678"
+    }
+    client.post("/api/v1/auth/register", json=user_data)
+    login_data = {"email": unique_email, "password": user_data["password"]}
+    response = client.post("/api/v1/auth/login", json=login_data)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_daily_revenue_moving_average():
+    sales = SalesColumns(
+        np.array(["2030-01-01", "2030-01-03", "2030-01-03", "2030-01-04"], dtype="datetime64[D]"),
+        np.array([1, 1, 2, 1]),
+        np.array([1, 2, 1, 3]),
+        np.array([10.0, 20.0, 5.0, 30.0]),
+    )
+    result = daily_revenue(sales, date(2030, 1, 2), date(2030, 1, 4), 2)
+    assert result == [
+        {"date": date(2030, 1, 2), "revenue": 0.0, "quantity": 0, "moving_average": 5.0},
+        {"date": date(2030, 1, 3), "revenue": 25.0, "quantity": 3, "moving_average": 12.5},
+        {"date": date(2030, 1, 4), "revenue": 30.0, "quantity": 3, "moving_average": 27.5},
+    ]
+
+
+def test_analytics_endpoints():
+    headers = get_auth_header()
+    section = f"Seção {uuid.uuid4().hex[:8]}"
+    client_data = {
+        "name": "Cliente Analytics",
+        "email": f"clienteanalytics_{uuid.uuid4()}@example.com",
+        "phone": "11999999976",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Dados, 1"
+    }
+    client_id = client.post("/api/v1/clients/", json=client_data, headers=headers).json()["id"]
+    product_ids = []
+    for price in (10.0, 50.0, 20.0):
+        product_data = {
+            "description": f"Produto Analytics {uuid.uuid4()}",
+            "price": price,
+            "barcode": str(uuid.uuid4().int)[:13],
+            "section": section,
+            "stock": 100,
+            "expiration_date": "2031-12-31",
+            "image": None
+        }
+        product_ids.append(client.post("/api/v1/products/", json=product_data, headers=headers).json()["id"])
+
+    order_ids = []
+
+    def create_order(created_at, lines):
+        order_data = {
+            "client_id": client_id,
+            "status": "pending",
+            "created_at": created_at,
+            "products": [{"product_id": p, "quantity": q} for p, q in lines]
+        }
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+        assert response.status_code == 201
+        order_ids.append(response.json()["id"])
+
+    create_order("2030-02-01", [(product_ids[0], 3), (product_ids[1], 1)])
+    create_order("2030-02-03", [(product_ids[2], 2)])
+    create_order("2030-02-03", [(product_ids[1], 5)])
+    # Pedido cancelado não entra na receita
+    client.put("/api/v1/orders/status", json={"order_ids": order_ids[-1:], "status": "canceled"}, headers=headers)
+
+    params = {"start": "2030-02-01", "end": "2030-02-28", "section": section, "limit": 2}
+    response = client.get("/api/v1/analytics/top-products", params=params, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    assert response.json()[0]["section"] == section
+    assert [(p["product_id"], p["quantity"], p["revenue"]) for p in response.json()[0]["products"]] == [
+        (product_ids[1], 1, 50.0),
+        (product_ids[2], 2, 40.0),
+    ]
+
+    response = client.get(
+        "/api/v1/analytics/daily-revenue",
+        params={"start": "2030-02-01", "end": "2030-02-03", "window": 2},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"date": "2030-02-01", "revenue": 80.0, "quantity": 4, "moving_average": 40.0},
+        {"date": "2030-02-02", "revenue": 0.0, "quantity": 0, "moving_average": 40.0},
+        {"date": "2030-02-03", "revenue": 40.0, "quantity": 2, "moving_average": 20.0},
+    ]
+
+    # Um novo pedido muda a versão dos dados: o resultado em cache não é reutilizado
+    create_order("2030-02-02", [(product_ids[0], 10)])
+    response = client.get("/api/v1/analytics/top-products", params=params, headers=headers)
+    assert response.json()[0]["products"][0] == {
+        "product_id": product_ids[0],
+        "description": response.json()[0]["products"][0]["description"],
+        "quantity": 13,
+        "revenue": 130.0,
+    }
+
+    # Alterar um produto também descarta os resultados em cache
+    product = client.get(f"/api/v1/products/{product_ids[0]}", headers=headers).json()
+    product["description"] = description = f"Produto Renomeado {uuid.uuid4()}"
+    response = client.put(f"/api/v1/products/{product_ids[0]}", json=product, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    response = client.get("/api/v1/analytics/top-products", params=params, headers=headers)
+    assert response.json()[0]["products"][0]["description"] == description
+
+    response = client.get(
+        "/api/v1/analytics/daily-revenue", params={"start": "2030-02-03", "end": "2030-02-01"}, headers=headers
+    )
+    assert response.status_code == 400
+
+    for order_id in order_ids:
+        client.delete(f"/api/v1/orders/{order_id}", headers=headers)
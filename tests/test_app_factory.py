@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import app.main
+from app.core.config import get_settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_import_does_not_require_environment():
+    # Sem variáveis de ambiente: importar não lê Settings nem cria o engine
+    script = (
+        "import sys, app.main, app.core.database as db; "
+        "assert db._engine is None; "
+        "assert 'requests' not in sys.modules; "
+        "print('ok')"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env={"PATH": os.environ.get("PATH", "")},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "ok"
+
+def test_create_app_initializes_in_lifespan():
+    settings = get_settings().model_copy(update={"DB_POOL_WARMUP_CONNECTIONS": 3})
+    with patch("app.main.warm_up_pool") as warm_up, \
+         patch("app.main.start_periodic_jobs", return_value=[]) as start_jobs, \
+         patch("app.main.setup_log"):
+        application = app.main.create_app(settings)
+        warm_up.assert_not_called()
+
+        with TestClient(application) as client:
+            response = client.get("/health")
+            assert response.status_code == 200
+            warm_up.assert_called_once_with(3)
+            start_jobs.assert_called_once()
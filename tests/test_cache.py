@@ -0,0 +1,126 @@
+import threading
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.cache import cached, entity_key, get_cache, invalidate
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_auth_header():
+    user_data = {
+        "name": "User Cache",
+        "email": f"cache_{uuid.uuid4()}@example.com",
+        "phone": "11999999960",
+        "access_level": "seller",
+        "password": "12345678"
+    }
+    client.post("/api/v1/auth/register", json=user_data)
+    login_data = {"email": user_data["email"], "password": user_data["password"]}
+    response = client.post("/api/v1/auth/login", json=login_data)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_cached_single_flight():
+    key = f"cache:test:{uuid.uuid4()}"
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"value": 1}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cached(key, loader))) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 1}] * 8
+    get_cache().delete(key)
+
+
+def test_cached_discards_value_loaded_before_invalidation():
+    key = f"cache:test:{uuid.uuid4()}"
+
+    def stale_loader():
+        # Uma escrita é confirmada enquanto o valor antigo é carregado
+        invalidate(key)
+        return {"value": "antigo"}
+
+    assert cached(key, stale_loader) == {"value": "antigo"}
+    assert cached(key, lambda: {"value": "novo"}) == {"value": "novo"}
+    assert cached(key, lambda: {"value": "outro"}) == {"value": "novo"}
+    get_cache().delete(key, f"{key}:version")
+
+
+def test_product_cache_invalidation():
+    headers = get_auth_header()
+    product_data = {
+        "description": f"Produto Cache {uuid.uuid4()}",
+        "price": 15.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 10,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    product_id = response.json()["id"]
+
+    response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.json()["price"] == 15.0
+    assert get_cache().get(entity_key("product", product_id)) is not None
+
+    # Campos parciais são lidos do banco, só com as colunas pedidas
+    response = client.get(f"/api/v1/products/{product_id}?fields=id,stock", headers=headers)
+    assert response.json() == {"id": product_id, "stock": 10}
+
+    response = client.put(f"/api/v1/products/{product_id}", json={**product_data, "price": 20.0}, headers=headers)
+    assert response.status_code == 200
+    assert get_cache().get(entity_key("product", product_id)) is None
+    response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.json()["price"] == 20.0
+
+    # Movimentações de estoque também invalidam o produto
+    movement = {"quantity": 5, "reason": "restock"}
+    response = client.post(f"/api/v1/products/{product_id}/stock-movements", json=movement, headers=headers)
+    assert response.status_code == 201
+    response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.json()["stock"] == 15
+
+    client.delete(f"/api/v1/products/{product_id}", headers=headers)
+    response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.status_code == 404
+
+
+def test_client_cache_invalidation():
+    headers = get_auth_header()
+    client_data = {
+        "name": "Cliente Cache",
+        "email": f"clientecache_{uuid.uuid4()}@example.com",
+        "phone": "11999999961",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Cache, 1"
+    }
+    response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+    client_id = response.json()["id"]
+
+    response = client.get(f"/api/v1/clients/{client_id}", headers=headers)
+    assert response.json()["name"] == "Cliente Cache"
+
+    response = client.put(f"/api/v1/clients/{client_id}", json={**client_data, "name": "Cliente Renomeado"}, headers=headers)
+    assert response.status_code == 200
+    response = client.get(f"/api/v1/clients/{client_id}?fields=name", headers=headers)
+    assert response.json() == {"name": "Cliente Renomeado"}
+
+    client.delete(f"/api/v1/clients/{client_id}", headers=headers)
+    response = client.get(f"/api/v1/clients/{client_id}", headers=headers)
+    assert response.status_code == 404
@@ -56,3 +56,98 @@ def test_create_and_list_client():
     # Deletar cliente
     response = client.delete(f"/api/v1/clients/{client_id}", headers=headers)
     assert response.status_code == 204
+
+def test_autocomplete_client():
+    headers = get_auth_header()
+    unique_name = f"Autocomplete {uuid.uuid4().hex[:8]}"
+    unique_email = f"autocomplete_{uuid.uuid4()}@example.com"
+    unique_cpf = str(uuid.uuid4().int)[:11]
+    client_data = {
+        "name": unique_name,
+        "email": unique_email,
+        "phone": "11999999997",
+        "cpf": unique_cpf,
+        "address": "Rua Teste, 123"
+    }
+    response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    client_id = response.json()["id"]
+
+    # Prefixo do nome, sem diferenciar maiúsculas
+    response = client.get(f"/api/v1/clients/autocomplete?q={unique_name[:16].lower()}", headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    assert any(c["id"] == client_id for c in response.json())
+    assert set(response.json()[0].keys()) == {"id", "name", "email", "cpf"}
+
+    # Prefixo do CPF e do e-mail
+    response = client.get(f"/api/v1/clients/autocomplete?q={unique_cpf[:8]}", headers=headers)
+    assert any(c["id"] == client_id for c in response.json())
+    response = client.get(f"/api/v1/clients/autocomplete?q={unique_email[:30]}", headers=headers)
+    assert any(c["id"] == client_id for c in response.json())
+
+    response = client.delete(f"/api/v1/clients/{client_id}", headers=headers)
+    assert response.status_code == 204
+
+def test_bulk_create_clients():
+    headers = get_auth_header()
+    first_email = f"bulk1_{uuid.uuid4()}@example.com"
+    second_email = f"bulk2_{uuid.uuid4()}@example.com"
+    first_cpf = str(uuid.uuid4().int)[:11]
+    second_cpf = str(uuid.uuid4().int)[:11]
+    payload = {
+        "clients": [
+            {"name": "Bulk 1", "email": first_email, "phone": "11999999997", "cpf": first_cpf, "address": "Rua Bulk, 1"},
+            {"name": "Bulk 2", "email": second_email, "phone": "11999999997", "cpf": second_cpf, "address": "Rua Bulk, 2"},
+            {"name": "Bulk 3", "email": first_email, "phone": "11999999997", "cpf": str(uuid.uuid4().int)[:11], "address": "Rua Bulk, 3"},
+        ]
+    }
+    response = client.post("/api/v1/clients/bulk", json=payload, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    data = response.json()
+    assert [c["index"] for c in data["created"]] == [0, 1]
+    assert data["created"][1]["email"] == second_email
+    assert data["conflicts"] == [
+        {"index": 2, "email": first_email, "cpf": payload["clients"][2]["cpf"], "detail": "Duplicate email in batch."}
+    ]
+
+    # Reenviar o mesmo lote: todos em conflito com o banco
+    response = client.post("/api/v1/clients/bulk", json=payload, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["created"] == []
+    assert {c["detail"] for c in response.json()["conflicts"]} == {"Email already exists."}
+
+    for created in data["created"]:
+        response = client.delete(f"/api/v1/clients/{created['id']}", headers=headers)
+        assert response.status_code == 204
+
+def test_duplicate_client_rejected():
+    headers = get_auth_header()
+    clients = []
+    for _ in range(2):
+        client_data = {
+            "name": "Cliente Duplicado",
+            "email": f"duplicado_{uuid.uuid4()}@example.com",
+            "phone": "11999999997",
+            "cpf": str(uuid.uuid4().int)[:11],
+            "address": "Rua Teste, 123"
+        }
+        response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+        assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+        clients.append({**client_data, "id": response.json()["id"]})
+
+    first, second = clients
+    duplicate = {**first, "cpf": str(uuid.uuid4().int)[:11]}
+    response = client.post("/api/v1/clients/", json=duplicate, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email or CPF already exists."
+
+    response = client.put(f"/api/v1/clients/{second['id']}", json={**second, "email": first["email"]}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already exists."
+    response = client.put(f"/api/v1/clients/{second['id']}", json={**second, "cpf": first["cpf"]}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CPF already exists."
+
+    for created in clients:
+        response = client.delete(f"/api/v1/clients/{created['id']}", headers=headers)
+        assert response.status_code == 204
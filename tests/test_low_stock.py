@@ -0,0 +1,92 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.database import SessionLocal
+from app.tasks.low_stock import build_low_stock_digest, send_low_stock_digest
+from app.tasks.scheduler import claim_job_run
+import uuid
+from unittest.mock import patch
+
+client = TestClient(app)
+
+def get_auth_header(access_level="seller"):
+    unique_email = f"estoque_{uuid.uuid4()}@example.com"
+    user_data = {
+        "name": "Estoque Teste",
+        "email": unique_email,
+        "phone": "11999999989",
+        "access_level": access_level,
+        "password": "12345678"
+    }
+    client.post("/api/v1/auth/register", json=user_data)
+    login_data = {"email": unique_email, "password": user_data["password"]}
+    response = client.post("/api/v1/auth/login", json=login_data)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def create_product(headers, section, stock, reorder_threshold):
+    product_data = {
+        "description": f"Produto Estoque {uuid.uuid4()}",
+        "price": 10.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": section,
+        "stock": stock,
+        "reorder_threshold": reorder_threshold,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    return response.json()
+
+def test_low_stock_products():
+    headers = get_auth_header()
+    section = f"Seção {uuid.uuid4().hex[:8]}"
+    low = create_product(headers, section, stock=2, reorder_threshold=3)
+    ok = create_product(headers, section, stock=10, reorder_threshold=3)
+
+    response = client.get(f"/api/v1/products/low-stock?section={section}", headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    assert [p["id"] for p in response.json()] == [low["id"]]
+
+    # Ponto de reposição por seção
+    admin_headers = get_auth_header(access_level="admin")
+    response = client.put(f"/api/v1/products/sections/{section}/reorder-threshold", json={"reorder_threshold": 10}, headers=admin_headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    assert response.json()["updated"] == 2
+    response = client.put(f"/api/v1/products/sections/{section}/reorder-threshold", json={"reorder_threshold": 10}, headers=headers)
+    assert response.status_code == 403
+
+    response = client.get(f"/api/v1/products/low-stock?section={section}", headers=headers)
+    assert [p["id"] for p in response.json()] == [low["id"], ok["id"]]
+
+    for product in (low, ok):
+        response = client.delete(f"/api/v1/products/{product['id']}", headers=headers)
+        assert response.status_code == 204
+
+def test_low_stock_digest():
+    headers = get_auth_header(access_level="admin")
+    product = create_product(headers, "Digest", stock=0, reorder_threshold=1)
+
+    db = SessionLocal()
+    try:
+        assert product["description"] in build_low_stock_digest(db)
+        with patch("app.tasks.low_stock.send_whatsapp_message") as mock_send:
+            send_low_stock_digest(db)
+        assert mock_send.called
+        assert product["description"] in mock_send.call_args.args[1]
+    finally:
+        db.close()
+
+    response = client.delete(f"/api/v1/products/{product['id']}", headers=headers)
+    assert response.status_code == 204
+
+def test_claim_job_run_once_per_interval():
+    name = f"job_{uuid.uuid4().hex[:8]}"
+    db = SessionLocal()
+    try:
+        assert claim_job_run(db, name, 3600)
+        assert not claim_job_run(db, name, 3600)
+        assert claim_job_run(db, name, 0)
+        db.rollback()
+    finally:
+        db.close()
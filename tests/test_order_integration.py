@@ -96,6 +96,456 @@ def test_order_integration_flow(mock_whatsapp):
     # Atualizar status
     response = client.put(f"/api/v1/orders/{order_id}/status", json={"status": "processing", "client_id": client_id, "created_at": "2025-05-25"}, headers=headers)
     assert response.status_code == 200
+    # Mesmas transições da atualização em lote
+    response = client.put(f"/api/v1/orders/{order_id}/status", json={"status": "pending"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Transition from processing to pending not allowed."
+    response = client.put(f"/api/v1/orders/{order_id}/status", json={"status": "invalido", "client_id": client_id, "created_at": "2025-05-25"}, headers=headers)
+    assert response.status_code == 422
+    # Linha do tempo de status
+    response = client.get(f"/api/v1/orders/timeline?ids={order_id},999999999", headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    timeline = response.json()
+    assert [t["order_id"] for t in timeline] == [order_id]
+    assert timeline[0]["status"] == "processing"
+    assert [(h["previous_status"], h["new_status"]) for h in timeline[0]["history"]] == [("pending", "processing")]
+    assert timeline[0]["history"][0]["changed_by"] is not None
+    assert timeline[0]["history"][0]["changed_at"]
+    response = client.get("/api/v1/orders/timeline?ids=abc", headers=headers)
+    assert response.status_code == 400
     # Deletar pedido
     response = client.delete(f"/api/v1/orders/{order_id}", headers=headers)
     assert response.status_code == 204
+
+def test_bulk_order_status_flow(mock_whatsapp):
+    from app.integrations.whatsapp.queue import notification_queue
+
+    headers = get_auth_header()
+    client_data = {
+        "name": "Cliente Lote",
+        "email": f"clientelote_{uuid.uuid4()}@example.com",
+        "phone": "11999999986",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Lote, 10"
+    }
+    response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+    client_id = response.json()["id"]
+    product_data = {
+        "description": f"Produto Lote {uuid.uuid4()}",
+        "price": 15.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 10,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    product_id = response.json()["id"]
+    order_ids = []
+    for _ in range(2):
+        order_data = {
+            "client_id": client_id,
+            "status": "pending",
+            "created_at": "2025-05-25",
+            "products": [{"product_id": product_id, "quantity": 1}]
+        }
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+        assert response.status_code == 201
+        order_ids.append(response.json()["id"])
+    mock_whatsapp.reset_mock()
+
+    response = client.put("/api/v1/orders/status", json={"order_ids": order_ids, "status": "processing"}, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    assert response.json() == {"updated": order_ids, "skipped": []}
+    assert notification_queue.flush(timeout=5)
+    assert mock_whatsapp.call_count == 2
+
+    # processing -> delivered não é permitido; pedido inexistente é informado
+    response = client.put("/api/v1/orders/status", json={"order_ids": order_ids + [999999999], "status": "delivered"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["updated"] == []
+    assert [s["detail"] for s in response.json()["skipped"]] == [
+        "Transition from processing to delivered not allowed.",
+        "Transition from processing to delivered not allowed.",
+        "Order not found.",
+    ]
+
+    response = client.put("/api/v1/orders/status", json={"order_ids": order_ids, "status": "invalido"}, headers=headers)
+    assert response.status_code == 422
+
+    response = client.get(f"/api/v1/orders/timeline?ids={order_ids[0]}", headers=headers)
+    assert response.json()[0]["status"] == "processing"
+    assert [h["new_status"] for h in response.json()[0]["history"]] == ["processing"]
+
+    for order_id in order_ids:
+        response = client.delete(f"/api/v1/orders/{order_id}", headers=headers)
+        assert response.status_code == 204
+
+
+def test_client_order_history(mock_whatsapp):
+    headers = get_auth_header()
+    client_data = {
+        "name": "Cliente Historico",
+        "email": f"clientehist_{uuid.uuid4()}@example.com",
+        "phone": "11999999985",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Historico, 5"
+    }
+    response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+    client_id = response.json()["id"]
+    product_ids = []
+    for price in (10.0, 2.5):
+        product_data = {
+            "description": f"Produto Historico {uuid.uuid4()}",
+            "price": price,
+            "barcode": str(uuid.uuid4().int)[:13],
+            "section": "Roupas",
+            "stock": 20,
+            "expiration_date": "2025-12-31",
+            "image": None
+        }
+        response = client.post("/api/v1/products/", json=product_data, headers=headers)
+        product_ids.append(response.json()["id"])
+
+    order_ids = []
+    for created_at, quantities in (("2025-05-01", (1, 2)), ("2025-05-10", (3, 0))):
+        order_data = {
+            "client_id": client_id,
+            "status": "pending",
+            "created_at": created_at,
+            "products": [
+                {"product_id": product_id, "quantity": quantity}
+                for product_id, quantity in zip(product_ids, quantities)
+                if quantity
+            ]
+        }
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+        assert response.status_code == 201
+        order_ids.append(response.json()["id"])
+
+    # Alterar o preço não muda o valor dos pedidos já feitos
+    response = client.get(f"/api/v1/products/{product_ids[0]}", headers=headers)
+    product = response.json()
+    product["price"] = 99.0
+    response = client.put(f"/api/v1/products/{product_ids[0]}", json=product, headers=headers)
+    assert response.status_code == 200
+
+    response = client.get(f"/api/v1/clients/{client_id}/orders?limit=1", headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    page = response.json()
+    assert [o["id"] for o in page["items"]] == [order_ids[1]]
+    assert page["items"][0]["total"] == 30.0
+    assert page["items"][0]["products"][0]["unit_price"] == 10.0
+    assert page["next_cursor"]
+
+    response = client.get(f"/api/v1/clients/{client_id}/orders?limit=1&cursor={page['next_cursor']}", headers=headers)
+    page = response.json()
+    assert [o["id"] for o in page["items"]] == [order_ids[0]]
+    assert page["items"][0]["total"] == 15.0
+    assert [line["quantity"] for line in page["items"][0]["products"]] == [1, 2]
+    assert page["next_cursor"] is None
+
+    response = client.get(f"/api/v1/clients/{client_id}/orders?end_date=2025-05-05", headers=headers)
+    assert [o["id"] for o in response.json()["items"]] == [order_ids[0]]
+    response = client.get(f"/api/v1/clients/{client_id}/orders?status=delivered", headers=headers)
+    assert response.json() == {"items": [], "next_cursor": None}
+    response = client.get("/api/v1/clients/999999999/orders", headers=headers)
+    assert response.status_code == 404
+    response = client.get(f"/api/v1/clients/{client_id}/orders?cursor=invalido", headers=headers)
+    assert response.status_code == 400
+
+    response = client.get(f"/api/v1/orders/{order_ids[0]}?fields=status,products", headers=headers)
+    assert response.json() == {
+        "status": "pending",
+        "products": [
+            {"product_id": product_ids[0], "quantity": 1},
+            {"product_id": product_ids[1], "quantity": 2},
+        ],
+    }
+    response = client.get(f"/api/v1/orders/?client_id={client_id}&fields=id,created_at", headers=headers)
+    assert sorted(o["id"] for o in response.json()) == sorted(order_ids)
+    assert all(set(o) == {"id", "created_at"} for o in response.json())
+
+    for order_id in order_ids:
+        client.delete(f"/api/v1/orders/{order_id}", headers=headers)
+
+def test_order_idempotency_key(mock_whatsapp):
+    headers = get_auth_header()
+    client_data = {
+        "name": "Cliente Idempotencia",
+        "email": f"clienteidem_{uuid.uuid4()}@example.com",
+        "phone": "11999999984",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Idempotencia, 7"
+    }
+    response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+    client_id = response.json()["id"]
+    product_data = {
+        "description": f"Produto Idempotencia {uuid.uuid4()}",
+        "price": 12.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 10,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    product_id = response.json()["id"]
+    order_data = {
+        "client_id": client_id,
+        "status": "pending",
+        "created_at": "2025-05-25",
+        "products": [{"product_id": product_id, "quantity": 3}]
+    }
+    idem_headers = {**headers, "Idempotency-Key": str(uuid.uuid4())}
+
+    response = client.post("/api/v1/orders/", json=order_data, headers=idem_headers)
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    order = response.json()
+
+    # A repetição devolve o mesmo pedido sem baixar o estoque de novo
+    response = client.post("/api/v1/orders/", json=order_data, headers=idem_headers)
+    assert response.status_code == 201
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.json() == order
+    response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.json()["stock"] == 7
+    assert mock_whatsapp.call_count == 1
+
+    # A mesma chave com outro corpo é rejeitada
+    other_order = {**order_data, "products": [{"product_id": product_id, "quantity": 1}]}
+    response = client.post("/api/v1/orders/", json=other_order, headers=idem_headers)
+    assert response.status_code == 422
+
+    # Uma falha libera a chave para nova tentativa
+    failed_headers = {**headers, "Idempotency-Key": str(uuid.uuid4())}
+    too_many = {**order_data, "products": [{"product_id": product_id, "quantity": 100}]}
+    response = client.post("/api/v1/orders/", json=too_many, headers=failed_headers)
+    assert response.status_code == 400
+    response = client.post("/api/v1/orders/", json=order_data, headers=failed_headers)
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+
+    client.delete(f"/api/v1/orders/{order['id']}", headers=headers)
+    client.delete(f"/api/v1/orders/{response.json()['id']}", headers=headers)
+
+def test_archived_order_fallback(mock_whatsapp, tmp_path, monkeypatch):
+    from datetime import date
+    from app.core.config import get_settings
+    from app.core.database import SessionLocal
+    from app.repositories.order_archive import archive_closed_orders
+
+    monkeypatch.setattr(get_settings(), "ORDER_ARCHIVE_DIR", str(tmp_path))
+    headers = get_auth_header()
+    client_data = {
+        "name": "Cliente Arquivo",
+        "email": f"clientearquivo_{uuid.uuid4()}@example.com",
+        "phone": "11999999985",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Arquivo, 1"
+    }
+    client_id = client.post("/api/v1/clients/", json=client_data, headers=headers).json()["id"]
+    product_data = {
+        "description": f"Produto Arquivo {uuid.uuid4()}",
+        "price": 12.5,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 10,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    product_id = client.post("/api/v1/products/", json=product_data, headers=headers).json()["id"]
+    order_ids = []
+    for created_at in ("2019-03-10", "2019-04-02"):
+        order_data = {
+            "client_id": client_id,
+            "status": "pending",
+            "created_at": created_at,
+            "products": [{"product_id": product_id, "quantity": 2}]
+        }
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+        assert response.status_code == 201
+        order_ids.append(response.json()["id"])
+    response = client.put("/api/v1/orders/status", json={"order_ids": order_ids[:1], "status": "canceled"}, headers=headers)
+    assert response.json()["updated"] == order_ids[:1]
+
+    db = SessionLocal()
+    try:
+        # Apenas o pedido cancelado é arquivado; o pendente continua no banco
+        assert archive_closed_orders(db, date(2020, 1, 1), 100, order_ids) == 1
+        db.commit()
+    finally:
+        db.close()
+    assert len(list(tmp_path.glob("2019/03/orders-*.ndjson.gz"))) == 1
+
+    response = client.get(f"/api/v1/orders/{order_ids[0]}", headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    assert response.json() == {
+        "id": order_ids[0],
+        "client_id": client_id,
+        "status": "canceled",
+        "created_at": "2019-03-10",
+        "products": [{"product_id": product_id, "quantity": 2}],
+    }
+    response = client.get(f"/api/v1/orders/{order_ids[0]}?fields=status", headers=headers)
+    assert response.json() == {"status": "canceled"}
+    response = client.get(f"/api/v1/orders/timeline?ids={order_ids[0]}", headers=headers)
+    assert response.json() == []
+
+    response = client.get(f"/api/v1/orders/{order_ids[1]}", headers=headers)
+    assert response.json()["status"] == "pending"
+    response = client.delete(f"/api/v1/orders/{order_ids[1]}", headers=headers)
+    assert response.status_code == 204
+
+def test_client_stats_maintained(mock_whatsapp):
+    headers = get_auth_header()
+    client_ids = []
+    for _ in range(2):
+        client_data = {
+            "name": "Cliente Estatisticas",
+            "email": f"clientestats_{uuid.uuid4()}@example.com",
+            "phone": "11999999983",
+            "cpf": str(uuid.uuid4().int)[:11],
+            "address": "Rua Estatisticas, 7"
+        }
+        response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+        client_ids.append(response.json()["id"])
+    product_data = {
+        "description": f"Produto Estatisticas {uuid.uuid4()}",
+        "price": 10.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 50,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    product_id = response.json()["id"]
+
+    def stats(client_id):
+        response = client.get(f"/api/v1/clients/{client_id}?fields=stats", headers=headers)
+        assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+        return response.json()["stats"]
+
+    assert stats(client_ids[0]) == {
+        "order_count": 0, "total_spent": 0.0, "last_order_at": None, "average_ticket": None
+    }
+
+    order_ids = []
+    for created_at, quantity in (("2025-05-01", 1), ("2025-05-10", 3)):
+        order_data = {
+            "client_id": client_ids[0],
+            "status": "pending",
+            "created_at": created_at,
+            "products": [{"product_id": product_id, "quantity": quantity}]
+        }
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+        assert response.status_code == 201
+        order_ids.append(response.json()["id"])
+    assert stats(client_ids[0]) == {
+        "order_count": 2, "total_spent": 40.0, "last_order_at": "2025-05-10", "average_ticket": 20.0
+    }
+
+    # Alterar itens ajusta o valor; cancelar retira o pedido e recalcula o último pedido
+    order_data = {
+        "client_id": client_ids[0],
+        "status": "pending",
+        "created_at": "2025-05-01",
+        "products": [{"product_id": product_id, "quantity": 2}]
+    }
+    response = client.put(f"/api/v1/orders/{order_ids[0]}", json=order_data, headers=headers)
+    assert response.status_code == 200
+    assert stats(client_ids[0])["total_spent"] == 50.0
+    response = client.put(f"/api/v1/orders/{order_ids[1]}/status", json={**order_data, "status": "canceled"}, headers=headers)
+    assert response.status_code == 200
+    assert stats(client_ids[0]) == {
+        "order_count": 1, "total_spent": 20.0, "last_order_at": "2025-05-01", "average_ticket": 20.0
+    }
+
+    # Trocar o cliente do pedido move as estatísticas
+    order_data["client_id"] = client_ids[1]
+    response = client.put(f"/api/v1/orders/{order_ids[0]}", json=order_data, headers=headers)
+    assert response.status_code == 200
+    assert stats(client_ids[0])["order_count"] == 0
+    assert stats(client_ids[1]) == {
+        "order_count": 1, "total_spent": 20.0, "last_order_at": "2025-05-01", "average_ticket": 20.0
+    }
+
+    response = client.get(
+        "/api/v1/clients/?name=Cliente Estatisticas&sort=total_spent&limit=100&fields=id", headers=headers
+    )
+    assert response.status_code == 200
+    ranking = [c["id"] for c in response.json() if c["id"] in client_ids]
+    assert ranking == [client_ids[1], client_ids[0]]
+    response = client.get(
+        "/api/v1/clients/?name=Cliente Estatisticas&sort=total_spent&descending=false&limit=100&fields=id", headers=headers
+    )
+    ranking = [c["id"] for c in response.json() if c["id"] in client_ids]
+    assert ranking == [client_ids[0], client_ids[1]]
+
+    for order_id in order_ids:
+        response = client.delete(f"/api/v1/orders/{order_id}", headers=headers)
+        assert response.status_code == 204
+    assert stats(client_ids[1])["order_count"] == 0
+    for client_id in client_ids:
+        client.delete(f"/api/v1/clients/{client_id}", headers=headers)
+
+def test_client_stats_keep_archived_orders(mock_whatsapp, tmp_path, monkeypatch):
+    from datetime import date
+    from app.core.config import get_settings
+    from app.core.database import SessionLocal
+    from app.repositories.order_archive import archive_closed_orders
+
+    monkeypatch.setattr(get_settings(), "ORDER_ARCHIVE_DIR", str(tmp_path))
+    headers = get_auth_header()
+    client_data = {
+        "name": "Cliente Estatisticas Arquivo",
+        "email": f"clientestatsarq_{uuid.uuid4()}@example.com",
+        "phone": "11999999982",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Arquivo, 2"
+    }
+    client_id = client.post("/api/v1/clients/", json=client_data, headers=headers).json()["id"]
+    product_data = {
+        "description": f"Produto Estatisticas Arquivo {uuid.uuid4()}",
+        "price": 12.5,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 10,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    product_id = client.post("/api/v1/products/", json=product_data, headers=headers).json()["id"]
+    order_ids = []
+    for created_at in ("2019-03-10", "2025-05-01"):
+        order_data = {
+            "client_id": client_id,
+            "status": "pending",
+            "created_at": created_at,
+            "products": [{"product_id": product_id, "quantity": 2}]
+        }
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+        assert response.status_code == 201
+        order_ids.append(response.json()["id"])
+    for new_status in ("processing", "shipped", "delivered"):
+        response = client.put("/api/v1/orders/status", json={"order_ids": order_ids[:1], "status": new_status}, headers=headers)
+        assert response.json()["updated"] == order_ids[:1]
+
+    db = SessionLocal()
+    try:
+        assert archive_closed_orders(db, date(2020, 1, 1), 100, order_ids) == 1
+        db.commit()
+    finally:
+        db.close()
+
+    # O pedido arquivado continua contando: cancelar o único pedido do banco
+    # mantém a data do último pedido arquivado
+    response = client.put("/api/v1/orders/status", json={"order_ids": order_ids[1:], "status": "canceled"}, headers=headers)
+    assert response.json()["updated"] == order_ids[1:]
+    response = client.get(f"/api/v1/clients/{client_id}?fields=stats", headers=headers)
+    assert response.json()["stats"] == {
+        "order_count": 1, "total_spent": 25.0, "last_order_at": "2019-03-10", "average_ticket": 25.0
+    }
+
+    client.delete(f"/api/v1/orders/{order_ids[1]}", headers=headers)
@@ -0,0 +1,34 @@
+from datetime import date
+
+from app.core.database import SessionLocal
+from app.repositories.partitions import (
+    add_months,
+    create_order_partitions,
+    detach_order_partitions,
+    month_ranges,
+    partition_name,
+)
+
+
+def test_month_ranges_cross_year():
+    assert add_months(date(2025, 11, 20), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 5), -1) == date(2024, 12, 1)
+    assert month_ranges(date(2025, 12, 15), 2) == [
+        (date(2025, 12, 1), date(2026, 1, 1)),
+        (date(2026, 1, 1), date(2026, 2, 1)),
+    ]
+    assert partition_name("orders", date(2025, 6, 1)) == "orders_p2025_06"
+
+
+def test_partition_maintenance_only_on_postgres():
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            create_order_partitions(db, date.today(), 1)
+            assert create_order_partitions(db, date.today(), 1) == []
+            db.rollback()
+        else:
+            assert create_order_partitions(db, date.today(), 3) == []
+            assert detach_order_partitions(db, date.today()) == []
+    finally:
+        db.close()
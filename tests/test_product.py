@@ -4,6 +4,7 @@ from app.main import app
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 import uuid
+from datetime import date, timedelta
 
 client = TestClient(app)
 
@@ -59,3 +60,141 @@ def test_create_and_list_product():
     # Deletar produto
     response = client.delete(f"/api/v1/products/{product_id}", headers=headers)
     assert response.status_code == 204
+
+def test_duplicate_product_rejected():
+    headers = get_auth_header()
+    product_data = {
+        "description": f"Produto Duplicado {uuid.uuid4()}",
+        "price": 10.5,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 5,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    product_id = response.json()["id"]
+
+    duplicate = {**product_data, "barcode": str(uuid.uuid4().int)[:13]}
+    response = client.post("/api/v1/products/", json=duplicate, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Product with this name already exists."
+
+    duplicate = {**product_data, "description": f"Outro Produto {uuid.uuid4()}"}
+    response = client.post("/api/v1/products/", json=duplicate, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Product with this barcode already exists."
+
+    response = client.delete(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.status_code == 204
+
+def test_list_expiring_products():
+    headers = get_auth_header()
+    section = f"Validade {uuid.uuid4().hex[:8]}"
+    product_ids = []
+    for days in (2, 1, 30):
+        product_data = {
+            "description": f"Produto Validade {uuid.uuid4()}",
+            "price": 5.0,
+            "barcode": str(uuid.uuid4().int)[:13],
+            "section": section,
+            "stock": 5,
+            "expiration_date": (date.today() + timedelta(days=days)).isoformat(),
+            "image": None
+        }
+        response = client.post("/api/v1/products/", json=product_data, headers=headers)
+        assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+        product_ids.append(response.json()["id"])
+
+    # Paginação por cursor, ordenada pela data de validade
+    response = client.get(f"/api/v1/products/expiring?within_days=7&section={section}&limit=1", headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    page = response.json()
+    assert [p["id"] for p in page["items"]] == [product_ids[1]]
+    assert page["next_cursor"]
+
+    response = client.get(f"/api/v1/products/expiring?within_days=7&section={section}&limit=1&cursor={page['next_cursor']}", headers=headers)
+    page = response.json()
+    assert [p["id"] for p in page["items"]] == [product_ids[0]]
+    assert page["next_cursor"] is None
+
+    response = client.get("/api/v1/products/expiring?cursor=invalido", headers=headers)
+    assert response.status_code == 400
+
+    for product_id in product_ids:
+        response = client.delete(f"/api/v1/products/{product_id}", headers=headers)
+        assert response.status_code == 204
+
+
+def test_list_products_total_count():
+    headers = get_auth_header()
+    section = f"Secao {uuid.uuid4()}"
+    product_ids = []
+    for i in range(3):
+        product_data = {
+            "description": f"Produto Contagem {uuid.uuid4()}",
+            "price": 5.0,
+            "barcode": str(uuid.uuid4().int)[:13],
+            "section": section,
+            "stock": 1,
+            "expiration_date": "2025-12-31",
+            "image": None
+        }
+        response = client.post("/api/v1/products/", json=product_data, headers=headers)
+        product_ids.append(response.json()["id"])
+
+    response = client.get(f"/api/v1/products/?section={section}&limit=1", headers=headers)
+    assert response.status_code == 200
+    assert "X-Total-Count" not in response.headers
+
+    response = client.get(f"/api/v1/products/?section={section}&limit=1&count=exact", headers=headers)
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "3"
+
+    # Estimativas pequenas (ou fora do Postgres) usam a contagem exata
+    response = client.get(f"/api/v1/products/?section={section}&limit=1&count=estimate", headers=headers)
+    assert response.headers["X-Total-Count"] == "3"
+
+    response = client.get(f"/api/v1/products/?section={section}&count=invalido", headers=headers)
+    assert response.status_code == 422
+
+    for product_id in product_ids:
+        client.delete(f"/api/v1/products/{product_id}", headers=headers)
+
+
+def test_product_sparse_fields():
+    headers = get_auth_header()
+    unique_description = f"Produto Campos {uuid.uuid4()}"
+    product_data = {
+        "description": unique_description,
+        "price": 7.5,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 4,
+        "expiration_date": "2025-12-31",
+        "image": "https://exemplo.com/produto.jpg"
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    product_id = response.json()["id"]
+
+    response = client.get(
+        f"/api/v1/products/?description={unique_description}&fields=id,description,price,stock",
+        headers=headers,
+    )
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    assert response.json() == [
+        {"id": product_id, "description": unique_description, "price": 7.5, "stock": 4}
+    ]
+
+    response = client.get(f"/api/v1/products/{product_id}?fields=stock,id", headers=headers)
+    assert response.json() == {"id": product_id, "stock": 4}
+
+    response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.json()["image"] == "https://exemplo.com/produto.jpg"
+
+    response = client.get(f"/api/v1/products/{product_id}?fields=id,senha", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: senha."
+
+    client.delete(f"/api/v1/products/{product_id}", headers=headers)
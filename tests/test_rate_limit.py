@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.rate_limit import parse_rate, route_group
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_auth_header():
+    user_data = {
+        "name": "User Rate Limit",
+        "email": f"ratelimit_{uuid.uuid4()}@example.com",
+        "phone": "11999999970",
+        "access_level": "seller",
+        "password": "12345678"
+    }
+    client.post("/api/v1/auth/register", json=user_data)
+    login_data = {"email": user_data["email"], "password": user_data["password"]}
+    response = client.post("/api/v1/auth/login", json=login_data)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_parse_rate():
+    assert parse_rate("120/minute") == (120, 2.0)
+    assert parse_rate("10/second") == (10, 10.0)
+    with pytest.raises(ValueError):
+        parse_rate("10/day")
+    with pytest.raises(ValueError):
+        parse_rate("0/minute")
+
+
+def test_route_group():
+    assert route_group("/api/v1/orders/1/status") == "orders"
+    assert route_group("/api/v1/products/") == "products"
+    assert route_group("/health") is None
+
+
+def test_rate_limit_per_user_and_route_group(monkeypatch):
+    headers = get_auth_header()
+    other_headers = get_auth_header()
+    monkeypatch.setattr(get_settings(), "RATE_LIMITS", {"products": "2/minute"})
+
+    for _ in range(2):
+        response = client.get("/api/v1/products/?limit=1", headers=headers)
+        assert response.status_code == 200
+
+    response = client.get("/api/v1/products/?limit=1", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Outros grupos de rotas e outros usuários têm seus próprios limites
+    response = client.get("/api/v1/clients/?limit=1", headers=headers)
+    assert response.status_code == 200
+    response = client.get("/api/v1/products/?limit=1", headers=other_headers)
+    assert response.status_code == 200
+
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_ENABLED", False)
+    response = client.get("/api/v1/products/?limit=1", headers=headers)
+    assert response.status_code == 200
@@ -0,0 +1,119 @@
+import itertools
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.core import database
+from app.core.cache import entity_key, get_cache
+from app.main import app
+from app.models.product import Product
+
+client = TestClient(app)
+
+def get_auth_header():
+    unique_email = f"replica_{uuid.uuid4()}@example.com"
+    user_data = {
+        "name": "Replica Teste",
+        "email": unique_email,
+        "phone": "11999999984",
+        "access_level": "seller",
+        "password": "12345678"
+    }
+    client.post("/api/v1/auth/register", json=user_data)
+    login_data = {"email": unique_email, "password": user_data["password"]}
+    response = client.post("/api/v1/auth/login", json=login_data)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def use_replicas(monkeypatch, engines):
+    monkeypatch.setattr(database, "_replica_engines", engines)
+    monkeypatch.setattr(database, "_replica_cycle", itertools.cycle(range(len(engines))))
+    monkeypatch.setattr(database, "_replica_down_until", {})
+
+def test_reads_follow_replica_and_writes(monkeypatch, tmp_path):
+    # Réplica "atrasada": mesma estrutura, sem os dados do primário
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Product.__table__.create(replica)
+    use_replicas(monkeypatch, [replica])
+
+    headers = get_auth_header()
+    product_data = {
+        "description": f"Produto Replica {uuid.uuid4()}",
+        "price": 3.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 2,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    product_id = response.json()["id"]
+
+    # Logo após a escrita, a leitura vai para o primário
+    list_url = f"/api/v1/products/?description={product_data['description']}"
+    response = client.get(list_url, headers=headers)
+    assert [p["id"] for p in response.json()] == [product_id]
+
+    # A marca de escrita recente fica no backend compartilhado pelos workers
+    recent_key = database.recent_write_key(headers["Authorization"])
+    assert get_cache().get(recent_key) is not None
+
+    # Passada a janela de read-your-writes, a leitura vai para a réplica
+    get_cache().delete(recent_key)
+    response = client.get(list_url, headers=headers)
+    assert response.json() == []
+
+    client.delete(f"/api/v1/products/{product_id}", headers=headers)
+    replica.dispose()
+
+def test_cache_loads_from_primary_with_replicas(monkeypatch, tmp_path):
+    # Réplica "atrasada": se o cache fosse carregado dela, o produto não existiria
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Product.__table__.create(replica)
+    use_replicas(monkeypatch, [replica])
+
+    writer = get_auth_header()
+    reader = get_auth_header()
+    product_data = {
+        "description": f"Produto Replica Cache {uuid.uuid4()}",
+        "price": 3.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": 2,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=writer)
+    product_id = response.json()["id"]
+
+    # Leitor sem escrita recente: a leitura iria para a réplica, mas a falta
+    # no cache é carregada do primário
+    response = client.get(f"/api/v1/products/{product_id}", headers=reader)
+    assert response.status_code == 200
+    assert response.json()["price"] == 3.0
+    assert get_cache().get(entity_key("product", product_id)) is not None
+
+    response = client.put(f"/api/v1/products/{product_id}", json={**product_data, "price": 4.0}, headers=writer)
+    assert response.status_code == 200
+    for headers in (reader, writer):
+        response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+        assert response.json()["price"] == 4.0
+
+    client.delete(f"/api/v1/products/{product_id}", headers=writer)
+    replica.dispose()
+
+def test_unhealthy_replica_falls_back_to_primary(monkeypatch, tmp_path):
+    broken = create_engine(f"sqlite:///{tmp_path / 'inexistente' / 'replica.db'}")
+    use_replicas(monkeypatch, [broken])
+
+    headers = get_auth_header()
+    response = client.get("/api/v1/products/?limit=1", headers=headers)
+    assert response.status_code == 200
+    assert 0 in database._replica_down_until
+
+    # Enquanto estiver fora da rotação, a réplica nem é tentada
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(broken, "connect", lambda: pytest.fail("replica should be skipped"))
+        response = client.get("/api/v1/products/?limit=1", headers=headers)
+        assert response.status_code == 200
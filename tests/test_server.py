@@ -0,0 +1,35 @@
+from app.core.config import get_settings
+from app.server import available_cpus, cgroup_cpu_limit, server_options, worker_count
+
+def test_cgroup_v2_cpu_limit(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert cgroup_cpu_limit(str(tmp_path)) == 1.5
+    assert available_cpus(str(tmp_path)) <= 2
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+
+def test_cgroup_v1_cpu_limit(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("300000\n")
+    assert cgroup_cpu_limit(str(tmp_path)) == 3.0
+
+def test_available_cpus_without_cgroup(tmp_path):
+    assert available_cpus(str(tmp_path)) >= 1
+
+def test_server_options():
+    settings = get_settings().model_copy(
+        update={"WEB_CONCURRENCY": 3, "MAX_REQUESTS_PER_WORKER": 500}
+    )
+    assert worker_count(settings) == 3
+    options = server_options(settings)
+    assert options["workers"] == 3
+    assert options["limit_max_requests"] == 500
+    assert "reload" not in options
+
+    options = server_options(settings.model_copy(update={"MAX_REQUESTS_PER_WORKER": 0}))
+    assert "limit_max_requests" not in options
@@ -0,0 +1,124 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.database import SessionLocal
+from app.repositories.stock import compact_stock_movements, find_stock_discrepancies
+import uuid
+from unittest.mock import patch
+
+client = TestClient(app)
+
+def get_auth_header():
+    unique_email = f"livro_{uuid.uuid4()}@example.com"
+    user_data = {
+        "name": "Livro Estoque",
+        "email": unique_email,
+        "phone": "11999999988",
+        "access_level": "seller",
+        "password": "12345678"
+    }
+    client.post("/api/v1/auth/register", json=user_data)
+    login_data = {"email": unique_email, "password": user_data["password"]}
+    response = client.post("/api/v1/auth/login", json=login_data)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def create_client_and_product(headers, stock):
+    client_data = {
+        "name": "Cliente Livro",
+        "email": f"clientelivro_{uuid.uuid4()}@example.com",
+        "phone": "11999999987",
+        "cpf": str(uuid.uuid4().int)[:11],
+        "address": "Rua Livro, 1"
+    }
+    response = client.post("/api/v1/clients/", json=client_data, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    product_data = {
+        "description": f"Produto Livro {uuid.uuid4()}",
+        "price": 12.0,
+        "barcode": str(uuid.uuid4().int)[:13],
+        "section": "Roupas",
+        "stock": stock,
+        "expiration_date": "2025-12-31",
+        "image": None
+    }
+    response = client.post("/api/v1/products/", json=product_data, headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    return client_data, response.json()
+
+def test_stock_ledger_flow():
+    headers = get_auth_header()
+    client_data, product = create_client_and_product(headers, stock=10)
+    response = client.get(f"/api/v1/clients/?email={client_data['email']}", headers=headers)
+    client_id = response.json()[0]["id"]
+    product_id = product["id"]
+
+    # Reposição
+    response = client.post(f"/api/v1/products/{product_id}/stock-movements", json={"quantity": 5, "reason": "restock"}, headers=headers)
+    assert response.status_code == 201, f"Status: {response.status_code}, Body: {response.text}"
+    assert response.json()["quantity"] == 5
+
+    # Venda
+    order_data = {
+        "client_id": client_id,
+        "status": "pending",
+        "created_at": "2025-05-25",
+        "products": [{"product_id": product_id, "quantity": 4}]
+    }
+    with patch("app.api.v1.endpoints.order.send_whatsapp_message"):
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+    assert response.status_code == 201, f"Status: {response.status_code}, Body: {response.text}"
+    order_id = response.json()["id"]
+
+    # Pedido sem estoque suficiente não altera o saldo
+    order_data["products"][0]["quantity"] = 100
+    with patch("app.api.v1.endpoints.order.send_whatsapp_message"):
+        response = client.post("/api/v1/orders/", json=order_data, headers=headers)
+    assert response.status_code == 400
+
+    # Ajuste negativo além do saldo é recusado
+    response = client.post(f"/api/v1/products/{product_id}/stock-movements", json={"quantity": -50, "reason": "adjustment"}, headers=headers)
+    assert response.status_code == 400
+    response = client.post(f"/api/v1/products/{product_id}/stock-movements", json={"quantity": -1, "reason": "restock"}, headers=headers)
+    assert response.status_code == 422
+
+    response = client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.json()["stock"] == 11
+
+    # Histórico paginado, do mais recente para o mais antigo
+    response = client.get(f"/api/v1/products/{product_id}/stock-movements?limit=2", headers=headers)
+    assert response.status_code == 200, f"Status: {response.status_code}, Body: {response.text}"
+    page = response.json()
+    assert [(m["quantity"], m["reason"]) for m in page["items"]] == [(-4, "order"), (5, "restock")]
+    assert page["items"][0]["order_id"] == order_id
+    response = client.get(f"/api/v1/products/{product_id}/stock-movements?limit=2&cursor={page['next_cursor']}", headers=headers)
+    page = response.json()
+    assert [(m["quantity"], m["reason"]) for m in page["items"]] == [(10, "opening")]
+    assert page["next_cursor"] is None
+
+    response = client.get("/api/v1/products/999999999/stock-movements", headers=headers)
+    assert response.status_code == 404
+
+    response = client.delete(f"/api/v1/orders/{order_id}", headers=headers)
+    assert response.status_code == 204
+
+def test_compact_stock_movements_preserves_balance():
+    headers = get_auth_header()
+    _, product = create_client_and_product(headers, stock=3)
+    product_id = product["id"]
+    for quantity in (2, 4):
+        response = client.post(f"/api/v1/products/{product_id}/stock-movements", json={"quantity": quantity, "reason": "restock"}, headers=headers)
+        assert response.status_code == 201
+
+    db = SessionLocal()
+    try:
+        # Apenas o produto do teste: o banco é compartilhado com os demais testes
+        assert compact_stock_movements(db, datetime.now(timezone.utc) + timedelta(minutes=1), [product_id]) == 3
+        assert product_id not in {row.id for row in find_stock_discrepancies(db)}
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get(f"/api/v1/products/{product_id}/stock-movements", headers=headers)
+    items = response.json()["items"]
+    assert [(m["quantity"], m["reason"]) for m in items] == [(9, "compaction")]